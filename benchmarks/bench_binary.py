@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compares body size and encode time of JSON, MessagePack and CBOR on a numeric
+heavy payload. Sizes are those of the Lambda output, i.e. base64 encoded for the
+binary formats.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_binary.py [--rows N] [--number N]
+"""
+import argparse
+import random
+import timeit
+
+from serverless import binary, codecs
+
+
+def build_payload(rows):
+    """Returns rows of integer ids, counters and float measurements"""
+    rnd = random.Random(0)
+    return [
+        {
+            'id': i,
+            'counts': [rnd.randrange(100000) for _ in range(8)],
+            'values': [rnd.random() * 1000 for _ in range(8)],
+            'ok': i % 2 == 0,
+        }
+        for i in range(rows)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--number', type=int, default=20)
+    args = parser.parse_args()
+
+    payload = build_payload(args.rows)
+    encoders = [(name, codecs.get_codec(name)) for name in sorted(codecs.available_codecs())]
+    encoders.append(('msgpack', binary.MsgPackCodec()))
+    encoders.append(('msgpack (pure)', binary.MsgPackCodec(pure=True)))
+    encoders.append(('cbor', binary.CborCodec()))
+
+    for name, codec in encoders:
+        body = codec.dumps(payload)
+        size = len(body) if isinstance(body, str) else (len(body) + 2) // 3 * 4
+        seconds = min(timeit.repeat(
+            lambda codec=codec: codec.dumps(payload), number=args.number, repeat=3
+        )) / args.number
+        print('%-15s %9d bytes  dumps %8.3f ms' % (name, size, seconds * 1000))
+
+
+if __name__ == '__main__':
+    main()
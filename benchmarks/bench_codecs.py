@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compares the registered JSON codecs on a typical API payload.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_codecs.py [--rows N] [--number N]
+"""
+import argparse
+from datetime import datetime, timedelta
+import timeit
+import uuid
+
+from serverless import codecs
+
+
+def build_payload(rows):
+    """Returns a list of rows mixing native, datetime and UUID values"""
+    start = datetime(2018, 1, 1)
+    return [
+        {
+            'id': uuid.uuid4(),
+            'created': start + timedelta(seconds=i),
+            'name': 'row %d' % i,
+            'score': i * 0.5,
+            'tags': ['a', 'b', 'c'],
+        }
+        for i in range(rows)
+    ]
+
+
+def measure(codec, payload, number):
+    """Returns best (dumps, loads) seconds per call for codec"""
+    body = codec.dumps(payload)
+    dumps = min(timeit.repeat(lambda: codec.dumps(payload), number=number, repeat=3))
+    loads = min(timeit.repeat(lambda: codec.loads(body), number=number, repeat=3))
+    return dumps / number, loads / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--number', type=int, default=50)
+    args = parser.parse_args()
+
+    payload = build_payload(args.rows)
+    results = {}
+
+    for name in sorted(codecs.available_codecs()):
+        dumps, loads = results[name] = measure(codecs.get_codec(name), payload, args.number)
+        print('%-8s dumps %8.3f ms  loads %8.3f ms' % (name, dumps * 1000, loads * 1000))
+
+    baseline = sum(results['json'])
+    for name, timings in sorted(results.items()):
+        if name != 'json':
+            print('%s speedup over json: %.1fx' % (name, baseline / sum(timings)))
+
+
+if __name__ == '__main__':
+    main()
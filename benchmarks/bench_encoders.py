@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compares ServerlessJsonEncoder with the former isinstance based encoder on
+timestamped rows and on a homogeneous list of datetimes.
+
+Both run at about the same speed: converting each value (``isoformat``,
+``str(uuid)``) costs more than dispatching it, so the registry is about
+supporting more types, not about encoding faster. Bulk encoding only skips the
+``default`` calls for lists of a single type, which rows are not.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_encoders.py [--rows N] [--number N]
+"""
+import argparse
+from datetime import date, datetime, timedelta
+import json
+import timeit
+import uuid
+
+from serverless.encoders import ServerlessJsonEncoder
+
+
+class IsinstanceJsonEncoder(json.JSONEncoder):
+    """The encoder as it was before the type registry"""
+    def default(self, o): # pylint: disable=E0202
+        if isinstance(o, (date, datetime)):
+            return o.isoformat()
+        if isinstance(o, uuid.UUID):
+            return str(o)
+        return json.JSONEncoder.default(self, o)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--number', type=int, default=5)
+    args = parser.parse_args()
+
+    start = datetime(2018, 1, 1)
+    timestamps = [start + timedelta(seconds=i) for i in range(args.rows)]
+    payloads = {
+        'rows': [{'id': uuid.uuid4(), 'at': ts} for ts in timestamps],
+        'timestamps': {'timestamps': timestamps},
+    }
+
+    for name, payload in sorted(payloads.items()):
+        timings = {}
+        for encoder in (IsinstanceJsonEncoder, ServerlessJsonEncoder):
+            timings[encoder] = min(timeit.repeat(
+                lambda: json.dumps(payload, cls=encoder), # pylint: disable=W0640
+                number=args.number, repeat=3
+            )) / args.number
+        print('%-10s isinstance %8.2f ms  registry %8.2f ms  speedup %.1fx' % (
+            name,
+            timings[IsinstanceJsonEncoder] * 1000,
+            timings[ServerlessJsonEncoder] * 1000,
+            timings[IsinstanceJsonEncoder] / timings[ServerlessJsonEncoder],
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measures the per invocation cost of rejecting a request with a ServerlessError,
+with the serialized error bodies cached and with caching disabled.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_errors.py [--number N]
+"""
+import argparse
+import timeit
+
+from serverless import decorators
+from serverless.decorators import lambda_handler
+from serverless.exceptions import Unauthorized
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--number', type=int, default=20000)
+    args = parser.parse_args()
+
+    event = {'body': None, 'headers': {}}
+
+    @lambda_handler
+    def handler(req):
+        raise Unauthorized('Invalid credentials')
+
+    for name, limit in (('uncached', 0), ('cached', decorators.MAX_CACHED_ERROR_BODIES)):
+        decorators._error_bodies.clear() # pylint: disable=W0212
+        decorators.MAX_CACHED_ERROR_BODIES = limit
+        elapsed = min(timeit.repeat(
+            lambda: handler(event, None), number=args.number, repeat=3
+        )) / args.number * 1e6
+        print('%-10s %7.2f us per invocation' % (name, elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measures the serialization of a list of wide rows with and without a sparse
+fieldset, projection included.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_fields.py [--rows N] [--number N]
+"""
+import argparse
+import timeit
+
+from serverless.fields import Fields
+from serverless.wrappers import Request, Response
+
+
+def build_payload(rows):
+    """Returns rows of 30 fields, one of them nested"""
+    return [
+        dict(
+            {'field_%d' % j: 'value %d' % j for j in range(28)},
+            id=i, owner={'id': i, 'name': 'owner %d' % i, 'email': 'o%d@example.com' % i}
+        )
+        for i in range(rows)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--number', type=int, default=20)
+    args = parser.parse_args()
+
+    payload = build_payload(args.rows)
+    fields = Fields()
+    for spec in (None, 'id,field_1', 'id,owner(name)'):
+        event = {'queryStringParameters': {'fields': spec} if spec else {}}
+        req = Request(event, None)
+
+        def run():
+            resp = Response(payload, fields=fields)
+            return resp.to_lambda_output(req)['body']
+
+        size = len(run())
+        seconds = min(timeit.repeat(run, number=args.number, repeat=3)) / args.number
+        print('%-16s %9d bytes  %8.3f ms' % (spec or '(all fields)', size, seconds * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measures the import cost of serverless with ``python -X importtime`` and fails
+when the median of several fresh interpreters exceeds a budget.
+
+Usage:
+    python benchmarks/bench_import.py [--budget-ms MS] [--runs N] [--statement CODE]
+
+The budget can also be set with the SERVERLESS_IMPORT_BUDGET_MS environment variable.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def measure(statement):
+    """
+    Runs statement in a fresh interpreter
+
+    Returns:
+        total (int): microseconds spent importing modules after startup
+        modules (list): (self microseconds, module name) of those modules
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        env=env, stderr=subprocess.PIPE, universal_newlines=True, check=True
+    )
+
+    total, modules, started = 0, [], False
+    for line in proc.stderr.splitlines():
+        match = LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        depth = len(indent) // 2
+        if not started:
+            # everything up to and including site belongs to interpreter startup
+            started = depth == 0 and name == 'site'
+            continue
+        if depth == 0:
+            total += int(cumulative_us)
+        modules.append((int(self_us), name))
+    return total, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--budget-ms', type=float,
+        default=float(os.environ.get('SERVERLESS_IMPORT_BUDGET_MS', 30))
+    )
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument(
+        '--statement', default='from serverless import lambda_handler, Response'
+    )
+    args = parser.parse_args()
+
+    results = sorted(measure(args.statement) for _ in range(args.runs))
+    total, modules = results[len(results) // 2]
+
+    print('%s: median %.2f ms, best %.2f ms over %d runs (budget %.2f ms)' % (
+        args.statement, total / 1000.0, results[0][0] / 1000.0, args.runs, args.budget_ms
+    ))
+    for self_us, name in sorted(modules, reverse=True)[:10]:
+        print('  %8.2f ms  %s' % (self_us / 1000.0, name))
+
+    if total / 1000.0 > args.budget_ms:
+        print('import budget exceeded')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
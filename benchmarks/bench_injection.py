@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compares injected typed arguments with the same extraction written by hand in the
+handler, per call of the handler.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_injection.py [--number N]
+"""
+import argparse
+from datetime import date
+import timeit
+import uuid
+
+from serverless.exceptions import BadRequest
+from serverless.injection import inject
+from serverless.wrappers import Request
+
+
+def build_event():
+    return {
+        'httpMethod': 'GET',
+        'path': '/users',
+        'pathParameters': {'user_id': str(uuid.uuid4())},
+        'queryStringParameters': {'since': '2018-01-01', 'limit': '50', 'active': 'true'},
+        'body': '{"note": "hello"}',
+    }
+
+
+def by_hand(req):
+    try:
+        user_id = uuid.UUID(req.params['user_id'])
+        since = date.fromisoformat(req.query['since'])
+        limit = int(req.query.get('limit', 20))
+        active = req.query.get('active', 'false').lower() in ('true', '1', 'yes', 'on')
+    except (KeyError, ValueError):
+        raise BadRequest('Invalid parameters')
+    note = req.data.get('note')
+    return user_id, since, limit, active, note
+
+
+@inject
+def injected(req, user_id: uuid.UUID, since: date, limit: int = 20,
+             active: bool = False, note: str = None):
+    return user_id, since, limit, active, note
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--number', type=int, default=20000)
+    args = parser.parse_args()
+
+    event = build_event()
+    assert by_hand(Request(event, None, codec='json')) == \
+        injected(Request(event, None, codec='json'))
+
+    for name, handler in (('by hand', by_hand), ('injected', injected)):
+        seconds = min(timeit.repeat(
+            lambda handler=handler: handler(Request(event, None, codec='json')),
+            number=args.number, repeat=3
+        )) / args.number
+        print('%-10s %8.2f us per call' % (name, seconds * 1e6))
+
+
+if __name__ == '__main__':
+    main()
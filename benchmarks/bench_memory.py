@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compares memory and allocations of building many Request and Response objects
+with those of equivalent dict based objects that copy the security headers per
+instance, as the wrappers did before using __slots__.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_memory.py [--count N]
+"""
+import argparse
+import timeit
+import tracemalloc
+
+from serverless.wrappers import Request, Response
+
+
+class DictRequest:
+    def __init__(self, event, context, codec=None, resources=None, timings=None,
+                 logger=None):
+        self.event = event
+        self.context = context
+        self.codec = codec
+        self.resources = resources
+        self.timings = timings
+        self._data = None
+        self._params = None
+        self._log_settings = logger
+        self._logger = None
+
+
+class DictResponse:
+    def __init__(self, data=None, status_code=200, headers=None):
+        self.data = data
+        self.status_code = status_code
+        self.codec = None
+        self.compression = None
+        self.etag = None
+        self.max_size = None
+        self.spill = None
+        self._body = None
+        self.headers = dict(Response._security_headers) # pylint: disable=W0212
+        if headers:
+            self.headers.update(headers)
+
+
+def measure(build, count):
+    """Returns (KB retained, allocated blocks) of count objects built by build"""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objects = [build() for _ in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, 'filename')
+    size = sum(stat.size_diff for stat in stats)
+    blocks = sum(stat.count_diff for stat in stats)
+    del objects
+    return size / 1024.0, blocks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=10000)
+    args = parser.parse_args()
+
+    event = {'body': None}
+    cases = [
+        ('dict Request', lambda: DictRequest(event, None)),
+        ('slots Request', lambda: Request(event, None)),
+        ('dict Response', lambda: DictResponse({'k': 'v'})),
+        ('slots Response', lambda: Response({'k': 'v'})),
+        ('dict Response+hdr', lambda: DictResponse({'k': 'v'}, headers={'X-Id': '1'})),
+        ('slots Response+hdr', lambda: Response({'k': 'v'}, headers={'X-Id': '1'})),
+    ]
+    for name, build in cases:
+        size, blocks = measure(build, args.count)
+        elapsed = min(timeit.repeat(build, number=args.count, repeat=3)) / args.count * 1e6
+        print('%-20s %9.1f KB %8d blocks  %6.2f us per object' % (name, size, blocks, elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measures the per invocation cost of instrumentation, disabled and enabled.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_metrics.py [--number N]
+"""
+import argparse
+import json
+import timeit
+
+from serverless.decorators import lambda_handler
+from serverless.metrics import Metrics
+from serverless.wrappers import Response
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--number', type=int, default=20000)
+    args = parser.parse_args()
+
+    event = {'body': json.dumps({'k': 'v'}), 'headers': {}}
+
+    def handler(req):
+        return Response(req.data)
+
+    handlers = [
+        ('disabled', lambda_handler(handler)),
+        ('emf', lambda_handler(handler, metrics=Metrics(emit=lambda line: None))),
+        ('emf+header', lambda_handler(handler, metrics=Metrics(
+            server_timing=True, emit=lambda line: None
+        ))),
+    ]
+
+    baseline = None
+    for name, wrapped in handlers:
+        elapsed = min(timeit.repeat(
+            lambda: wrapped(event, None), number=args.number, repeat=3 # pylint: disable=W0640
+        )) / args.number * 1e6
+        baseline = baseline or elapsed
+        print('%-10s %7.2f us per invocation (+%.2f us)' % (name, elapsed, elapsed - baseline))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measures Router dispatch cost with hundreds of routes, next to a linear scan
+over regular expressions as an if/elif chain would do.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_router.py [--resources N] [--number N]
+"""
+import argparse
+import re
+import timeit
+
+from serverless.routing import Router
+
+
+def build_templates(resources):
+    """Returns 5 path templates per resource"""
+    templates = []
+    for i in range(resources):
+        base = '/resource%d' % i
+        templates += [
+            base,
+            base + '/{item_id}',
+            base + '/{item_id}/children',
+            base + '/{item_id}/children/{child_id}',
+            base + '/search',
+        ]
+    return templates
+
+
+def to_regex(template):
+    pattern = re.sub(r'\{(\w+)\}', r'(?P<\1>[^/]+)', template)
+    return re.compile('^%s$' % pattern)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--resources', type=int, default=100)
+    parser.add_argument('--number', type=int, default=20000)
+    args = parser.parse_args()
+
+    templates = build_templates(args.resources)
+    router = Router()
+    for template in templates:
+        router.add_route('GET', template, template)
+    regexes = [(to_regex(t), t) for t in templates]
+
+    def linear(path):
+        for regex, template in regexes:
+            match = regex.match(path)
+            if match:
+                return template, match.groupdict()
+        return None
+
+    last = args.resources - 1
+    paths = {
+        'first': '/resource0/1/children/2',
+        'last': '/resource%d/1/children/2' % last,
+    }
+
+    print('%d routes' % len(templates))
+    for name, path in sorted(paths.items()):
+        assert router.match('GET', path)[0] == linear(path)[0]
+        trie = min(timeit.repeat(
+            lambda: router.match('GET', path), number=args.number, repeat=3 # pylint: disable=W0640
+        )) / args.number
+        scan = min(timeit.repeat(
+            lambda: linear(path), number=args.number, repeat=3 # pylint: disable=W0640
+        )) / args.number
+        print('%-6s trie %7.2f us  linear %8.2f us' % (name, trie * 1e6, scan * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compares peak memory of serializing an export built as a list with one built
+by a generator and encoded incrementally, and the cost of an oversized export.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_streaming.py [--rows N]
+"""
+import argparse
+import time
+import tracemalloc
+
+from serverless.exceptions import PayloadTooLarge
+from serverless.streaming import LAMBDA_PAYLOAD_LIMIT
+from serverless.wrappers import Response
+
+
+def rows(count):
+    for i in range(count):
+        yield {'id': i, 'name': 'row %d' % i, 'values': [i, i * 2, i * 3]}
+
+
+def measure(build):
+    """Returns (peak MB, seconds, outcome) of building and serializing a response"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        build().to_lambda_output()
+        outcome = 'ok'
+    except PayloadTooLarge:
+        outcome = '413'
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024.0 / 1024.0, elapsed, outcome
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=50000)
+    args = parser.parse_args()
+
+    cases = [
+        ('list', lambda: Response({'rows': list(rows(args.rows))}, codec='json')),
+        ('generator', lambda: Response({'rows': rows(args.rows)}, codec='json')),
+        ('list 10x, limit', lambda: Response(
+            {'rows': list(rows(args.rows * 10))}, codec='json',
+            max_size=LAMBDA_PAYLOAD_LIMIT
+        )),
+        ('generator 10x, limit', lambda: Response(
+            {'rows': rows(args.rows * 10)}, codec='json', max_size=LAMBDA_PAYLOAD_LIMIT
+        )),
+    ]
+    for name, build in cases:
+        peak, elapsed, outcome = measure(build)
+        print('%-22s peak %8.2f MB  %8.1f ms  %s' % (name, peak, elapsed * 1000, outcome))
+
+
+if __name__ == '__main__':
+    main()
@@ -15,13 +15,54 @@
 # limitations under the License.
 
 """Serverless - SDK for building serverless app"""
-from serverless.decorators import lambda_handler
-from serverless.exceptions import (
-    ServerlessError, BadRequest, Unauthorized, Forbidden, NotFound, UnprocessableEntity
-)
-from serverless.wrappers import Request, Response
+import sys
 
 
 __version__ = '0.0.5'
 __author__ = 'Peter Hwang'
 __licence__ = 'Apache License 2.0'
+
+# public names and the modules defining them, imported on first access to keep
+# cold starts short
+_exports = {
+    'batch_handler': 'serverless.decorators',
+    'lambda_handler': 'serverless.decorators',
+    'ServerlessError': 'serverless.exceptions',
+    'BadRequest': 'serverless.exceptions',
+    'Unauthorized': 'serverless.exceptions',
+    'Forbidden': 'serverless.exceptions',
+    'NotFound': 'serverless.exceptions',
+    'MethodNotAllowed': 'serverless.exceptions',
+    'Conflict': 'serverless.exceptions',
+    'PayloadTooLarge': 'serverless.exceptions',
+    'UnsupportedMediaType': 'serverless.exceptions',
+    'UnprocessableEntity': 'serverless.exceptions',
+    'ServiceUnavailable': 'serverless.exceptions',
+    'GatewayTimeout': 'serverless.exceptions',
+    'Record': 'serverless.wrappers',
+    'Request': 'serverless.wrappers',
+    'Response': 'serverless.wrappers',
+    'Router': 'serverless.routing',
+}
+
+__all__ = sorted(_exports)
+
+
+def __getattr__(name):
+    try:
+        module_name = _exports[name]
+    except KeyError:
+        raise AttributeError('module %r has no attribute %r' % (__name__, name))
+    value = getattr(__import__(module_name, fromlist=[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_exports))
+
+
+if sys.version_info < (3, 7):
+    # module level __getattr__ (PEP 562) is not available
+    for _name in _exports:
+        __getattr__(_name)
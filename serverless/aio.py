@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Event loop shared by ``async def`` handlers.
+
+A single loop is created per container and is never closed, so async clients
+created on it (e.g. at module level or cached on first use) stay usable across
+warm invocations.
+
+Example:
+    from serverless import lambda_handler, Response
+    from serverless.aio import run_once
+
+    async def create_session():
+        return aiohttp.ClientSession()
+
+    @lambda_handler
+    async def handler(req):
+        session = await run_once(create_session)
+        a, b = await asyncio.gather(session.get(URL_A), session.get(URL_B))
+        return Response({'a': a.status, 'b': b.status})
+"""
+import asyncio
+
+
+_loop = None
+_once = {}
+
+
+def get_event_loop():
+    """Returns the event loop of the container, creating it on first use"""
+    global _loop # pylint: disable=W0603
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+    return _loop
+
+
+def run(coro):
+    """
+    Runs coro to completion on the container event loop
+
+    Args:
+        coro (coroutine): the coroutine to run
+
+    Returns:
+        result: whatever coro returns, exceptions are propagated
+    """
+    return get_event_loop().run_until_complete(coro)
+
+
+async def run_once(factory):
+    """
+    Awaits factory() the first time it is called with factory and returns the
+    cached result afterwards, for clients that should live as long as the loop.
+    A failed call is not cached.
+
+    Args:
+        factory (function): coroutine function creating the resource
+    """
+    future = _once.get(factory)
+    if future is None:
+        future = _once[factory] = asyncio.ensure_future(factory())
+    try:
+        return await asyncio.shield(future)
+    except Exception:
+        if _once.get(factory) is future and future.done():
+            del _once[factory]
+        raise
@@ -0,0 +1,520 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Binary body encodings, MessagePack and CBOR, negotiated from the Accept header.
+
+Values JSON can not represent natively are encoded through the same registry as
+ServerlessJsonEncoder, so ``date``, ``datetime`` and ``UUID`` values become the
+same strings in every encoding. MessagePack uses the ``msgpack`` package when it
+is installed; CBOR, and MessagePack without the package, are encoded in pure
+python.
+
+.. _MessagePack:
+   https://github.com/msgpack/msgpack/blob/master/spec.md
+.. _RFC 8949:
+   https://tools.ietf.org/html/rfc8949
+"""
+import struct
+
+from serverless.encoders import registry
+
+
+_UINT64_MAX = 0xFFFFFFFFFFFFFFFF
+
+
+class BinaryCodec:
+    """
+    Base class for binary codecs
+
+    Attributes:
+        name (str): name the codec is known by
+        media_types (tuple): media types of the encoding, the first is used for
+            responses
+    """
+    name = None
+    media_types = ()
+
+    def dumps(self, obj):
+        """
+        Serializes obj to bytes
+
+        Raises:
+            TypeError: if obj is not serializable
+            ValueError: if obj holds a value the encoding can not represent
+        """
+        raise NotImplementedError
+
+    def loads(self, data):
+        """
+        Deserializes data (bytes)
+
+        Raises:
+            ValueError: if data is not a valid document
+        """
+        raise NotImplementedError
+
+
+def _pack_msgpack(obj, out):
+    if obj is None:
+        out.append(b'\xc0')
+    elif obj is True:
+        out.append(b'\xc3')
+    elif obj is False:
+        out.append(b'\xc2')
+    elif isinstance(obj, int):
+        if 0 <= obj < 0x80:
+            out.append(struct.pack('B', obj))
+        elif -0x20 <= obj < 0:
+            out.append(struct.pack('b', obj))
+        elif 0 <= obj <= _UINT64_MAX:
+            if obj <= 0xFF:
+                out.append(struct.pack('>BB', 0xcc, obj))
+            elif obj <= 0xFFFF:
+                out.append(struct.pack('>BH', 0xcd, obj))
+            elif obj <= 0xFFFFFFFF:
+                out.append(struct.pack('>BI', 0xce, obj))
+            else:
+                out.append(struct.pack('>BQ', 0xcf, obj))
+        elif -0x8000000000000000 <= obj < 0:
+            if obj >= -0x80:
+                out.append(struct.pack('>Bb', 0xd0, obj))
+            elif obj >= -0x8000:
+                out.append(struct.pack('>Bh', 0xd1, obj))
+            elif obj >= -0x80000000:
+                out.append(struct.pack('>Bi', 0xd2, obj))
+            else:
+                out.append(struct.pack('>Bq', 0xd3, obj))
+        else:
+            raise ValueError('Integer %d is out of the range of MessagePack' % obj)
+    elif isinstance(obj, float):
+        out.append(struct.pack('>Bd', 0xcb, obj))
+    elif isinstance(obj, str):
+        data = obj.encode('utf-8')
+        size = len(data)
+        if size < 0x20:
+            out.append(struct.pack('B', 0xa0 | size))
+        else:
+            out.append(_sized(size, 0xd9, 0xda, 0xdb))
+        out.append(data)
+    elif isinstance(obj, (bytes, bytearray, memoryview)):
+        out.append(_sized(len(obj), 0xc4, 0xc5, 0xc6))
+        out.append(bytes(obj))
+    elif isinstance(obj, (list, tuple)):
+        size = len(obj)
+        if size < 0x10:
+            out.append(struct.pack('B', 0x90 | size))
+        else:
+            out.append(_sized(size, None, 0xdc, 0xdd))
+        for item in obj:
+            _pack_msgpack(item, out)
+    elif isinstance(obj, dict):
+        size = len(obj)
+        if size < 0x10:
+            out.append(struct.pack('B', 0x80 | size))
+        else:
+            out.append(_sized(size, None, 0xde, 0xdf))
+        for key, value in obj.items():
+            _pack_msgpack(key, out)
+            _pack_msgpack(value, out)
+    else:
+        _pack_msgpack(registry.encode(obj), out)
+
+
+def _sized(size, code8, code16, code32):
+    """Returns the header of a MessagePack str, bin, array or map of size"""
+    if code8 is not None and size <= 0xFF:
+        return struct.pack('>BB', code8, size)
+    if size <= 0xFFFF:
+        return struct.pack('>BH', code16, size)
+    return struct.pack('>BI', code32, size)
+
+
+class _Reader:
+    """Position in the bytes being decoded"""
+    __slots__ = ('data', 'pos')
+
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0
+
+    def take(self, size):
+        start = self.pos
+        end = self.pos = start + size
+        if end > len(self.data):
+            raise ValueError('Unexpected end of data')
+        return self.data[start:end]
+
+    def unpack(self, fmt, size):
+        return struct.unpack(fmt, self.take(size))[0]
+
+
+_MSGPACK_FORMATS = {
+    0xca: ('>f', 4), 0xcb: ('>d', 8),
+    0xcc: ('>B', 1), 0xcd: ('>H', 2), 0xce: ('>I', 4), 0xcf: ('>Q', 8),
+    0xd0: ('>b', 1), 0xd1: ('>h', 2), 0xd2: ('>i', 4), 0xd3: ('>q', 8),
+}
+_MSGPACK_SIZES = {
+    0xc4: ('>B', 1, bytes), 0xc5: ('>H', 2, bytes), 0xc6: ('>I', 4, bytes),
+    0xd9: ('>B', 1, str), 0xda: ('>H', 2, str), 0xdb: ('>I', 4, str),
+    0xdc: ('>H', 2, list), 0xdd: ('>I', 4, list),
+    0xde: ('>H', 2, dict), 0xdf: ('>I', 4, dict),
+}
+
+
+def _unpack_msgpack(reader):
+    code = reader.unpack('B', 1)
+    if code < 0x80:
+        return code
+    if code >= 0xe0:
+        return code - 0x100
+    if code <= 0x8f:
+        kind, size = dict, code & 0x0f
+    elif code <= 0x9f:
+        kind, size = list, code & 0x0f
+    elif code <= 0xbf:
+        kind, size = str, code & 0x1f
+    elif code == 0xc0:
+        return None
+    elif code in (0xc2, 0xc3):
+        return code == 0xc3
+    elif code in _MSGPACK_FORMATS:
+        return reader.unpack(*_MSGPACK_FORMATS[code])
+    elif code in _MSGPACK_SIZES:
+        fmt, length, kind = _MSGPACK_SIZES[code]
+        size = reader.unpack(fmt, length)
+    else:
+        raise ValueError('Unsupported MessagePack type 0x%02x' % code)
+    return _build(kind, size, reader, _unpack_msgpack)
+
+
+def _build(kind, size, reader, unpack):
+    """Decodes a str, bytes, list or dict of size"""
+    if kind is bytes:
+        return bytes(reader.take(size))
+    if kind is str:
+        return str(reader.take(size), 'utf-8')
+    if kind is list:
+        return [unpack(reader) for _ in range(size)]
+    result = {}
+    for _ in range(size):
+        key = unpack(reader)
+        try:
+            result[key] = unpack(reader)
+        except TypeError:
+            raise ValueError('Unsupported map key of type %s' % type(key).__name__)
+    return result
+
+
+def _decode_all(unpack, data):
+    reader = _Reader(memoryview(data))
+    try:
+        obj = unpack(reader)
+    except (struct.error, UnicodeDecodeError, RecursionError) as e:
+        raise ValueError(str(e))
+    if reader.pos != len(data):
+        raise ValueError('Extra data after the document')
+    return obj
+
+
+class MsgPackCodec(BinaryCodec):
+    """
+    MessagePack codec, backed by the ``msgpack`` package when it is installed.
+    Integers wider than 64 bits can not be encoded.
+
+    Args:
+        pure (bool): use the pure python implementation even if msgpack is
+            installed
+    """
+    name = 'msgpack'
+    media_types = ('application/msgpack', 'application/vnd.msgpack',
+                   'application/x-msgpack')
+
+    def __init__(self, pure=False):
+        self._msgpack = None
+        if not pure:
+            try:
+                import msgpack # pylint: disable=E0401
+                self._msgpack = msgpack
+            except ImportError:
+                pass
+
+    def dumps(self, obj):
+        if self._msgpack is not None:
+            try:
+                return self._msgpack.packb(
+                    obj, default=registry.encode, use_bin_type=True, datetime=False
+                )
+            except OverflowError as e:
+                raise ValueError(str(e))
+        out = []
+        _pack_msgpack(obj, out)
+        return b''.join(out)
+
+    def loads(self, data):
+        if self._msgpack is not None:
+            try:
+                return self._msgpack.unpackb(data, raw=False, strict_map_key=False)
+            except TypeError as e:
+                # unhashable map keys
+                raise ValueError(str(e))
+        return _decode_all(_unpack_msgpack, data)
+
+
+def _cbor_head(major, value):
+    major <<= 5
+    if value < 24:
+        return struct.pack('B', major | value)
+    if value <= 0xFF:
+        return struct.pack('>BB', major | 24, value)
+    if value <= 0xFFFF:
+        return struct.pack('>BH', major | 25, value)
+    if value <= 0xFFFFFFFF:
+        return struct.pack('>BI', major | 26, value)
+    return struct.pack('>BQ', major | 27, value)
+
+
+def _pack_cbor(obj, out):
+    if obj is None:
+        out.append(b'\xf6')
+    elif obj is True:
+        out.append(b'\xf5')
+    elif obj is False:
+        out.append(b'\xf4')
+    elif isinstance(obj, int):
+        major, value = (0, obj) if obj >= 0 else (1, -1 - obj)
+        if value <= _UINT64_MAX:
+            out.append(_cbor_head(major, value))
+        else:
+            # bignum, tag 2 (positive) or 3 (negative)
+            data = value.to_bytes((value.bit_length() + 7) // 8, 'big')
+            out.append(_cbor_head(6, 2 + major))
+            out.append(_cbor_head(2, len(data)))
+            out.append(data)
+    elif isinstance(obj, float):
+        out.append(struct.pack('>Bd', 0xfb, obj))
+    elif isinstance(obj, str):
+        data = obj.encode('utf-8')
+        out.append(_cbor_head(3, len(data)))
+        out.append(data)
+    elif isinstance(obj, (bytes, bytearray, memoryview)):
+        out.append(_cbor_head(2, len(obj)))
+        out.append(bytes(obj))
+    elif isinstance(obj, (list, tuple)):
+        out.append(_cbor_head(4, len(obj)))
+        for item in obj:
+            _pack_cbor(item, out)
+    elif isinstance(obj, dict):
+        out.append(_cbor_head(5, len(obj)))
+        for key, value in obj.items():
+            _pack_cbor(key, out)
+            _pack_cbor(value, out)
+    else:
+        _pack_cbor(registry.encode(obj), out)
+
+
+_CBOR_LENGTHS = {24: ('>B', 1), 25: ('>H', 2), 26: ('>I', 4), 27: ('>Q', 8)}
+_CBOR_SIMPLE = {20: False, 21: True, 22: None, 23: None}
+_CBOR_FLOATS = {25: ('>e', 2), 26: ('>f', 4), 27: ('>d', 8)}
+_CBOR_KINDS = {2: bytes, 3: str, 4: list, 5: dict}
+_BREAK = object()
+
+
+def _unpack_cbor(reader):
+    initial = reader.unpack('B', 1)
+    major, info = initial >> 5, initial & 0x1f
+    if major == 7:
+        if info in _CBOR_SIMPLE:
+            return _CBOR_SIMPLE[info]
+        if info in _CBOR_FLOATS:
+            return reader.unpack(*_CBOR_FLOATS[info])
+        if info == 31:
+            return _BREAK
+        raise ValueError('Unsupported CBOR simple value %d' % info)
+    if info < 24:
+        value = info
+    elif info in _CBOR_LENGTHS:
+        value = reader.unpack(*_CBOR_LENGTHS[info])
+    elif info == 31 and major in _CBOR_KINDS:
+        return _unpack_indefinite(_CBOR_KINDS[major], reader)
+    else:
+        raise ValueError('Invalid CBOR header 0x%02x' % initial)
+    if major == 0:
+        return value
+    if major == 1:
+        return -1 - value
+    if major == 6:
+        item = _unpack_cbor_item(reader)
+        if value in (2, 3) and isinstance(item, bytes):
+            number = int.from_bytes(item, 'big')
+            return number if value == 2 else -1 - number
+        # other tags are not interpreted, the tagged item is returned
+        return item
+    return _build(_CBOR_KINDS[major], value, reader, _unpack_cbor_item)
+
+
+def _unpack_cbor_item(reader):
+    """Decodes a data item, a break is only valid in indefinite length items"""
+    item = _unpack_cbor(reader)
+    if item is _BREAK:
+        raise ValueError('Unexpected CBOR break')
+    return item
+
+
+def _unpack_indefinite(kind, reader):
+    items = []
+    while True:
+        item = _unpack_cbor(reader)
+        if item is _BREAK:
+            break
+        items.append(item)
+    if kind is bytes:
+        return b''.join(items)
+    if kind is str:
+        return ''.join(items)
+    if kind is list:
+        return items
+    if len(items) % 2:
+        raise ValueError('Indefinite CBOR map without a value for its last key')
+    try:
+        return dict(zip(items[::2], items[1::2]))
+    except TypeError:
+        raise ValueError('Unsupported map key')
+
+
+class CborCodec(BinaryCodec):
+    """
+    CBOR codec in pure python. Integers wider than 64 bits are encoded as
+    bignums; tags other than bignums are ignored when decoding.
+    """
+    name = 'cbor'
+    media_types = ('application/cbor',)
+
+    def dumps(self, obj):
+        out = []
+        _pack_cbor(obj, out)
+        return b''.join(out)
+
+    def loads(self, data):
+        return _decode_all(_unpack_cbor_item, data)
+
+
+CODECS = {
+    MsgPackCodec.name: MsgPackCodec,
+    CborCodec.name: CborCodec,
+}
+
+_instances = {}
+
+
+def get_binary_codec(name):
+    """
+    Returns the codec named name, created on first use
+
+    Raises:
+        KeyError: if there is no such codec
+    """
+    codec = _instances.get(name)
+    if codec is None:
+        codec = _instances[name] = CODECS[name]()
+    return codec
+
+
+def codec_for_content_type(content_type):
+    """Returns the codec of the media type of a Content-Type header, or None"""
+    media_type = (content_type or '').split(';')[0].strip().lower()
+    for name, cls in CODECS.items():
+        if media_type in cls.media_types:
+            return get_binary_codec(name)
+    return None
+
+
+def parse_accept(header):
+    """
+    Parses an Accept header
+
+    Args:
+        header (str): Accept header value
+
+    Returns:
+        weights (dict): lower cased media ranges mapped to their q-value
+    """
+    weights = {}
+    for item in (header or '').split(','):
+        parts = item.split(';')
+        media_range = parts[0].strip().lower()
+        if not media_range:
+            continue
+        weight = 1.0
+        for param in parts[1:]:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[media_range] = weight
+    return weights
+
+
+class BinaryFormats:
+    """
+    Binary encodings offered for response bodies
+
+    A binary encoding is used only when the Accept header names one of its media
+    types explicitly, with a q-value at least that of JSON; wildcards and
+    requests without an Accept header get JSON.
+
+    Args:
+        formats (tuple): names of the codecs to offer in order of preference,
+            ``msgpack`` and ``cbor`` by default
+
+    Raises:
+        ValueError: if a format is unknown
+    """
+    def __init__(self, formats=('msgpack', 'cbor')):
+        unsupported = [f for f in formats if f not in CODECS]
+        if unsupported:
+            raise ValueError('Unsupported formats: %s' % ', '.join(unsupported))
+        self.formats = tuple(formats)
+
+    def negotiate(self, accept):
+        """
+        Picks the encoding of a response
+
+        Args:
+            accept (str): the request's Accept header
+
+        Returns:
+            codec (BinaryCodec): codec to encode the body with, None for JSON
+            media_type (str): the Content-Type of the body, None for JSON
+        """
+        if not accept:
+            return None, None
+        weights = parse_accept(accept)
+        json_weight = max(
+            weights.get('application/json', 0.0), weights.get('application/*', 0.0),
+            weights.get('*/*', 0.0)
+        )
+        best, best_type, best_weight = None, None, 0.0
+        for name in self.formats:
+            for media_type in CODECS[name].media_types:
+                weight = weights.get(media_type, 0.0)
+                if weight > best_weight:
+                    best, best_type, best_weight = name, media_type, weight
+        if best is None or best_weight < json_weight:
+            return None, None
+        return get_binary_codec(best), best_type
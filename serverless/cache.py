@@ -0,0 +1,405 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Caching of handler outputs, for idempotent requests and read-mostly endpoints.
+
+The AWS Lambda output of a successful invocation is stored under a fingerprint of
+the request, so repeated requests are answered without running the handler or
+serializing the response again. Outputs are kept in an LRU of the container and
+optionally in a backend shared between containers, which also collapses
+concurrent duplicates: while one invocation runs the handler, the others wait
+for its output.
+
+Example:
+    from serverless import lambda_handler, Response
+    from serverless.cache import cached_response, SQLiteCache
+
+    backend = SQLiteCache('/mnt/efs/responses.db')
+
+    @cached_response(ttl=3600, headers=('Idempotency-Key',), backend=backend)
+    @lambda_handler
+    def handler(req):
+        return Response(create_order(req.data), 201)
+"""
+from collections import OrderedDict
+from functools import partial, wraps
+import hashlib
+import json
+import threading
+import time
+
+from serverless.exceptions import BadRequest, Conflict
+
+
+class CacheBackend:
+    """
+    Interface of the stores outputs are cached in. Values are JSON serializable
+    dicts and expire ttl seconds after they were stored.
+    """
+    def get(self, key):
+        """Returns the value stored under key, None if missing or expired"""
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        """Stores value under key"""
+        raise NotImplementedError
+
+    def add(self, key, value, ttl):
+        """Stores value under key unless a value exists, returns whether it did"""
+        raise NotImplementedError
+
+    def delete(self, key):
+        """Removes the value stored under key"""
+        raise NotImplementedError
+
+
+class MemoryCache(CacheBackend):
+    """
+    In-process LRU cache with expiry
+
+    Args:
+        max_entries (int): least recently used entries are evicted beyond this
+    """
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def add(self, key, value, ttl):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return False
+            self._store(key, value, ttl)
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _store(self, key, value, ttl):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class SQLiteCache(CacheBackend):
+    """
+    Cache backend in a SQLite file, shared by the containers that mount it (e.g.
+    on EFS) and handy as a stand-in for a shared store in tests
+
+    Args:
+        path (str): database file, created if missing
+        table (str): table name
+    """
+    def __init__(self, path, table='responses'):
+        import sqlite3
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS %s '
+            '(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)' % table
+        )
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value FROM %s WHERE key = ? AND expires > ?' % self.table,
+                (key, time.time())
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO %s VALUES (?, ?, ?)' % self.table,
+                (key, json.dumps(value), time.time() + ttl)
+            )
+
+    def add(self, key, value, ttl):
+        now = time.time()
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._conn.execute(
+                    'DELETE FROM %s WHERE key = ? AND expires <= ?' % self.table,
+                    (key, now)
+                )
+                cursor = self._conn.execute(
+                    'INSERT OR IGNORE INTO %s VALUES (?, ?, ?)' % self.table,
+                    (key, json.dumps(value), now + ttl)
+                )
+            finally:
+                self._conn.execute('COMMIT')
+        return cursor.rowcount == 1
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute('DELETE FROM %s WHERE key = ?' % self.table, (key,))
+
+
+def request_key(req, body_fields=None, headers=None):
+    """
+    Returns the fingerprint of a request: a hash of its method, path, path
+    parameters, query and the given body fields and headers
+
+    Args:
+        req (Request): the request
+        body_fields (tuple): top level fields of the JSON body, True for the
+            whole body
+        headers (tuple): header names, e.g. ``('Idempotency-Key',)``
+    """
+    parts = [
+        req.method, req.path, sorted(req.params.items()), sorted(req.multi_query.items())
+    ]
+    if body_fields is True:
+        parts.append(req.body)
+    elif body_fields:
+        data = req.data
+        parts.append([data.get(field) for field in body_fields])
+    if headers:
+        parts.append([req.get_header(name) for name in headers])
+    raw = json.dumps(parts, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+# request headers lambda_handler negotiates response bodies on, see its Vary header
+NEGOTIATED_HEADERS = ('Accept', 'Accept-Encoding')
+
+
+def _vary_key(cache_key, req):
+    """
+    Returns cache_key combined with the negotiated headers of req, cache_key
+    itself when req sends none of them
+    """
+    values = [req.get_header(name) for name in NEGOTIATED_HEADERS]
+    if not any(values):
+        return cache_key
+    parts = [cache_key, values]
+    raw = json.dumps(parts, separators=(',', ':'))
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+# request headers identifying the user, requests sending them are only cached
+# when the key includes them
+IDENTITY_HEADERS = ('Authorization', 'Cookie')
+
+
+def _is_cacheable_request(req, keyed_headers):
+    """
+    Returns whether req may be answered from the cache: it sends no identity
+    header left out of the key, and no If-None-Match header, which the handler
+    answers with ``304 Not Modified``
+    """
+    for name in IDENTITY_HEADERS:
+        if name.lower() not in keyed_headers and req.get_header(name) is not None:
+            return False
+    return req.get_header('If-None-Match') is None
+
+
+def _vary(output):
+    """Returns the lowercased header names of the Vary header of output"""
+    for name, value in (output.get('headers') or {}).items():
+        if name.lower() == 'vary':
+            return set(v.strip().lower() for v in value.split(',') if v.strip())
+    return set()
+
+
+def _is_cacheable(output, keyed_headers):
+    """
+    Returns whether output is a success whose Vary header only lists headers
+    the cache key is made of
+    """
+    return (
+        200 <= output.get('statusCode', 500) < 300 and
+        _vary(output) <= keyed_headers
+    )
+
+
+class _Flight:
+    """An invocation in progress in this container, awaited by its duplicates"""
+    def __init__(self):
+        self.done = threading.Event()
+        self.output = None
+
+
+_PENDING = {'pending': True}
+_TIMED_OUT = object()
+
+
+def cached_response(func=None, ttl=60, key=None, body_fields=None, headers=None,
+                    backend=None, max_entries=1024, wait=5.0):
+    """
+    A decorator for functions decorated with lambda_handler that caches their
+    successful (2xx) outputs
+
+    Outputs are cached per value of the Accept and Accept-Encoding headers, so
+    compressed or binary encoded bodies are only sent to requests that asked for
+    them. Outputs whose Vary header lists other headers are cached only when
+    those are part of headers. Requests sending Authorization or Cookie headers
+    left out of headers, and conditional requests (If-None-Match), always run
+    the handler.
+
+    Example:
+        @cached_response(ttl=30, body_fields=('order_id',))
+        @lambda_handler
+        def handler(req):
+            ...
+
+    Args:
+        func (function): a lambda_handler wrapped function to be decorated
+        ttl (float): seconds outputs are cached for
+        key (function): returns the cache key (str) of a Request, request_key
+            with body_fields and headers by default
+        body_fields (tuple): body fields included in the default key
+        headers (tuple): headers included in the default key, e.g.
+            ``('Authorization',)`` to cache responses per user
+        backend (CacheBackend): shared cache consulted after the container LRU
+        max_entries (int): size of the container LRU, 0 to disable it
+        wait (float): seconds a duplicate of a request in progress in another
+            container waits for its output before it is answered with
+            ``409 Conflict``
+
+    Returns:
+        func_wrapper (function): a wrapper function that is invoked via lambda
+    """
+    if func is None:
+        return partial(
+            cached_response, ttl=ttl, key=key, body_fields=body_fields,
+            headers=headers, backend=backend, max_entries=max_entries, wait=wait
+        )
+
+    from serverless.decorators import to_exception_response
+    from serverless.wrappers import Request
+
+    if key is None:
+        key = partial(request_key, body_fields=body_fields, headers=headers)
+    local = MemoryCache(max_entries) if max_entries else None
+    flights = {}
+    flights_lock = threading.Lock()
+    keyed_headers = set(
+        name.lower() for name in NEGOTIATED_HEADERS + tuple(headers or ())
+    )
+
+    def run(cache_key, event, context):
+        if backend is not None:
+            entry = backend.get(cache_key)
+            while entry is not None or not backend.add(cache_key, _PENDING, wait):
+                if entry is not None and 'output' in entry:
+                    if local is not None:
+                        local.set(cache_key, entry['output'], ttl)
+                    return entry['output']
+                # in progress in another container
+                entry = _await(cache_key)
+                if entry is _TIMED_OUT:
+                    exc = Conflict('Request is already in progress')
+                    return to_exception_response(exc).to_lambda_output(
+                        Request(event, context)
+                    )
+
+        try:
+            output = func(event, context)
+        except BaseException:
+            if backend is not None:
+                backend.delete(cache_key)
+            raise
+
+        if _is_cacheable(output, keyed_headers):
+            if backend is not None:
+                backend.set(cache_key, {'output': output}, ttl)
+            if local is not None:
+                local.set(cache_key, output, ttl)
+        elif backend is not None:
+            backend.delete(cache_key)
+        return output
+
+    def _await(cache_key):
+        """
+        Polls backend while cache_key is in progress elsewhere, returns its entry,
+        None if it was released without an output, or _TIMED_OUT after wait seconds
+        """
+        deadline = time.monotonic() + wait
+        delay = 0.01
+        while time.monotonic() < deadline:
+            time.sleep(delay)
+            delay = min(delay * 2, 0.2)
+            entry = backend.get(cache_key)
+            if entry is None or 'output' in entry:
+                return entry
+        return _TIMED_OUT
+
+    @wraps(func)
+    def func_wrapper(event, context):
+        """
+        This is what's invoked via lambda.
+
+        Args:
+            event (dict): AWS Lambda event
+            context (LambdaContext): AWS Lambda context
+        """
+        try:
+            req = Request(event, context)
+            if not _is_cacheable_request(req, keyed_headers):
+                return func(event, context)
+            cache_key = _vary_key(key(req), req)
+        except BadRequest:
+            # the handler answers malformed bodies
+            return func(event, context)
+
+        output = local.get(cache_key) if local is not None else None
+        if output is not None:
+            return dict(output)
+
+        with flights_lock:
+            flight = flights.get(cache_key)
+            leader = flight is None
+            if leader:
+                flight = flights[cache_key] = _Flight()
+        if not leader:
+            flight.done.wait()
+            if flight.output is not None:
+                return dict(flight.output)
+            return func(event, context)
+
+        try:
+            output = run(cache_key, event, context)
+            flight.output = output
+        finally:
+            with flights_lock:
+                del flights[cache_key]
+            flight.done.set()
+        return dict(output)
+
+    func_wrapper.cache = local
+    return func_wrapper
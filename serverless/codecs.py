@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+JSON codecs used to decode request bodies and encode response bodies.
+
+A codec is picked per ``lambda_handler`` (``codec=`` argument), per ``Request`` /
+``Response`` instance, or per process via ``set_default_codec`` or the
+``SERVERLESS_JSON_CODEC`` environment variable. When none is configured, orjson is
+used if it is installed, otherwise the stdlib ``json`` module.
+"""
+import json
+import os
+
+from serverless.encoders import ServerlessJsonEncoder, registry
+
+
+class JsonCodec(object):
+    """
+    Base class for JSON codecs
+
+    Attributes:
+        name (str): name the codec is registered under
+        item_separator (str): separator between array items and object members
+        key_separator (str): separator between object keys and values
+    """
+    name = None
+    item_separator = ', '
+    key_separator = ': '
+
+    def dumps(self, obj):
+        """
+        Serializes obj to a JSON formatted str
+
+        Raises:
+            TypeError: if obj is not JSON serializable
+        """
+        raise NotImplementedError
+
+    def loads(self, s):
+        """
+        Deserializes s (a str or bytes containing a JSON document)
+
+        Raises:
+            ValueError: if s is not a valid JSON document
+        """
+        raise NotImplementedError
+
+
+class StdlibJsonCodec(JsonCodec):
+    """
+    Codec backed by python's ``json`` module
+
+    Args:
+        encoder_cls (type): JSONEncoder subclass, ServerlessJsonEncoder by default
+    """
+    name = 'json'
+
+    def __init__(self, encoder_cls=ServerlessJsonEncoder):
+        self.encoder_cls = encoder_cls
+
+    def dumps(self, obj):
+        return json.dumps(obj, cls=self.encoder_cls)
+
+    def loads(self, s):
+        return json.loads(s)
+
+
+class OrjsonCodec(JsonCodec):
+    """
+    Codec backed by orjson. ``date``, ``datetime`` and ``UUID`` values are encoded
+    byte for byte the same as ServerlessJsonEncoder does; output is compact and
+    non-ASCII characters are not escaped.
+
+    NaN and Infinity are encoded as null, as they are not valid JSON. Values
+    orjson refuses (e.g. integers wider than 64 bits) are encoded in the same
+    compact format by the stdlib ``json`` module instead.
+
+    Raises:
+        ImportError: if orjson is not installed
+    """
+    name = 'orjson'
+    item_separator = ','
+    key_separator = ':'
+
+    def __init__(self):
+        import orjson # pylint: disable=E0401
+        self._orjson = orjson
+        self._option = orjson.OPT_NON_STR_KEYS
+        self._default = registry.encode
+
+    def dumps(self, obj):
+        try:
+            return self._orjson.dumps(
+                obj, default=self._default, option=self._option
+            ).decode('utf-8')
+        except self._orjson.JSONEncodeError:
+            return self._fallback(obj)
+
+    def _fallback(self, obj):
+        return json.dumps(
+            obj, cls=ServerlessJsonEncoder, ensure_ascii=False,
+            separators=(self.item_separator, self.key_separator)
+        )
+
+    def loads(self, s):
+        return self._orjson.loads(s)
+
+
+_codecs = {}
+_default_codec = None
+
+
+def register_codec(codec):
+    """
+    Registers codec under its name so it can be referred to by name
+
+    Args:
+        codec (JsonCodec or type): codec to register, or a JsonCodec subclass that
+            is instantiated on first use. A class whose instantiation raises
+            ImportError is treated as unavailable.
+    """
+    _codecs[codec.name] = codec
+
+
+def _resolve(name):
+    """
+    Returns the codec registered under name, instantiating it if needed
+
+    Raises:
+        KeyError: if there is no available codec registered under name
+    """
+    codec = _codecs[name]
+    if isinstance(codec, type):
+        try:
+            codec = codec()
+        except ImportError:
+            del _codecs[name]
+            raise KeyError(name)
+        _codecs[name] = codec
+    return codec
+
+
+def available_codecs():
+    """Returns names of the registered codecs that can be used"""
+    names = []
+    for name in list(_codecs):
+        try:
+            _resolve(name)
+        except KeyError:
+            continue
+        names.append(name)
+    return names
+
+
+def set_default_codec(codec):
+    """
+    Sets the codec used when none is given to Request, Response or lambda_handler
+
+    Args:
+        codec (JsonCodec or str): codec instance or registered codec name
+
+    Raises:
+        ValueError: if codec is an unknown name
+    """
+    global _default_codec # pylint: disable=W0603
+    _default_codec = get_codec(codec) if codec is not None else None
+
+
+def get_codec(codec=None):
+    """
+    Resolves codec to a JsonCodec instance
+
+    Args:
+        codec (JsonCodec or str): codec instance, registered codec name or None
+            for the process default
+
+    Returns:
+        codec (JsonCodec): the resolved codec
+
+    Raises:
+        ValueError: if codec is an unknown name
+    """
+    if isinstance(codec, JsonCodec):
+        return codec
+    if codec is None:
+        if _default_codec is not None:
+            return _default_codec
+        codec = os.environ.get('SERVERLESS_JSON_CODEC')
+        if not codec:
+            try:
+                return _resolve(OrjsonCodec.name)
+            except KeyError:
+                codec = StdlibJsonCodec.name
+    try:
+        return _resolve(codec)
+    except KeyError:
+        raise ValueError('Unknown JSON codec: %r' % (codec,))
+
+
+register_codec(StdlibJsonCodec())
+# orjson is only imported once a codec is first needed
+register_codec(OrjsonCodec)
@@ -19,9 +19,21 @@ import sys
 
 PY3 = sys.version_info[0] == 3
 
+# inspect.CO_COROUTINE, without the cost of importing inspect
+CO_COROUTINE = 0x80
 
 
 if PY3:
+    from collections.abc import Mapping, MutableMapping
     from json import JSONDecodeError
+    from types import MappingProxyType
 else:
+    from collections import Mapping, MutableMapping
     JSONDecodeError = ValueError
+    MappingProxyType = dict
+
+
+def iscoroutinefunction(func):
+    """Returns whether func is an ``async def`` function"""
+    code = getattr(func, '__code__', None)
+    return bool(code is not None and code.co_flags & CO_COROUTINE)
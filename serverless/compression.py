@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Response body compression negotiated from the Accept-Encoding header, and
+decompression of request bodies sent with a Content-Encoding
+"""
+import base64
+import zlib
+
+from serverless.exceptions import BadRequest, PayloadTooLarge, UnsupportedMediaType
+
+try:
+    import brotli # pylint: disable=E0401
+except ImportError:
+    brotli = None
+
+
+def _gzip(data, level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _deflate(data, level):
+    return zlib.compress(data, level)
+
+
+def _brotli(data, level):
+    return brotli.compress(data, quality=min(level, 11))
+
+
+COMPRESSORS = {
+    'gzip': _gzip,
+    'deflate': _deflate,
+}
+if brotli is not None:
+    COMPRESSORS['br'] = _brotli
+
+
+# window bits of zlib.decompressobj for the request codings
+DECOMPRESS_WBITS = {
+    'gzip': 16 + zlib.MAX_WBITS,
+    'x-gzip': 16 + zlib.MAX_WBITS,
+    'deflate': zlib.MAX_WBITS,
+}
+
+# largest request body accepted after decompression
+DEFAULT_MAX_BODY_SIZE = 32 * 1024 * 1024
+
+
+def decompress(data, coding, max_size=None):
+    """
+    Decompresses a request body, without ever holding more than max_size bytes
+    of output so that compression bombs are rejected cheaply
+
+    Args:
+        data (bytes): the body as received
+        coding (str): lower cased Content-Encoding of the body
+        max_size (int): maximum size of the decompressed body,
+            DEFAULT_MAX_BODY_SIZE if None
+
+    Returns:
+        data (bytes): the decompressed body
+
+    Raises:
+        UnsupportedMediaType: if coding is not gzip or deflate
+        PayloadTooLarge: if the decompressed body exceeds max_size bytes
+        BadRequest: if data is not valid for coding
+    """
+    wbits = DECOMPRESS_WBITS.get(coding)
+    if wbits is None:
+        raise UnsupportedMediaType(
+            'Unsupported Content-Encoding', ({'encoding': coding},)
+        )
+    if max_size is None:
+        max_size = DEFAULT_MAX_BODY_SIZE
+    decompressor = zlib.decompressobj(wbits)
+    try:
+        body = decompressor.decompress(data, max_size + 1)
+    except zlib.error as e:
+        raise BadRequest('Malformed compressed request body', (str(e),))
+    if len(body) > max_size:
+        raise PayloadTooLarge(
+            'Decompressed request body is too large', ({'max_size': max_size},)
+        )
+    if not decompressor.eof:
+        raise BadRequest('Malformed compressed request body', ('truncated data',))
+    return body
+
+
+def parse_accept_encoding(header):
+    """
+    Parses an Accept-Encoding header
+
+    Args:
+        header (str): Accept-Encoding header value
+
+    Returns:
+        weights (dict): lower cased coding names mapped to their q-value
+    """
+    weights = {}
+    for item in (header or '').split(','):
+        parts = item.split(';')
+        coding = parts[0].strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        for param in parts[1:]:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding] = weight
+    return weights
+
+
+class Compression:
+    """
+    Compression settings for responses
+
+    Args:
+        min_size (int): bodies smaller than this many bytes are sent uncompressed
+        encodings (tuple): codings to offer in order of preference, every
+            supported one by default (br when brotli is installed, gzip, deflate)
+        level (int): compression level
+    """
+    def __init__(self, min_size=1024, encodings=None, level=6):
+        self.min_size = min_size
+        self.level = level
+        if encodings is None:
+            encodings = tuple(e for e in ('br', 'gzip', 'deflate') if e in COMPRESSORS)
+        unsupported = [e for e in encodings if e not in COMPRESSORS]
+        if unsupported:
+            raise ValueError('Unsupported encodings: %s' % ', '.join(unsupported))
+        self.encodings = tuple(encodings)
+
+    def negotiate(self, accept_encoding):
+        """
+        Picks the coding to use for a request
+
+        Args:
+            accept_encoding (str): the request's Accept-Encoding header
+
+        Returns:
+            coding (str): one of self.encodings, or None to send the body as is
+        """
+        weights = parse_accept_encoding(accept_encoding)
+        wildcard = weights.get('*', 0.0)
+        best, best_weight = None, 0.0
+        for coding in self.encodings:
+            weight = weights.get(coding, wildcard)
+            if weight > best_weight:
+                best, best_weight = coding, weight
+        return best
+
+    def compress(self, data, coding):
+        """Returns data (bytes) compressed with coding"""
+        return COMPRESSORS[coding](data, self.level)
+
+    def apply(self, output, accept_encoding):
+        """
+        Compresses the body of a Lambda output in place when the client accepts
+        one of self.encodings and the body is at least min_size bytes long.
+
+        Args:
+            output (dict): AWS Lambda compatible response with a text body
+            accept_encoding (str): the request's Accept-Encoding header
+
+        Returns:
+            output (dict): the given output
+        """
+        headers = output['headers'] = dict(output['headers'])
+        vary = headers.get('Vary')
+        if not vary:
+            headers['Vary'] = 'Accept-Encoding'
+        elif 'accept-encoding' not in vary.lower():
+            headers['Vary'] = vary + ', Accept-Encoding'
+
+        body = output.get('body')
+        if not body or output.get('isBase64Encoded') or 'Content-Encoding' in headers:
+            return output
+
+        coding = self.negotiate(accept_encoding)
+        if coding is None:
+            return output
+
+        data = body.encode('utf-8')
+        if len(data) < self.min_size:
+            return output
+
+        output['body'] = base64.b64encode(self.compress(data, coding)).decode('ascii')
+        output['isBase64Encoded'] = True
+        headers['Content-Encoding'] = coding
+        etag = headers.get('ETag')
+        if etag and not etag.startswith('W/'):
+            # the compressed bytes differ from what a strong tag vouches for
+            headers['ETag'] = 'W/' + etag
+        return output
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Answering requests before AWS Lambda ends an invocation that runs out of time.
+
+When a function times out, API Gateway answers ``502`` only after the full
+timeout. With a deadline, the handler runs on a worker thread and the request is
+answered with ``504 Gateway Timeout`` once the time left of the invocation falls
+to the margin. The handler is told through ``req.deadline`` and should stop, as
+Python threads cannot be interrupted; ``async def`` handlers are cancelled.
+"""
+import threading
+import time
+
+from serverless.exceptions import GatewayTimeout, ServiceUnavailable
+
+
+def remaining_seconds(context, margin=0.0):
+    """
+    Returns the seconds left of an invocation less margin, None if unknown
+
+    Args:
+        context (LambdaContext): AWS Lambda context
+        margin (float): seconds kept to build the response
+    """
+    get_remaining = getattr(context, 'get_remaining_time_in_millis', None)
+    if get_remaining is None:
+        return None
+    return max(get_remaining() / 1000.0 - margin, 0.0)
+
+
+class Deadline:
+    """
+    Time limit of a request and its cooperative cancellation signal, available
+    as ``req.deadline``
+
+    Example:
+        for item in items:
+            req.deadline.check()
+            process(item)
+
+    Args:
+        seconds (float): seconds from now, no limit if None
+    """
+    def __init__(self, seconds=None):
+        self.expires = None if seconds is None else time.monotonic() + seconds
+        self._cancelled = threading.Event()
+
+    @classmethod
+    def from_context(cls, context, margin=0.0):
+        """Returns the Deadline of an invocation, margin seconds before its timeout"""
+        return cls(remaining_seconds(context, margin))
+
+    def remaining(self):
+        """Returns the seconds left, None if there is no limit"""
+        if self.expires is None:
+            return None
+        return max(self.expires - time.monotonic(), 0.0)
+
+    @property
+    def cancelled(self):
+        """Returns whether the request was answered already or its time is up"""
+        return self._cancelled.is_set() or (
+            self.expires is not None and time.monotonic() >= self.expires
+        )
+
+    def cancel(self):
+        """Signals that the request was answered without waiting for the handler"""
+        self._cancelled.set()
+
+    def check(self):
+        """
+        Raises GatewayTimeout if the deadline was cancelled or passed
+
+        Raises:
+            GatewayTimeout: if the handler should stop
+        """
+        if self.cancelled:
+            raise GatewayTimeout('Request did not complete in time')
+
+    def sleep(self, seconds):
+        """Sleeps for seconds unless cancelled meanwhile, returns whether it was"""
+        return self._cancelled.wait(seconds)
+
+
+# deadline of requests that are not guarded, never cancelled
+NO_DEADLINE = Deadline()
+
+
+class DeadlineGuard:
+    """
+    Runs the handler of lambda_handler within the deadline of each request
+
+    Args:
+        margin (float): seconds before the timeout of an invocation at which
+            the request is answered
+    """
+    def __init__(self, margin):
+        self.margin = margin
+        self._executor = None
+        self._future = None
+
+    def deadline(self, context):
+        """Returns the Deadline of an invocation"""
+        return Deadline.from_context(context, self.margin)
+
+    def call(self, func, req, run=None):
+        """
+        Returns func(req), or raises once req.deadline passes
+
+        Args:
+            func (function): the handler function
+            req (Request): the request, with the deadline of this guard
+            run (function): runs the coroutine of an ``async def`` handler
+
+        Raises:
+            ServiceUnavailable: if the invocation has no time left or a handler
+                that timed out earlier is still running
+            GatewayTimeout: if the handler did not return in time
+        """
+        deadline = req.deadline
+        remaining = deadline.remaining()
+        if remaining is not None and remaining <= 0.0:
+            raise ServiceUnavailable('Not enough time left to handle the request')
+
+        if run is not None:
+            import asyncio
+            try:
+                return run(asyncio.wait_for(func(req), remaining))
+            except asyncio.TimeoutError:
+                deadline.cancel()
+                raise GatewayTimeout('Request did not complete in time')
+
+        if remaining is None:
+            return func(req)
+
+        if self._future is not None and not self._future.done():
+            raise ServiceUnavailable('A request that timed out is still being handled')
+
+        from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+        future = self._future = self._executor.submit(func, req)
+        try:
+            return future.result(remaining)
+        except FutureTimeout:
+            deadline.cancel()
+            raise GatewayTimeout('Request did not complete in time')
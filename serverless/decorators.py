@@ -15,29 +15,98 @@
 # limitations under the License.
 
 """Decorators for AWS Lambda handler functions"""
-from functools import wraps
-import logging
+from functools import partial, wraps
 
-from serverless.wrappers import Request, Response
+from serverless.codecs import get_codec
+from serverless.compat import iscoroutinefunction
+from serverless.events import detect, get_format
+from serverless.metrics import NULL_TIMINGS
+from serverless.wrappers import Record, Request, Response
 from serverless.exceptions import ServerlessError
 
 
-def to_error_response(message, errors, status_code=500):
-    """Returns Response created with the given message, errors, and status_code"""
+def _get_logger():
+    """Returns the module logger, logging is imported on first use"""
+    import logging
+    return logging.getLogger(__name__)
+
+
+def to_error_response(message, errors, status_code=500, codec=None):
+    """
+    Returns Response created with the given message, errors, and status_code
+
+    Args:
+        codec (JsonCodec or str): JSON codec of the body, process default if omitted
+    """
     data = {
         'message': message,
         'errors': errors
     }
 
-    return Response(data, status_code)
+    # other empty values, e.g. None, serialize differently
+    if errors == () and isinstance(message, str):
+        return _cached_error_response(data, status_code, codec)
+    return Response(data, status_code, codec=codec)
+
 
+# serialized bodies of error responses without errors, by codec and message
+_error_bodies = {}
+MAX_CACHED_ERROR_BODIES = 256
 
-def lambda_handler(func):
+
+def _cached_error_response(data, status_code, codec):
+    """
+    Returns an error Response whose body is serialized once per codec and message.
+    Messages are cached until MAX_CACHED_ERROR_BODIES is reached, so that
+    messages built from request data do not grow the cache.
+    """
+    resp = Response(data, status_code, codec=codec)
+    key = (get_codec(codec), data['message'])
+    body = _error_bodies.get(key)
+    if body is None:
+        body = resp.body
+        if len(_error_bodies) < MAX_CACHED_ERROR_BODIES:
+            _error_bodies[key] = body
+    resp._body = body # pylint: disable=W0212
+    return resp
+
+
+def to_exception_response(exc, req=None):
+    """
+    Returns error Response for an exception raised while handling a request.
+    ServerlessError is mapped to its status code, anything else is logged and
+    mapped to ``500 InternalServerError``.
+
+    Args:
+        exc (Exception): the exception being handled
+        req (Request): the request being answered. The body is serialized with
+            its codec, unexpected errors are logged to its logger when its handler
+            has logging settings and to the module logger otherwise.
+    """
+    codec = req.codec if req is not None else None
+    if isinstance(exc, ServerlessError):
+        message = exc.message if exc.message else exc.__class__.__name__
+        return to_error_response(message, exc.errors, exc.status_code, codec)
+
+    if req is not None and req._log_settings is not None: # pylint: disable=W0212
+        req.logger.exception(exc)
+    else:
+        _get_logger().exception(exc)
+    return to_error_response('InternalServerError', tuple(), 500, codec)
+
+
+def lambda_handler(func=None, codec=None, compression=None, etag=False, resources=None,
+                   metrics=None, max_response_size=None, spill=None, logger=None,
+                   event_format=None, timeout_margin=None, warmup=None,
+                   max_body_size=None, binary_formats=None, fields=None):
     """
     A decorator for lambda handler that converts output of handler function
     to AWS Lambda response format. The wrapped handler function should return
     Response or Exception.
 
+    The handler may be an ``async def`` function, it is then run on an event loop
+    that is kept for the lifetime of the container (see ``serverless.aio``).
+
     Example:
         @lambda_handler
         def your_handler_func(req):
@@ -48,16 +117,170 @@ def lambda_handler(func):
 
             return Response(data, 203)
 
+        # options can be passed by calling the decorator with keyword arguments
+        @lambda_handler(codec='json')
+        def your_other_handler_func(req):
+            return Response({})
+
+    Annotated parameters of the handler after req are taken from the path
+    parameters, query string or JSON body and converted to their annotation, e.g.
+    ``def handler(req, user_id: int, since: date = None)``. The signature is
+    compiled when the handler is decorated (see serverless.injection).
+
     Args:
         func (function): a handler function to be decorated
+        codec (JsonCodec or str): JSON codec used for the request body and for
+            responses that do not set their own, process default if omitted
+        compression (Compression or bool): compresses response bodies according to
+            the request's Accept-Encoding header, True for the default settings
+        etag (bool): computes an ETag for responses that do not set their own and
+            answers matching If-None-Match requests with ``304 Not Modified``
+        resources (dict or Resources): container resources built on first use and
+            reused across warm invocations, available as ``req.resources``. Values
+            are Resource instances or factory functions (see serverless.resources).
+        metrics (Metrics or bool): times the phases of each invocation and publishes
+            them as EMF log lines and optionally a Server-Timing header, True for the
+            default settings (see serverless.metrics)
+        max_response_size (int or bool): maximum body size in bytes of responses
+            that do not set their own max_size, measured as escaped in the Lambda
+            output. True for the AWS Lambda limit less room for the headers.
+            Larger bodies are answered with ``413 PayloadTooLarge``, streamed
+            data as soon as the limit is crossed while encoding it.
+        spill (Spill): writes response bodies larger than its threshold to a blob
+            store and answers with a pointer to them (see serverless.spill)
+        logger (StructuredLogger or bool): structured logging settings of
+            ``req.logger``, True for the default settings (see serverless.logs).
+            Without it records go to the ``serverless.wrappers`` logger and
+            unexpected errors to the ``serverless.decorators`` logger.
+        event_format (EventFormat or str): format of the events, ``v1`` (REST
+            API), ``v2`` (HTTP API) or ``alb``. When omitted it is detected from
+            the first event of a known format and kept for the container while
+            the events match it.
+        timeout_margin (float or bool): answers with ``504 Gateway Timeout`` this
+            many seconds before the invocation would time out, True for one
+            second. The handler then runs on a worker thread and ``req.deadline``
+            tells it to stop (see serverless.deadline).
+        warmup (WarmUp or bool): answers warm-up pings before building a Request,
+            without running the handler, True for the default settings (see
+            serverless.warmup)
+        max_body_size (int): maximum size of request bodies sent with a
+            Content-Encoding once decompressed, larger ones are answered with
+            ``413 Payload Too Large`` (see serverless.compression.decompress)
+        binary_formats (BinaryFormats or bool): sends responses as MessagePack or
+            CBOR to requests whose Accept header asks for it, True for both (see
+            serverless.binary). Request bodies of these types are decoded by
+            ``req.data`` regardless.
+        fields (Fields or bool): prunes the data of successful responses to the
+            fields listed in the ``fields`` query parameter before serializing it,
+            True for the default settings (see serverless.fields)
 
     Returns:
-        func_wrapper (function): a wrapper function that is invoked via lambda
+        func_wrapper (function): a wrapper function that is invoked via lambda.
+            Its ``resources`` attribute holds the Resources of the handler.
 
     Raises:
         TypeErorr: if event, context are not provided when invoking func_wrapper
     """
-    logger = logging.getLogger(__name__)
+    if func is None:
+        return partial(
+            lambda_handler,
+            codec=codec, compression=compression, etag=etag, resources=resources,
+            metrics=metrics, max_response_size=max_response_size, spill=spill,
+            logger=logger, event_format=event_format, timeout_margin=timeout_margin,
+            warmup=warmup, max_body_size=max_body_size, binary_formats=binary_formats,
+            fields=fields
+        )
+
+    if compression is True:
+        from serverless.compression import Compression
+        compression = Compression()
+    elif compression is False:
+        compression = None
+    if resources is not None:
+        from serverless.resources import Resources
+        if not isinstance(resources, Resources):
+            resources = Resources(resources)
+    if metrics is True:
+        from serverless.metrics import Metrics
+        metrics = Metrics()
+    elif metrics is False:
+        metrics = None
+    if metrics is not None:
+        from serverless.metrics import Timings
+    if max_response_size is True:
+        from serverless.streaming import MAX_OUTPUT_BODY_SIZE
+        max_response_size = MAX_OUTPUT_BODY_SIZE
+    elif max_response_size is False:
+        max_response_size = None
+    if logger is True:
+        from serverless.logs import StructuredLogger
+        logger = StructuredLogger()
+    elif logger is False:
+        logger = None
+
+    if binary_formats is True:
+        from serverless.binary import BinaryFormats
+        binary_formats = BinaryFormats()
+    elif binary_formats is False:
+        binary_formats = None
+
+    if fields is True:
+        from serverless.fields import Fields
+        fields = Fields()
+    elif fields is False:
+        fields = None
+
+    detected = []
+    if event_format is not None:
+        detected.append(get_format(event_format))
+
+    def get_event_format(event):
+        if detected:
+            cached = detected[0]
+            if event_format is not None or (
+                    isinstance(event, dict) and cached.matches(event)):
+                return cached
+            # e.g. a console test event
+            return detect(event)
+        found = detect(event)
+        if found is not None:
+            detected.append(found)
+        return found
+
+    def apply_defaults(resp):
+        if resp.codec is None:
+            resp.codec = codec
+        if resp.compression is None:
+            resp.compression = compression
+        if resp.max_size is None:
+            resp.max_size = max_response_size
+        if resp.spill is None:
+            resp.spill = spill
+        if resp.binary_formats is None:
+            resp.binary_formats = binary_formats
+        if resp.fields is None:
+            resp.fields = fields
+        return resp
+
+    from serverless.injection import inject
+    handler = inject(func)
+
+    run = None
+    if iscoroutinefunction(func):
+        from serverless.aio import run
+
+    if warmup is True:
+        from serverless.warmup import WarmUp
+        warmup = WarmUp()
+    elif warmup is False:
+        warmup = None
+
+    guard = None
+    if timeout_margin is True:
+        timeout_margin = 1.0
+    if timeout_margin is not None and timeout_margin is not False:
+        from serverless.deadline import DeadlineGuard
+        guard = DeadlineGuard(timeout_margin)
 
     @wraps(func)
     def func_wrapper(event, context):
@@ -71,10 +294,25 @@ def lambda_handler(func):
         .. _AWS Lambda python programming model:
            http://docs.aws.amazon.com/lambda/latest/dg/python-programming-model-handler-types.html
         """
-        req = Request(event, context)
+        if warmup is not None and warmup.matches(event):
+            return warmup.handle(resources)
 
+        scope = resources.scope() if resources is not None else None
+        timings = Timings() if metrics is not None else NULL_TIMINGS
+        req = Request(
+            event, context, codec, scope, timings, logger, get_event_format(event),
+            guard.deadline(context) if guard is not None else None, max_body_size
+        )
+
+        timings.start('handler')
         try:
-            resp = func(req)
+            if guard is not None:
+                resp = guard.call(handler, req, run)
+            else:
+                resp = handler(req)
+                if run is not None:
+                    resp = run(resp)
+            timings.stop('handler')
 
             if not isinstance(resp, Response):
                 message = (
@@ -82,17 +320,113 @@ def lambda_handler(func):
                     'It should be either Response or Exception'
                 )
                 raise TypeError(message)
+            if resp.etag is None and etag:
+                resp.etag = True
+        except Exception as e: # pylint: disable=W0703
+            timings.stop('handler')
+            timings.start('error')
+            resp = to_exception_response(e, req)
+            timings.stop('error')
+
+        timings.start('serialize')
+        try:
+            output = apply_defaults(resp).to_lambda_output(req)
         except ServerlessError as e:
-            status_code = e.status_code
-            message = e.message if e.message else e.__class__.__name__
+            resp = to_exception_response(e, req)
+            output = apply_defaults(resp).to_lambda_output(req)
+        timings.stop('serialize')
+        if metrics is not None:
+            metrics.publish(timings, output, context)
+        return output
 
-            resp = to_error_response(message, e.errors, status_code)
-        except Exception as e: # pylint: disable=W0703
-            logger.exception(e)
-            status_code = 500
-            message = 'InternalServerError'
-            errors = tuple()
+    func_wrapper.resources = resources
+    func_wrapper.warmup = warmup
+    return func_wrapper
+
+
+def _process_record(func, record):
+    """Runs func on record and returns whether it succeeded"""
+    try:
+        func(record)
+    except ServerlessError as e:
+        _get_logger().warning('Failed to process record id=%s: %r', record.id, e)
+        return False
+    except Exception as e: # pylint: disable=W0703
+        _get_logger().exception(e)
+        return False
+    return True
+
+
+def batch_handler(func=None, max_workers=None, codec=None):
+    """
+    A decorator for SQS, Kinesis and DynamoDB Streams handlers that calls the
+    handler function once per record and reports failed records in the
+    ``batchItemFailures`` format, so only those are retried. Enable
+    ``ReportBatchItemFailures`` on the event source mapping to use it.
+
+    Records of SQS FIFO queues are processed in order and processing stops at
+    the first failure, reporting the rest of the batch as failed.
+
+    Example:
+        @batch_handler(max_workers=8)
+        def your_handler_func(record):
+            # will receive one Record per event['Records'] item
+            save(record.data)
+
+    Args:
+        func (function): a per record handler function to be decorated
+        max_workers (int): process records concurrently on a thread pool of this
+            size, which is kept across warm invocations. Records are processed
+            one at a time when omitted.
+        codec (JsonCodec or str): JSON codec used for record bodies
+
+    Returns:
+        func_wrapper (function): a wrapper function that is invoked via lambda
+    """
+    if func is None:
+        return partial(batch_handler, max_workers=max_workers, codec=codec)
+
+    executor = []
+
+    def get_executor():
+        if not executor:
+            from concurrent.futures import ThreadPoolExecutor
+            executor.append(ThreadPoolExecutor(max_workers=max_workers))
+        return executor[0]
+
+    @wraps(func)
+    def func_wrapper(event, context):
+        """
+        This is what's invoked via lambda.
+
+        Args:
+            event (dict): AWS Lambda event with Records
+            context (LambdaContext): AWS Lambda context
+
+        Returns:
+            output (dict): ``{'batchItemFailures': [{'itemIdentifier': id}, ...]}``
+        """
+        records = [Record(r, context, codec) for r in event.get('Records') or ()]
+        ordered = bool(records) and (
+            records[0].record.get('eventSourceARN', '').endswith('.fifo')
+        )
+
+        if ordered:
+            succeeded = []
+            for record in records:
+                if not _process_record(func, record):
+                    break
+                succeeded.append(record)
+            failed = records[len(succeeded):]
+        elif max_workers and len(records) > 1:
+            results = get_executor().map(
+                lambda r: _process_record(func, r), records
+            )
+            failed = [r for r, ok in zip(records, results) if not ok]
+        else:
+            failed = [r for r in records if not _process_record(func, r)]
 
-            resp = to_error_response(message, errors, status_code)
-        return resp.to_lambda_output()
+        return {
+            'batchItemFailures': [{'itemIdentifier': r.id} for r in failed]
+        }
     return func_wrapper
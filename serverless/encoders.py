@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Type based encoders for values JSON can not represent natively.
+
+Example:
+    from decimal import Decimal
+    from serverless.encoders import register_encoder
+
+    register_encoder(Decimal, str)
+
+Types can also be given by dotted name, e.g. ``'decimal.Decimal'``, so that
+registering an encoder does not import the module defining the type. The
+built-in encoders are registered this way and cost no import until used.
+"""
+import json
+from operator import methodcaller
+
+
+def _type_name(cls):
+    """Returns the dotted name of cls"""
+    return '%s.%s' % (cls.__module__, getattr(cls, '__qualname__', cls.__name__))
+
+
+def _encode_dataclass(o):
+    """Returns the fields of a dataclass instance as a dict"""
+    import dataclasses
+    return {field.name: getattr(o, field.name) for field in dataclasses.fields(o)}
+
+
+def _encode_enum(o):
+    """Returns the value of an Enum member"""
+    return o.value
+
+
+class EncoderRegistry:
+    """
+    Maps types to encoder functions. An encoder takes an object and returns
+    something JSON serializable.
+
+    The encoder for a type is looked up through its MRO once and then cached
+    by concrete type, so encoding many objects of the same type costs a single
+    dict lookup each.
+
+    Attributes:
+        dispatch (dict): encoders resolved so far, keyed by concrete type
+    """
+    def __init__(self):
+        self._encoders = {}
+        self._bulk_types = set()
+        self.dispatch = {}
+        self._bulk_dispatch = {}
+
+    def register(self, type_, encoder, bulk=False):
+        """
+        Registers encoder for type_ and its subclasses
+
+        Args:
+            type_ (type or str): type to encode, or its dotted name
+            encoder (function): returns a JSON serializable representation
+            bulk (bool): whether homogeneous lists of exactly type_ may be encoded
+                in one pass by ``encode_many``
+        """
+        self._encoders[type_] = encoder
+        if bulk:
+            self._bulk_types.add(type_)
+        else:
+            self._bulk_types.discard(type_)
+        self.dispatch.clear()
+        self._bulk_dispatch.clear()
+
+    def unregister(self, type_):
+        """Removes the encoder registered for type_"""
+        self._encoders.pop(type_, None)
+        self._bulk_types.discard(type_)
+        self.dispatch.clear()
+        self._bulk_dispatch.clear()
+
+    def lookup(self, cls):
+        """
+        Returns the encoder for cls, or None if there is no encoder for it
+
+        Args:
+            cls (type): type of the object to encode
+        """
+        try:
+            return self.dispatch[cls]
+        except KeyError:
+            pass
+
+        encoder = None
+        for base in cls.__mro__:
+            key = base if base in self._encoders else _type_name(base)
+            if key in self._encoders:
+                encoder = self._encoders[key]
+                break
+        else:
+            if hasattr(cls, '__dataclass_fields__'):
+                encoder = _encode_dataclass
+            elif hasattr(cls, '__next__') and hasattr(cls, '__iter__'):
+                encoder = list
+
+        self.dispatch[cls] = encoder
+        return encoder
+
+    def encode(self, o):
+        """
+        Returns a JSON serializable representation of o
+
+        Raises:
+            TypeError: if there is no encoder for type of o
+        """
+        encoder = self.lookup(type(o))
+        if encoder is None:
+            raise TypeError(
+                'Object of type %s is not JSON serializable' % type(o).__name__
+            )
+        return encoder(o)
+
+    def is_bulk(self, cls):
+        """Returns whether lists of exactly cls can be encoded by ``encode_many``"""
+        try:
+            return self._bulk_dispatch[cls]
+        except KeyError:
+            bulk = cls in self._bulk_types or _type_name(cls) in self._bulk_types
+            self._bulk_dispatch[cls] = bulk
+            return bulk
+
+    def encode_many(self, items):
+        """
+        Encodes a list whose items all have the same bulk registered type
+
+        Args:
+            items (list): values to encode
+
+        Returns:
+            encoded (list): encoded items, or None if items is not such a list
+        """
+        if not items or not self.is_bulk(type(items[0])):
+            return None
+        if len(set(map(type, items))) != 1:
+            return None
+        return list(map(self.lookup(type(items[0])), items))
+
+    def prepare(self, o):
+        """
+        Replaces bulk encodable lists in o, or in the values of o if it is a dict,
+        with their encoded form. Anything deeper is left to ``encode``.
+        """
+        if isinstance(o, (list, tuple)):
+            encoded = self.encode_many(o)
+            return o if encoded is None else encoded
+        if isinstance(o, dict):
+            replaced = None
+            for key, value in o.items():
+                if isinstance(value, (list, tuple)):
+                    encoded = self.encode_many(value)
+                    if encoded is not None:
+                        replaced = replaced or dict(o)
+                        replaced[key] = encoded
+            return o if replaced is None else replaced
+        return o
+
+
+registry = EncoderRegistry()
+registry.register('datetime.date', methodcaller('isoformat'), bulk=True)
+registry.register('datetime.datetime', methodcaller('isoformat'), bulk=True)
+registry.register('uuid.UUID', str, bulk=True)
+registry.register(set, list)
+registry.register(frozenset, list)
+registry.register('enum.Enum', _encode_enum)
+
+
+def register_encoder(type_, encoder, bulk=False):
+    """
+    Registers encoder for type_ on the default registry, see
+    EncoderRegistry.register
+    """
+    registry.register(type_, encoder, bulk)
+
+
+class ServerlessJsonEncoder(json.JSONEncoder):
+    """
+    The default Serverless JSON encoder. This one extends python's default json encoder to
+    support serialization of ``date``, ``datetime`` and ``UUID`` objects, plus ``set``,
+    ``Enum``, dataclasses, iterators and anything added with ``register_encoder``.
+
+    NOTE: ISO-8601 format willbe used for date serialization.
+
+    Attributes:
+        registry (EncoderRegistry): encoders to use, subclass to change
+    """
+    registry = registry
+
+    def encode(self, o):
+        return super(ServerlessJsonEncoder, self).encode(self.registry.prepare(o))
+
+    def default(self, o): # pylint: disable=E0202
+        """Serializes object"""
+        encoder = self.registry.dispatch.get(type(o)) or self.registry.lookup(type(o))
+        if encoder is None:
+            return json.JSONEncoder.default(self, o)
+        return encoder(o)
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Adapters between the HTTP event formats of AWS Lambda and Request/Response.
+
+Formats:
+    v1: API Gateway REST API, and HTTP API with payload format version 1.0
+    v2: API Gateway HTTP API with payload format version 2.0, and function URLs
+    alb: Application Load Balancer targets, with or without multi-value headers
+
+.. _Payload format versions:
+   https://docs.aws.amazon.com/apigateway/latest/developerguide/http-api-develop-integrations-lambda.html
+.. _ALB events:
+   https://docs.aws.amazon.com/elasticloadbalancing/latest/application/lambda-functions.html
+"""
+
+
+def _split_values(value):
+    return [item.strip() for item in value.split(',')]
+
+
+def parse_cookies(values):
+    """
+    Parses Cookie header values
+
+    Args:
+        values (list): Cookie header values or ``name=value`` pairs
+
+    Returns:
+        cookies (dict): cookie names mapped to their value
+    """
+    cookies = {}
+    for value in values:
+        for pair in value.split(';'):
+            name, sep, cookie = pair.strip().partition('=')
+            if sep and name:
+                cookies[name] = cookie
+    return cookies
+
+
+class EventFormat:
+    """
+    Reads the parts of an HTTP request from an event and shapes the Lambda output
+    for the service that sent it. The base implementation reads the v1 format.
+    """
+    name = None
+
+    def matches(self, event):
+        """Returns whether event is in this format"""
+        raise NotImplementedError
+
+    def method(self, event):
+        return event.get('httpMethod')
+
+    def path(self, event):
+        return event.get('path') or '/'
+
+    def query(self, event):
+        return event.get('queryStringParameters') or {}
+
+    def multi_query(self, event):
+        multi = event.get('multiValueQueryStringParameters')
+        if multi:
+            return multi
+        return {name: [value] for name, value in self.query(event).items()}
+
+    def params(self, event):
+        return event.get('pathParameters') or {}
+
+    def headers(self, event):
+        return event.get('headers') or {}
+
+    def multi_headers(self, event):
+        multi = event.get('multiValueHeaders')
+        if multi:
+            return multi
+        return {name: [value] for name, value in self.headers(event).items()}
+
+    def cookies(self, event):
+        return parse_cookies(
+            value for name, values in self.multi_headers(event).items()
+            if name.lower() == 'cookie' for value in values
+        )
+
+    def body(self, event):
+        """Returns the body as text, decoding base64 encoded bodies"""
+        body = event.get('body')
+        if body and event.get('isBase64Encoded'):
+            import base64
+            body = base64.b64decode(body).decode('utf-8')
+        return body
+
+    def raw_body(self, event):
+        """Returns the body as bytes, decoding base64 encoded bodies"""
+        body = event.get('body')
+        if not body:
+            return b''
+        if event.get('isBase64Encoded'):
+            import binascii
+            # decodes straight from the str, without an intermediate ascii copy
+            return binascii.a2b_base64(body)
+        return body.encode('utf-8')
+
+    def output(self, output, event, cookies=None):
+        """
+        Shapes the output of Response.to_lambda_output for this format
+
+        Args:
+            output (dict): output with statusCode, headers and body
+            event (dict): the event being answered, None if unknown
+            cookies (list): Set-Cookie header values
+
+        Returns:
+            output (dict): the shaped output
+        """
+        raise NotImplementedError
+
+
+class RestApiFormat(EventFormat):
+    """API Gateway REST API, and HTTP API payload format version 1.0"""
+    name = 'v1'
+
+    def matches(self, event):
+        return 'httpMethod' in event and 'elb' not in (event.get('requestContext') or {})
+
+    def output(self, output, event, cookies=None):
+        if cookies:
+            output['multiValueHeaders'] = {'Set-Cookie': list(cookies)}
+        return output
+
+
+class HttpApiFormat(EventFormat):
+    """API Gateway HTTP API payload format version 2.0, and Lambda function URLs"""
+    name = 'v2'
+
+    def matches(self, event):
+        return event.get('version') == '2.0'
+
+    def method(self, event):
+        http = (event.get('requestContext') or {}).get('http') or {}
+        return http.get('method')
+
+    def path(self, event):
+        return event.get('rawPath') or '/'
+
+    def multi_query(self, event):
+        # repeated parameters are joined with commas in queryStringParameters
+        raw = event.get('rawQueryString')
+        if raw:
+            from urllib.parse import parse_qs
+            return parse_qs(raw, keep_blank_values=True)
+        return {name: [value] for name, value in self.query(event).items()}
+
+    def multi_headers(self, event):
+        # repeated headers are joined with commas
+        return {name: _split_values(value) for name, value in self.headers(event).items()}
+
+    def cookies(self, event):
+        return parse_cookies(event.get('cookies') or ())
+
+    def output(self, output, event, cookies=None):
+        if cookies:
+            output['cookies'] = list(cookies)
+        return output
+
+
+class AlbFormat(EventFormat):
+    """
+    Application Load Balancer targets. The load balancer does not decode query
+    parameters, so they are decoded here. Responses use multi-value headers when
+    the event does, i.e. when they are enabled on the target group.
+    """
+    name = 'alb'
+
+    def matches(self, event):
+        return 'elb' in (event.get('requestContext') or {})
+
+    def query(self, event):
+        return {name: values[-1] for name, values in self.multi_query(event).items()}
+
+    def multi_query(self, event):
+        from urllib.parse import unquote_plus
+        multi = event.get('multiValueQueryStringParameters')
+        if multi is None:
+            multi = {
+                name: [value]
+                for name, value in (event.get('queryStringParameters') or {}).items()
+            }
+        return {
+            unquote_plus(name): [unquote_plus(value) for value in values]
+            for name, values in multi.items()
+        }
+
+    def params(self, event):
+        return {}
+
+    def headers(self, event):
+        multi = event.get('multiValueHeaders')
+        if multi is not None:
+            return {name: values[-1] for name, values in multi.items() if values}
+        return event.get('headers') or {}
+
+    def output(self, output, event, cookies=None):
+        from http import HTTPStatus
+        status_code = output['statusCode']
+        try:
+            phrase = HTTPStatus(status_code).phrase
+        except ValueError:
+            phrase = ''
+        output['statusDescription'] = ('%d %s' % (status_code, phrase)).strip()
+        output.setdefault('isBase64Encoded', False)
+
+        if event is not None and event.get('multiValueHeaders') is not None:
+            multi = {name: [value] for name, value in output.pop('headers').items()}
+            if cookies:
+                multi['Set-Cookie'] = list(cookies)
+            output['multiValueHeaders'] = multi
+        elif cookies:
+            # only one Set-Cookie header fits without multi-value headers
+            output['headers'] = dict(output['headers'], **{'Set-Cookie': cookies[-1]})
+        return output
+
+
+REST_API = RestApiFormat()
+HTTP_API = HttpApiFormat()
+ALB = AlbFormat()
+
+FORMATS = {f.name: f for f in (REST_API, HTTP_API, ALB)}
+
+
+def get_format(event_format):
+    """
+    Returns the EventFormat of event_format
+
+    Args:
+        event_format (EventFormat or str): a format or its name, ``v1``, ``v2`` or ``alb``
+
+    Raises:
+        ValueError: if the name is unknown
+    """
+    if isinstance(event_format, EventFormat):
+        return event_format
+    try:
+        return FORMATS[event_format]
+    except KeyError:
+        raise ValueError('Unknown event format: %s' % event_format)
+
+
+def detect(event):
+    """
+    Returns the format of event, or None when it matches no format, e.g. a test
+    or scheduled invocation
+    """
+    if not isinstance(event, dict):
+        return None
+    for event_format in (HTTP_API, ALB, REST_API):
+        if event_format.matches(event):
+            return event_format
+    return None
+
+
+def set_output_header(output, name, value):
+    """Sets a header of a shaped Lambda output, in a copy of its headers"""
+    if 'multiValueHeaders' in output and 'headers' not in output:
+        headers = output['multiValueHeaders'] = dict(output['multiValueHeaders'])
+        headers[name] = [value]
+    else:
+        headers = output['headers'] = dict(output.get('headers') or {})
+        headers[name] = value
@@ -63,6 +63,40 @@ class NotFound(ClientError):
     status_code = 404
 
 
+class MethodNotAllowed(ClientError):
+    """Exception mapping a ``405 Method Not Allowed`` response."""
+    status_code = 405
+
+
+class Conflict(ClientError):
+    """Exception mapping a ``409 Conflict`` response."""
+    status_code = 409
+
+
+class PayloadTooLarge(ClientError):
+    """Exception mapping a ``413 Payload Too Large`` response."""
+    status_code = 413
+
+
+class UnsupportedMediaType(ClientError):
+    """Exception mapping a ``415 Unsupported Media Type`` response."""
+    status_code = 415
+
+
 class UnprocessableEntity(ClientError):
     """Exception mapping a ``422 Unprocessable Entity`` response."""
     status_code = 422
+
+
+class ServerError(ServerlessError):
+    """Base class for all server error (HTTP 5xx) responses"""
+
+
+class ServiceUnavailable(ServerError):
+    """Exception mapping a ``503 Service Unavailable`` response."""
+    status_code = 503
+
+
+class GatewayTimeout(ServerError):
+    """Exception mapping a ``504 Gateway Timeout`` response."""
+    status_code = 504
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Concurrent calls to downstream services within the time left of an invocation.
+
+Calls run on a thread pool that is kept for the lifetime of the container, so a
+handler calling several services waits for roughly the slowest one instead of
+the sum of all of them.
+
+Example:
+    from functools import partial
+
+    @lambda_handler
+    def handler(req):
+        user, orders = req.fan_out([
+            partial(users.get, req.params['id']),
+            partial(orders.list, req.params['id']),
+        ])
+        return Response({'user': user, 'orders': orders})
+"""
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+import threading
+import time
+
+from serverless.deadline import remaining_seconds
+from serverless.exceptions import GatewayTimeout
+
+
+DEFAULT_MAX_WORKERS = 16
+
+_executor = []
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Returns the thread pool of the container, created on first use"""
+    if not _executor:
+        with _executor_lock:
+            if not _executor:
+                _executor.append(ThreadPoolExecutor(max_workers=DEFAULT_MAX_WORKERS))
+    return _executor[0]
+
+
+def fan_out(calls, context=None, timeout=None, margin=0.5, return_exceptions=False):
+    """
+    Runs calls concurrently and returns their results in order
+
+    Args:
+        calls (list): functions called without arguments, e.g. functools.partial
+        context (LambdaContext): bounds the wait by the time left of the invocation
+        timeout (float): maximum seconds to wait for all calls
+        margin (float): seconds of the invocation kept to build the response
+        return_exceptions (bool): put exceptions raised by calls in the results
+            instead of raising the first of them
+
+    Returns:
+        results (list): return values (or exceptions) of calls, in order
+
+    Raises:
+        GatewayTimeout: if calls are still running when the time is up
+        Exception: whatever the first failing call raised, in the order of calls.
+            A ServerlessError is thus answered with its usual response.
+    """
+    limits = [t for t in (timeout, remaining_seconds(context, margin)) if t is not None]
+    deadline = time.monotonic() + min(limits) if limits else None
+
+    executor = get_executor()
+    futures = [executor.submit(call) for call in calls]
+    results = []
+    try:
+        for future in futures:
+            wait = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+            try:
+                results.append(future.result(wait))
+            except FutureTimeout:
+                raise GatewayTimeout(
+                    'Downstream calls did not complete in time',
+                    ({'completed': len(results), 'total': len(futures)},)
+                )
+            except Exception as e: # pylint: disable=W0703
+                if not return_exceptions:
+                    raise
+                results.append(e)
+    finally:
+        for future in futures:
+            future.cancel()
+    return results
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Sparse fieldsets: responses pruned to the fields a client asks for before they
+are serialized.
+
+A field spec lists fields separated by commas. Nested fields are given as dotted
+paths or in parentheses, so ``id,author.name,items(id,price)`` keeps ``id``, the
+``name`` of ``author`` and the ``id`` and ``price`` of every item of ``items``.
+Dicts are pruned to the listed keys and lists have each of their items pruned;
+other values are kept whole.
+
+Example:
+    @lambda_handler(fields=True)
+    def handler(req):
+        return Response(load_orders())
+
+    # GET /orders?fields=id,total,customer(id,name)
+"""
+from serverless.exceptions import BadRequest
+
+
+class Plan:
+    """
+    Compiled field spec
+
+    Attributes:
+        fields (dict): field names mapped to the Plan of their value, None to
+            keep the value whole
+        keys (tuple): names of the fields if every one of them is kept whole,
+            which lets lists of dicts be pruned without recursion, otherwise None
+    """
+    __slots__ = ('fields', 'keys')
+
+    def __init__(self, fields):
+        self.fields = fields
+        flat = all(sub is None for sub in fields.values())
+        self.keys = tuple(fields) if flat else None
+
+    def apply(self, value):
+        """Returns value pruned to the fields of the plan, value is not modified"""
+        if isinstance(value, dict):
+            result = {}
+            for name, sub in self.fields.items():
+                if name in value:
+                    result[name] = value[name] if sub is None else sub.apply(value[name])
+            return result
+        if isinstance(value, (list, tuple)):
+            keys = self.keys
+            if keys is not None:
+                return [
+                    {key: item[key] for key in keys if key in item}
+                    if isinstance(item, dict) else self.apply(item)
+                    for item in value
+                ]
+            return [self.apply(item) for item in value]
+        return value
+
+
+def _invalid(spec, reason):
+    return BadRequest('Invalid fields parameter', ({'fields': spec, 'reason': reason},))
+
+
+def _merge(tree, path, sub):
+    """Adds path, whose last field holds sub, to tree (dict)"""
+    for name in path[:-1]:
+        node = tree.get(name, {})
+        if node is None:
+            # the whole value is kept already
+            return
+        tree[name] = node
+        tree = node
+    name = path[-1]
+    if sub is None or tree.get(name, {}) is None:
+        tree[name] = None
+        return
+    node = tree.setdefault(name, {})
+    for child, child_sub in sub.items():
+        _merge(node, [child], child_sub)
+
+
+def _parse(spec, pos, depth):
+    """Parses fields from pos until the end or an unmatched ')'"""
+    tree = {}
+    while True:
+        end = pos
+        while end < len(spec) and spec[end] not in ',()':
+            end += 1
+        path = [name.strip() for name in spec[pos:end].split('.')]
+        if not all(path):
+            raise _invalid(spec, 'empty field name at %d' % pos)
+        sub = None
+        pos = end
+        if pos < len(spec) and spec[pos] == '(':
+            sub, pos = _parse(spec, pos + 1, depth + 1)
+            if pos >= len(spec) or spec[pos] != ')':
+                raise _invalid(spec, 'unbalanced parentheses')
+            pos += 1
+        _merge(tree, path, sub)
+        if pos >= len(spec):
+            if depth:
+                raise _invalid(spec, 'unbalanced parentheses')
+            return tree, pos
+        if spec[pos] == ')':
+            if not depth:
+                raise _invalid(spec, 'unbalanced parentheses')
+            return tree, pos
+        if spec[pos] != ',':
+            raise _invalid(spec, 'unexpected %r at %d' % (spec[pos], pos))
+        pos += 1
+
+
+def _build(tree):
+    return Plan({
+        name: None if sub is None else _build(sub) for name, sub in tree.items()
+    })
+
+
+def compile_fields(spec):
+    """
+    Compiles a field spec into a Plan
+
+    Raises:
+        BadRequest: if spec is malformed
+    """
+    return _build(_parse(spec, 0, 0)[0])
+
+
+class Fields:
+    """
+    Sparse fieldset settings of responses
+
+    Plans are cached per distinct spec, up to max_plans of them, so that specs
+    built by clients at random do not grow the cache.
+
+    Args:
+        param (str): name of the query string parameter holding the field spec
+        max_plans (int): maximum number of cached plans
+    """
+    def __init__(self, param='fields', max_plans=256):
+        self.param = param
+        self.max_plans = max_plans
+        self._plans = {}
+
+    def plan(self, spec):
+        """
+        Returns the Plan of spec, compiled on first use
+
+        Raises:
+            BadRequest: if spec is malformed
+        """
+        plan = self._plans.get(spec)
+        if plan is None:
+            plan = compile_fields(spec)
+            if len(self._plans) < self.max_plans:
+                self._plans[spec] = plan
+        return plan
+
+    def apply(self, data, req):
+        """
+        Returns data pruned to the fields requested by req, data itself when none
+        are
+
+        Raises:
+            BadRequest: if the field spec of req is malformed
+        """
+        spec = req.query.get(self.param)
+        if not spec:
+            return data
+        return self.plan(spec).apply(data)
@@ -0,0 +1,371 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Typed arguments of handler functions, taken from the request.
+
+Annotated parameters of a handler after the request, and those defaulting to a
+Param, are looked up by name in the path parameters, then the query string, then
+the JSON body, and converted to their annotation. Other parameters are left to
+their defaults, e.g. dependencies or flags passed by the caller. The signature
+is inspected once, when the handler is decorated, into a plan of getters and
+converters; requests only run the plan.
+
+Supported annotations: ``str``, ``int``, ``float``, ``bool``, ``Decimal``,
+``UUID``, ``date``, ``datetime``, Enum subclasses, ``list`` of any of these
+(every value of a repeated query parameter), ``Optional`` of any of these, and
+``dict`` or ``typing.Any`` for values taken as they are.
+
+Example:
+    @lambda_handler
+    def handler(req, user_id: UUID, since: date = None, limit: int = 20):
+        ...
+
+Missing arguments are answered with ``400 Bad Request`` and values that can not
+be converted with ``422 Unprocessable Entity``, listing every failing argument.
+"""
+from collections import namedtuple
+
+from serverless.exceptions import BadRequest, UnprocessableEntity
+
+
+_MISSING = object()
+
+SOURCES = ('path', 'query', 'body')
+
+
+class Param:
+    """
+    Default value of a handler parameter overriding where it is taken from
+
+    Example:
+        def handler(req, user_id: int = Param(name='userId', source='path')):
+            ...
+
+    Args:
+        name (str): name of the value in the request, the parameter name if None
+        source (str): ``path``, ``query`` or ``body``, all three in this order
+            if None
+        default: value of the parameter when the request has none, required if
+            omitted
+    """
+    def __init__(self, name=None, source=None, default=_MISSING):
+        if source is not None and source not in SOURCES:
+            raise ValueError('Unknown source: %s' % source)
+        self.name = name
+        self.source = source
+        self.default = default
+
+
+def _path(req):
+    return req.params
+
+
+def _query(req):
+    return req.query
+
+
+def _multi_query(req):
+    return req.multi_query
+
+
+def _body(req):
+    data = req.data
+    return data if isinstance(data, dict) else {}
+
+
+def _to_int(value):
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        return int(value)
+    raise ValueError(value)
+
+
+def _to_float(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        return float(value)
+    raise ValueError(value)
+
+
+def _to_str(value):
+    if not isinstance(value, str):
+        raise ValueError(value)
+    return value
+
+
+_BOOLEANS = {
+    'true': True, '1': True, 'yes': True, 'on': True,
+    'false': False, '0': False, 'no': False, 'off': False,
+}
+
+
+def _to_bool(value):
+    if isinstance(value, bool):
+        return value
+    return _BOOLEANS[value.lower()]
+
+
+def _from_number(cls):
+    """Returns a converter of str, int and float values to cls, e.g. Decimal"""
+    def convert(value):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = str(value)
+        return cls(_to_str(value))
+    return convert
+
+
+# ISO 8601 dates and times as datetime.fromisoformat reads them, which python 3.6
+# lacks, plus a Z suffix for UTC
+_ISO_DATETIME = (
+    r'(\d{4})-(\d{2})-(\d{2})'
+    r'(?:[T ](\d{2})(?::(\d{2})(?::(\d{2})(?:\.(\d{1,6}))?)?)?'
+    r'(Z|[+-]\d{2}:\d{2}(?::\d{2})?)?)?$'
+)
+
+
+def _from_isoformat(cls):
+    """Returns a converter of ISO 8601 strings to cls, date or datetime"""
+    import datetime
+    import re
+
+    pattern = re.compile(_ISO_DATETIME)
+    with_time = issubclass(cls, datetime.datetime)
+
+    def convert(value):
+        match = pattern.match(_to_str(value))
+        if match is None or (match.group(4) and not with_time):
+            raise ValueError(value)
+        year, month, day, hour, minute, second, fraction, offset = match.groups()
+        if not with_time:
+            return cls(int(year), int(month), int(day))
+
+        tzinfo = None
+        if offset == 'Z':
+            tzinfo = datetime.timezone.utc
+        elif offset:
+            sign = -1 if offset[0] == '-' else 1
+            parts = [int(part) for part in offset[1:].split(':')] + [0]
+            tzinfo = datetime.timezone(sign * datetime.timedelta(
+                hours=parts[0], minutes=parts[1], seconds=parts[2]
+            ))
+        return cls(
+            int(year), int(month), int(day), int(hour or 0), int(minute or 0),
+            int(second or 0), int((fraction or '0').ljust(6, '0')), tzinfo
+        )
+    return convert
+
+
+_CONVERTERS = {int: _to_int, float: _to_float, str: _to_str, bool: _to_bool}
+
+
+def _converter(annotation):
+    """
+    Returns the function converting values to annotation, None for values
+    taken as they are
+
+    Raises:
+        TypeError: if annotation is not supported
+    """
+    import enum
+    import inspect
+    import typing
+
+    if annotation in (inspect.Parameter.empty, typing.Any, dict, object):
+        return None
+    if annotation in _CONVERTERS:
+        return _CONVERTERS[annotation]
+    name = '%s.%s' % (getattr(annotation, '__module__', None),
+                      getattr(annotation, '__qualname__', None))
+    # raises TypeError or AttributeError for values other than str
+    if name == 'uuid.UUID':
+        return annotation
+    if name in ('datetime.date', 'datetime.datetime'):
+        return _from_isoformat(annotation)
+    if name == 'decimal.Decimal':
+        return _from_number(annotation)
+    if isinstance(annotation, type) and issubclass(annotation, enum.Enum):
+        return annotation
+    raise TypeError('Unsupported parameter annotation: %r' % (annotation,))
+
+
+# compiled extraction of one handler argument, unpacked by extract
+_Argument = namedtuple(
+    '_Argument', ['name', 'key', 'getters', 'convert', 'many', 'default', 'expected']
+)
+
+
+def _unwrap_optional(annotation):
+    """Returns (T, True) for Optional[T], (annotation, False) otherwise"""
+    args = getattr(annotation, '__args__', None)
+    if args and len(args) == 2 and type(None) in args:
+        return [arg for arg in args if arg is not type(None)][0], True
+    return annotation, False
+
+
+def _compile_argument(parameter, annotation):
+    default = parameter.default
+    key, source = parameter.name, None
+    if isinstance(default, Param):
+        key, source, default = default.name or key, default.source, default.default
+    if default is parameter.empty:
+        default = _MISSING
+
+    annotation, optional = _unwrap_optional(annotation)
+    if optional and default is _MISSING:
+        default = None
+
+    many = annotation is list or getattr(annotation, '__origin__', None) is list
+    if many:
+        annotation = (getattr(annotation, '__args__', None) or (parameter.empty,))[0]
+    convert = _converter(annotation)
+    expected = getattr(annotation, '__name__', str(annotation))
+    if many:
+        expected = 'list of %s' % expected
+
+    query = _multi_query if many else _query
+    getters = {'path': (_path,), 'query': (query,), 'body': (_body,)}.get(
+        source, (_path, query, _body)
+    )
+    return _Argument(parameter.name, key, getters, convert, many, default, expected)
+
+
+def compile_arguments(func):
+    """
+    Compiles the extraction of the arguments of func after the request
+
+    Args:
+        func (function): the handler function
+
+    Returns:
+        arguments (tuple): compiled arguments, empty if func takes only the request
+
+    Raises:
+        TypeError: if an injected parameter is positional only or has an
+            unsupported annotation. Variadic parameters and parameters neither
+            annotated nor defaulting to a Param are left out.
+    """
+    import inspect
+    import typing
+
+    try:
+        hints = typing.get_type_hints(func)
+    except Exception: # pylint: disable=W0703
+        # unresolvable forward references, the raw annotations are used
+        hints = {}
+    arguments = []
+    parameters = list(inspect.signature(func).parameters.values())
+    for parameter in parameters[1:]:
+        if parameter.kind in (parameter.VAR_POSITIONAL, parameter.VAR_KEYWORD):
+            continue
+        annotation = hints.get(parameter.name, parameter.annotation)
+        if annotation is parameter.empty and not isinstance(parameter.default, Param):
+            continue
+        if parameter.kind == parameter.POSITIONAL_ONLY:
+            raise TypeError('Unsupported handler parameter: %s' % parameter.name)
+        arguments.append(_compile_argument(parameter, annotation))
+    return tuple(arguments)
+
+
+def extract(arguments, req):
+    """
+    Returns the keyword arguments of a handler for req
+
+    Args:
+        arguments (tuple): compiled arguments, see compile_arguments
+        req (Request): the request
+
+    Raises:
+        BadRequest: if required arguments are missing, listing invalid ones too
+        UnprocessableEntity: if values can not be converted
+    """
+    kwargs = {}
+    errors = []
+    missing = False
+    # path params, query or body, read once per request
+    containers = {}
+    for name, key, getters, convert, many, default, expected in arguments:
+        value = None
+        for getter in getters:
+            container = containers.get(getter)
+            if container is None:
+                container = containers[getter] = getter(req)
+            value = container.get(key)
+            if value is not None:
+                break
+        if value is None:
+            if default is _MISSING:
+                missing = True
+                errors.append({'field': key, 'message': 'required'})
+            else:
+                kwargs[name] = default
+            continue
+        if convert is not None or many:
+            try:
+                if not many:
+                    value = convert(value)
+                else:
+                    if not isinstance(value, list):
+                        value = [value]
+                    if convert is not None:
+                        value = [convert(item) for item in value]
+            except (ValueError, TypeError, KeyError, AttributeError, ArithmeticError):
+                errors.append({'field': key, 'message': 'expected %s' % expected})
+                continue
+        kwargs[name] = value
+
+    if missing:
+        raise BadRequest('Missing parameters', tuple(errors))
+    if errors:
+        raise UnprocessableEntity('Invalid parameters', tuple(errors))
+    return kwargs
+
+
+def takes_arguments(func):
+    """
+    Returns whether func takes parameters after the request, read from its code
+    object so that plain handlers cost no introspection
+    """
+    code = getattr(func, '__code__', None)
+    if code is None:
+        return False
+    # python 2 code objects have no keyword-only arguments
+    count = code.co_argcount + getattr(code, 'co_kwonlyargcount', 0)
+    if getattr(func, '__self__', None) is not None:
+        count -= 1
+    return count > 1
+
+
+def inject(func):
+    """
+    Returns func taking only the request, with its other arguments extracted
+    from the request, or func itself if it takes only the request
+
+    Raises:
+        TypeError: if func has parameters that can not be injected
+    """
+    if not takes_arguments(func):
+        return func
+    arguments = compile_arguments(func)
+    if not arguments:
+        return func
+
+    def handler(req):
+        return func(req, **extract(arguments, req))
+    handler.arguments = arguments
+    return handler
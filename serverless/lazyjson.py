@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Lazy access to large JSON request bodies.
+
+The body is scanned only as far as a lookup needs, and only the values that are
+read are decoded, so reading a few keys of a large document costs about as much
+as those keys. Values that are skipped are not validated.
+
+Example:
+    @lambda_handler
+    def handler(req):
+        source = req.lazy_data['source']
+        for item in req.iter_data('items'):
+            save(source, item)
+"""
+import json
+from json.decoder import scanstring
+import re
+
+from serverless.codecs import get_codec
+from serverless.compat import Mapping
+from serverless.exceptions import BadRequest
+
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"')
+_SCALAR = re.compile(r'[^\s,:\[\]{}"]+')
+# strings are matched whole, so brackets inside them are not counted
+_CONTAINER_TOKEN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}]')
+
+
+def _malformed(reason):
+    return BadRequest('Malformed request body', (reason,))
+
+
+def _skip_whitespace(text, pos):
+    return _WHITESPACE.match(text, pos).end()
+
+
+def skip_value(text, pos):
+    """
+    Returns the index just past the JSON value starting at pos, without decoding it
+
+    Raises:
+        BadRequest: if no value starts at pos
+    """
+    if pos >= len(text):
+        raise _malformed('unexpected end of document')
+    char = text[pos]
+    if char == '"':
+        match = _STRING.match(text, pos)
+    elif char in '[{':
+        depth = 0
+        for match in _CONTAINER_TOKEN.finditer(text, pos):
+            token = match.group()
+            if token in '[{':
+                depth += 1
+            elif token in ']}':
+                depth -= 1
+                if depth == 0:
+                    return match.end()
+        match = None
+    else:
+        match = _SCALAR.match(text, pos)
+    if match is None:
+        raise _malformed('invalid value at %d' % pos)
+    return match.end()
+
+
+def _expect(text, pos, chars):
+    pos = _skip_whitespace(text, pos)
+    if pos >= len(text) or text[pos] not in chars:
+        raise _malformed('expected %r at %d' % (chars, pos))
+    return pos
+
+
+def _decode(codec, text, start, end):
+    try:
+        return codec.loads(text[start:end])
+    except ValueError as e:
+        raise _malformed(str(e))
+
+
+def iter_array(text, codec=None, pos=0):
+    """
+    Yields the items of the JSON array starting at pos, decoding one at a time
+
+    Args:
+        text (str): JSON document
+        codec (JsonCodec or str): decodes the items, process default if omitted
+        pos (int): index of the array in text
+
+    Raises:
+        BadRequest: if there is no array at pos or an item is malformed
+    """
+    codec = get_codec(codec)
+    pos = _expect(text, pos, '[') + 1
+    if text.startswith(']', _skip_whitespace(text, pos)):
+        return
+    while True:
+        start = _skip_whitespace(text, pos)
+        end = skip_value(text, start)
+        yield _decode(codec, text, start, end)
+        pos = _expect(text, end, ',]')
+        if text[pos] == ']':
+            return
+        pos += 1
+
+
+class LazyObject(Mapping):
+    """
+    Read-only mapping over a JSON object, decoding members on first access
+
+    Keys are located by scanning the object from the start only as far as the
+    key being looked up, or to the end when the key may repeat later in the
+    text. Decoded values are cached. When a key repeats, the last occurrence is
+    used, as json.loads does.
+
+    Args:
+        text (str): JSON document
+        codec (JsonCodec or str): decodes the values, process default if omitted
+        pos (int): index of the object in text
+
+    Raises:
+        BadRequest: if there is no object at pos, or on access to a malformed member
+    """
+    def __init__(self, text, codec=None, pos=0):
+        self._text = text
+        self._codec = get_codec(codec)
+        self._pos = _expect(text, pos, '{') + 1
+        self._spans = {}
+        self._values = {}
+        self._scanned = False
+
+    def _scan(self, key=None):
+        """Locates members until key is found, or all of them"""
+        text, spans = self._text, self._spans
+        pos = self._pos
+        while not self._scanned:
+            pos = _expect(text, pos, '"}' if not spans else ',}')
+            if text[pos] == '}':
+                self._scanned = True
+                break
+            if spans:
+                pos = _expect(text, pos + 1, '"')
+            try:
+                name, pos = scanstring(text, pos + 1)
+            except ValueError as e:
+                raise _malformed(str(e))
+            start = _skip_whitespace(text, _expect(text, pos, ':') + 1)
+            pos = skip_value(text, start)
+            spans[name] = (start, pos)
+            self._pos = pos
+            if name == key:
+                break
+
+    def _span(self, key):
+        if not self._scanned:
+            if key not in self._spans:
+                self._scan(key)
+            if key in self._spans and self._may_repeat(key):
+                self._scan()
+        return self._spans[key]
+
+    def _may_repeat(self, key):
+        """
+        Returns whether key may occur again in the unscanned text: its quoted
+        name is found there, or an escape sequence that could spell it
+        """
+        text, pos = self._text, self._pos
+        if text.find('\\', pos) != -1:
+            return True
+        return text.find(json.dumps(key, ensure_ascii=False), pos) != -1
+
+    def __getitem__(self, key):
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+        start, end = self._span(key)
+        value = self._values[key] = _decode(self._codec, self._text, start, end)
+        return value
+
+    def __contains__(self, key):
+        try:
+            self._span(key)
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        self._scan()
+        return iter(self._spans)
+
+    def __len__(self):
+        self._scan()
+        return len(self._spans)
+
+    def raw(self, key):
+        """
+        Returns the JSON text of the value under key, without decoding it
+
+        Raises:
+            KeyError: if the object has no key
+        """
+        start, end = self._span(key)
+        return self._text[start:end]
+
+    def iter(self, key):
+        """
+        Yields the items of the array under key, decoding one at a time. Items
+        are not cached, so large arrays are never held in memory.
+
+        Raises:
+            KeyError: if the object has no key
+            BadRequest: if the value under key is not an array
+        """
+        return iter_array(self._text, self._codec, self._span(key)[0])
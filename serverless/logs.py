@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Request scoped, structured logging.
+
+``Request.logger`` is bound to the request id and route of the invocation. Records
+are only built when their level is enabled, the message is formatted when a
+handler emits the record, and the caller lookup of the logging module is skipped.
+Debug records can be sampled per invocation, and the traceback of an error is
+logged at most once per interval for each place it is raised from.
+
+Example:
+    from serverless import lambda_handler, Response
+    from serverless.logs import StructuredLogger
+
+    @lambda_handler(logger=StructuredLogger(debug_sample_rate=0.01))
+    def handler(req):
+        req.logger.debug('Loading %s', req.params['id'])
+        return Response({})
+"""
+import json
+import logging
+import os
+import random
+import sys
+import time
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one line JSON documents including the request fields"""
+    def format(self, record):
+        entry = {
+            'timestamp': record.created,
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        fields = getattr(record, 'fields', None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self.formatException(record.exc_info)
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+def _error_key(exc):
+    """Returns the type of exc and the place it was raised from"""
+    tb = getattr(exc, '__traceback__', None)
+    if tb is None:
+        return type(exc), None, None
+    while tb.tb_next is not None:
+        tb = tb.tb_next
+    return type(exc), tb.tb_frame.f_code.co_filename, tb.tb_lineno
+
+
+class TracebackLimiter:
+    """
+    Decides which errors are logged with their traceback, one per interval for
+    each exception type and place it was raised from
+
+    Args:
+        interval (float): seconds during which repeated tracebacks are left out
+        max_keys (int): number of distinct errors remembered
+    """
+    def __init__(self, interval=60.0, max_keys=1024):
+        self.interval = interval
+        self.max_keys = max_keys
+        self._seen = {}
+
+    def allow(self, exc):
+        """
+        Returns whether the traceback of exc should be logged, and the number of
+        tracebacks of the same error left out since the last one
+        """
+        key = _error_key(exc)
+        now = time.monotonic()
+        seen = self._seen.get(key)
+        if seen is not None and now - seen[0] < self.interval:
+            seen[1] += 1
+            return False, seen[1]
+
+        if seen is None and len(self._seen) >= self.max_keys:
+            self._seen.clear()
+        suppressed = seen[1] if seen is not None else 0
+        self._seen[key] = [now, 0]
+        return True, suppressed
+
+
+def request_fields(event, context):
+    """Returns the request id and route of an invocation"""
+    fields = {}
+    request_context = {}
+    if isinstance(event, dict):
+        request_context = event.get('requestContext') or {}
+    request_id = (
+        getattr(context, 'aws_request_id', None) or request_context.get('requestId')
+    )
+    if request_id:
+        fields['request_id'] = request_id
+    if isinstance(event, dict):
+        route = request_context.get('routeKey')
+        if not route and event.get('httpMethod'):
+            path = event.get('resource') or event.get('path')
+            route = '%s %s' % (event['httpMethod'], path)
+        if route:
+            fields['route'] = route
+    return fields
+
+
+class RequestLogger:
+    """
+    A logger bound to one invocation, see Request.logger
+
+    Args:
+        logger (logging.Logger): logger the records are handled by
+        event (dict): AWS Lambda event
+        context (LambdaContext): AWS Lambda context
+        sampled (bool): emit debug records regardless of the logger level
+        limiter (TracebackLimiter): limits tracebacks logged by exception
+    """
+    def __init__(self, logger, event, context, sampled=False, limiter=None):
+        self.logger = logger
+        self.event = event
+        self.context = context
+        self.sampled = sampled
+        self.limiter = limiter
+        self._fields = None
+
+    @property
+    def fields(self):
+        """Returns the fields added to every record, computed on first use"""
+        if self._fields is None:
+            self._fields = request_fields(self.event, self.context)
+        return self._fields
+
+    def bind(self, **fields):
+        """Adds fields to every following record"""
+        self.fields.update(fields)
+        return self
+
+    def debug(self, msg, *args):
+        if self.sampled or self.logger.isEnabledFor(logging.DEBUG):
+            self._emit(logging.DEBUG, msg, args)
+
+    def info(self, msg, *args):
+        if self.logger.isEnabledFor(logging.INFO):
+            self._emit(logging.INFO, msg, args)
+
+    def warning(self, msg, *args):
+        if self.logger.isEnabledFor(logging.WARNING):
+            self._emit(logging.WARNING, msg, args)
+
+    def error(self, msg, *args):
+        if self.logger.isEnabledFor(logging.ERROR):
+            self._emit(logging.ERROR, msg, args)
+
+    def exception(self, msg, *args):
+        """
+        Logs an error with the traceback of the exception being handled, unless
+        the limiter left it out recently. The record then carries the number of
+        tracebacks left out instead.
+        """
+        if not self.logger.isEnabledFor(logging.ERROR):
+            return
+        exc_info = sys.exc_info()
+        if exc_info[1] is None or self.limiter is None:
+            self._emit(logging.ERROR, msg, args, exc_info if exc_info[1] else None)
+            return
+
+        allowed, suppressed = self.limiter.allow(exc_info[1])
+        fields = dict(self.fields, error=exc_info[0].__name__)
+        if suppressed:
+            fields['suppressed_tracebacks'] = suppressed
+        self._emit(logging.ERROR, msg, args, exc_info if allowed else None, fields)
+
+    def _emit(self, level, msg, args, exc_info=None, fields=None):
+        record = self.logger.makeRecord(
+            self.logger.name, level, '(unknown file)', 0, msg, args, exc_info,
+            extra={'fields': self.fields if fields is None else fields}
+        )
+        self.logger.handle(record)
+
+
+# handlers StructuredLogger added to the loggers it configured, by logger name
+_handlers = {}
+
+
+class StructuredLogger:
+    """
+    Logging settings of a handler. Records are written as JSON lines to stdout,
+    which Lambda forwards to CloudWatch Logs, and do not propagate to the parent
+    loggers. Settings sharing a name share the logger and its default handler.
+
+    Args:
+        name (str): name of the logger
+        level (int or str): logger level, the LOG_LEVEL environment variable or
+            INFO by default
+        debug_sample_rate (float): share of invocations that emit debug records
+            regardless of level
+        traceback_interval (float): seconds during which repeated tracebacks of
+            the same error are left out
+        handler (logging.Handler): handler of the records, writes JSON lines to
+            stdout by default
+    """
+    def __init__(self, name='serverless.request', level=None, debug_sample_rate=0.0,
+                 traceback_interval=60.0, handler=None):
+        self.name = name
+        self.level = level or os.environ.get('LOG_LEVEL', 'INFO')
+        self.debug_sample_rate = debug_sample_rate
+        self.limiter = TracebackLimiter(traceback_interval)
+        self.handler = handler
+        self._logger = None
+
+    @property
+    def logger(self):
+        """Returns the configured logging.Logger, configured on first use"""
+        if self._logger is None:
+            logger = logging.getLogger(self.name)
+            handler = self.handler
+            if handler is None:
+                handler = _handlers.get(self.name)
+                if handler is None:
+                    handler = _handlers[self.name] = logging.StreamHandler(sys.stdout)
+                    handler.setFormatter(JsonFormatter())
+            if handler not in logger.handlers:
+                logger.addHandler(handler)
+            logger.setLevel(self.level)
+            logger.propagate = False
+            self._logger = logger
+        return self._logger
+
+    def bind(self, event, context):
+        """Returns a RequestLogger for one invocation"""
+        rate = self.debug_sample_rate
+        sampled = bool(rate) and random.random() < rate
+        return RequestLogger(self.logger, event, context, sampled, self.limiter)
+
+
+def default_logger(event, context):
+    """
+    Returns a RequestLogger for handlers without logging settings, which logs to
+    the ``serverless.wrappers`` logger without limiting tracebacks
+    """
+    return RequestLogger(logging.getLogger('serverless.wrappers'), event, context)
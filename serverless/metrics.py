@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Per-phase timing of invocations, published as CloudWatch Embedded Metric Format
+(EMF) log lines and optionally as a ``Server-Timing`` response header.
+
+Phases:
+    parse: decoding the request body (``Request.data``)
+    handler: the handler function, excluding parse
+    error: mapping an exception to an error response
+    serialize: building the Lambda output (``Response.to_lambda_output``)
+    total: all of the above
+
+.. _Embedded Metric Format:
+   https://docs.aws.amazon.com/AmazonCloudWatch/latest/monitoring/CloudWatch_Embedded_Metric_Format_Specification.html
+"""
+import json
+import os
+import sys
+import time
+
+
+PHASES = ('parse', 'handler', 'error', 'serialize')
+
+
+class Timings:
+    """Durations of the phases of one invocation, in seconds"""
+    def __init__(self):
+        self.durations = {}
+        self._started = {}
+
+    def start(self, phase):
+        """Starts timing phase"""
+        self._started[phase] = time.perf_counter()
+
+    def stop(self, phase):
+        """Stops timing phase, does nothing if it is not running"""
+        started = self._started.pop(phase, None)
+        if started is not None:
+            elapsed = time.perf_counter() - started
+            self.durations[phase] = self.durations.get(phase, 0.0) + elapsed
+
+    def milliseconds(self):
+        """Returns phase durations in milliseconds, handler exclusive of parse"""
+        durations = dict(self.durations)
+        if 'handler' in durations and 'parse' in durations:
+            durations['handler'] = max(durations['handler'] - durations['parse'], 0.0)
+        result = {
+            phase: durations[phase] * 1000.0 for phase in PHASES if phase in durations
+        }
+        result['total'] = sum(result.values())
+        return result
+
+
+class NullTimings:
+    """Timings used when instrumentation is disabled, records nothing"""
+    durations = {}
+
+    def start(self, phase):
+        pass
+
+    def stop(self, phase):
+        pass
+
+
+NULL_TIMINGS = NullTimings()
+
+
+def _write_stdout(line):
+    sys.stdout.write(line + '\n')
+
+
+class Metrics:
+    """
+    Instrumentation settings of a handler
+
+    Args:
+        namespace (str): CloudWatch namespace of the metrics
+        emf (bool): writes an EMF log line per invocation
+        server_timing (bool): adds a Server-Timing header to responses
+        dimensions (dict): extra dimensions, FunctionName is always included
+        emit (function): called with each EMF line, writes to stdout by default
+    """
+    def __init__(self, namespace='Serverless', emf=True, server_timing=False,
+                 dimensions=None, emit=None):
+        self.namespace = namespace
+        self.emf = emf
+        self.server_timing = server_timing
+        self.dimensions = dict(dimensions or {})
+        self.emit = emit or _write_stdout
+
+    def publish(self, timings, output, context):
+        """
+        Publishes timings of an invocation
+
+        Args:
+            timings (Timings): timings of the invocation
+            output (dict): AWS Lambda output, its headers are updated in place
+            context (LambdaContext): AWS Lambda context
+        """
+        durations = timings.milliseconds()
+        if self.server_timing:
+            from serverless.events import set_output_header
+            set_output_header(output, 'Server-Timing', format_server_timing(durations))
+        if self.emf:
+            self.emit(self.format_emf(durations, context))
+
+    def format_emf(self, durations, context):
+        """Returns an EMF log line of durations"""
+        function_name = getattr(context, 'function_name', None) or os.environ.get(
+            'AWS_LAMBDA_FUNCTION_NAME', 'unknown'
+        )
+        dimensions = dict(self.dimensions, FunctionName=function_name)
+        record = {
+            '_aws': {
+                'Timestamp': int(time.time() * 1000),
+                'CloudWatchMetrics': [{
+                    'Namespace': self.namespace,
+                    'Dimensions': [sorted(dimensions)],
+                    'Metrics': [
+                        {'Name': name, 'Unit': 'Milliseconds'}
+                        for name in sorted(durations)
+                    ],
+                }],
+            },
+        }
+        record.update(dimensions)
+        record.update(durations)
+        return json.dumps(record)
+
+
+def format_server_timing(durations):
+    """Returns a Server-Timing header value of durations in milliseconds"""
+    return ', '.join(
+        '%s;dur=%.3f' % (name, durations[name])
+        for name in PHASES + ('total',) if name in durations
+    )
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Parsing of multipart/form-data bodies without copying the parts.
+
+The parts are memoryview slices of the decoded body, so an upload is held in
+memory once however many parts it has.
+
+.. _RFC 7578:
+   https://tools.ietf.org/html/rfc7578
+"""
+import re
+
+from serverless.exceptions import BadRequest
+
+
+_PARAM = re.compile(r';\s*([^\s=;]+)\s*=\s*("(?:[^"\\]|\\.)*"|[^;]*)')
+
+
+def parse_header_params(value):
+    """
+    Parses a header value with parameters, e.g. a Content-Type
+
+    Returns:
+        value (str): lower cased value before the parameters
+        params (dict): lower cased parameter names mapped to unquoted values
+    """
+    value = value or ''
+    end = value.find(';')
+    if end < 0:
+        return value.strip().lower(), {}
+    params = {}
+    for name, param_value in _PARAM.findall(value, end):
+        param_value = param_value.strip()
+        if param_value.startswith('"'):
+            param_value = re.sub(r'\\(.)', r'\1', param_value[1:-1])
+        params[name.lower()] = param_value
+    return value[:end].strip().lower(), params
+
+
+class Part:
+    """
+    A part of a multipart body
+
+    Attributes:
+        headers (dict): lower cased header names mapped to their value
+        data (memoryview): content of the part, a slice of the request body
+    """
+    __slots__ = ('headers', 'data')
+
+    def __init__(self, headers, data):
+        self.headers = headers
+        self.data = data
+
+    @property
+    def name(self):
+        """Returns the form field name of the part"""
+        return parse_header_params(self.headers.get('content-disposition'))[1].get('name')
+
+    @property
+    def filename(self):
+        """Returns the file name of an uploaded file, None for other fields"""
+        disposition = self.headers.get('content-disposition')
+        return parse_header_params(disposition)[1].get('filename')
+
+    @property
+    def content_type(self):
+        """Returns the media type of the part, ``text/plain`` by default"""
+        return parse_header_params(self.headers.get('content-type', 'text/plain'))[0]
+
+    @property
+    def text(self):
+        """Returns the content decoded with the charset of the part, UTF-8 by default"""
+        charset = parse_header_params(self.headers.get('content-type'))[1].get('charset')
+        return str(self.data, charset or 'utf-8')
+
+
+def _parse_headers(raw):
+    headers = {}
+    for line in raw.decode('latin-1').split('\r\n'):
+        name, sep, value = line.partition(':')
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+    return headers
+
+
+def iter_parts(body, boundary):
+    """
+    Yields the parts of a multipart body
+
+    Args:
+        body (bytes): the body
+        boundary (str): boundary parameter of the Content-Type header
+
+    Raises:
+        BadRequest: if body is not a multipart body delimited by boundary
+    """
+    view = memoryview(body)
+    delimiter = b'--' + boundary.encode('latin-1')
+    separator = b'\r\n' + delimiter
+
+    pos = body.find(delimiter)
+    if pos < 0:
+        raise BadRequest('Malformed multipart body', ('boundary not found',))
+    pos += len(delimiter)
+    while not body.startswith(b'--', pos):
+        line_end = body.find(b'\r\n', pos)
+        if line_end < 0:
+            raise BadRequest('Malformed multipart body', ('truncated part',))
+        start = line_end + 2
+        if body.startswith(b'\r\n', start):
+            headers, data_start = {}, start + 2
+        else:
+            headers_end = body.find(b'\r\n\r\n', start)
+            if headers_end < 0:
+                raise BadRequest('Malformed multipart body', ('truncated headers',))
+            headers, data_start = _parse_headers(body[start:headers_end]), headers_end + 4
+        data_end = body.find(separator, data_start)
+        if data_end < 0:
+            raise BadRequest('Malformed multipart body', ('missing closing boundary',))
+        yield Part(headers, view[data_start:data_end])
+        pos = data_end + len(separator)
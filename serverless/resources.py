@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Container level resources such as DB connections, HTTP sessions and config.
+
+A resource is built the first time a handler uses it, then reused by every warm
+invocation of the container. When a health check is declared it runs once per
+invocation that uses the resource, and a failing resource is closed and rebuilt.
+
+Example:
+    from serverless import lambda_handler, Response
+    from serverless.resources import Resource
+
+    @lambda_handler(resources={
+        'config': load_config,
+        'db': Resource(connect, health_check=lambda conn: conn.ping(), close=disconnect),
+    })
+    def handler(req):
+        rows = req.resources.db.query(req.resources.config['query'])
+        return Response(rows)
+"""
+import atexit
+import logging
+import threading
+
+
+_MISSING = object()
+_logger = logging.getLogger(__name__)
+
+
+class Resource:
+    """
+    A lazily built, container wide resource
+
+    Args:
+        factory (function): builds the resource, called without arguments
+        health_check (function): called with the resource, a falsy result or an
+            exception means the resource must be rebuilt
+        close (function): called with the resource when it is discarded
+    """
+    def __init__(self, factory, health_check=None, close=None):
+        self.factory = factory
+        self.health_check = health_check
+        self.close_func = close
+        self._value = _MISSING
+        self._lock = threading.Lock()
+
+    @property
+    def built(self):
+        """Returns whether the resource currently exists"""
+        return self._value is not _MISSING
+
+    def get(self, check=False):
+        """
+        Returns the resource, building it on first use
+
+        Args:
+            check (bool): run the health check and rebuild the resource if it fails
+
+        Raises:
+            Exception: whatever factory raises, the next call tries again
+        """
+        value = self._value
+        if value is not _MISSING and not (check and not self._is_healthy(value)):
+            return value
+
+        with self._lock:
+            if self._value is value:
+                if value is not _MISSING:
+                    self.close()
+                self._value = self.factory()
+                _register_close(self)
+            return self._value
+
+    def close(self):
+        """Discards the resource, it is rebuilt on next use"""
+        value, self._value = self._value, _MISSING
+        if value is not _MISSING and self.close_func is not None:
+            try:
+                self.close_func(value)
+            except Exception: # pylint: disable=W0703
+                _logger.warning('Failed to close resource %r', value, exc_info=True)
+
+    invalidate = close
+
+    def _is_healthy(self, value):
+        if self.health_check is None:
+            return True
+        try:
+            return bool(self.health_check(value))
+        except Exception: # pylint: disable=W0703
+            _logger.warning('Health check failed for resource %r', value, exc_info=True)
+            return False
+
+
+class Resources:
+    """
+    Named resources of a handler
+
+    Args:
+        resources (dict): names mapped to Resource instances or factory functions
+    """
+    def __init__(self, resources):
+        self._resources = {
+            name: r if isinstance(r, Resource) else Resource(r)
+            for name, r in resources.items()
+        }
+
+    def __getitem__(self, name):
+        return self._resources[name]
+
+    def __iter__(self):
+        return iter(self._resources)
+
+    def scope(self):
+        """Returns a ResourceScope for one invocation"""
+        return ResourceScope(self._resources)
+
+    def warm(self):
+        """Builds every resource that does not exist yet"""
+        for resource in self._resources.values():
+            resource.get()
+
+    def close(self):
+        """Discards every resource"""
+        for resource in self._resources.values():
+            resource.close()
+
+
+class ResourceScope:
+    """
+    The resources as seen by one invocation, available as ``Request.resources``.
+    Resources are accessed by attribute or by key, and each one is built or
+    health checked at most once per invocation.
+    """
+    def __init__(self, resources):
+        self._resources = resources
+        self._values = {}
+
+    def __getitem__(self, name):
+        try:
+            return self._values[name]
+        except KeyError:
+            value = self._values[name] = self._resources[name].get(check=True)
+            return value
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError('Unknown resource: %s' % name)
+
+    def __contains__(self, name):
+        return name in self._resources
+
+
+_built = []
+_built_lock = threading.Lock()
+
+
+def _register_close(resource):
+    """Closes resource when the interpreter exits"""
+    with _built_lock:
+        if not _built:
+            atexit.register(close_all)
+        if resource not in _built:
+            _built.append(resource)
+
+
+def close_all():
+    """Discards every resource that was built in this container"""
+    for resource in list(_built):
+        resource.close()
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Routing of one lambda function to several handlers by method and path"""
+from serverless.compat import iscoroutinefunction
+from serverless.exceptions import MethodNotAllowed, NotFound
+
+
+ANY = 'ANY'
+
+
+class _Node:
+    """A path segment of the route trie"""
+    __slots__ = ('static', 'param', 'param_name', 'greedy_name', 'handlers')
+
+    def __init__(self):
+        self.static = {}
+        self.param = None
+        self.param_name = None
+        self.greedy_name = None
+        self.handlers = {}
+
+
+def _split(path):
+    return [segment for segment in path.split('/') if segment]
+
+
+def _run_on_loop(func):
+    """Returns a function running the coroutine func returns to completion"""
+    def handler(req):
+        from serverless.aio import run
+        return run(func(req))
+    return handler
+
+
+class Router:
+    """
+    Dispatches requests to handlers registered by HTTP method and path template.
+    Templates use the API Gateway syntax: ``{name}`` matches one segment and
+    ``{name+}`` matches the rest of the path. Routes are compiled into a trie of
+    path segments, so dispatch cost depends on the path length and not on the
+    number of routes. Static segments take precedence over parameters.
+
+    A Router is a handler function itself and is meant to be decorated with
+    lambda_handler. The matched parameters are available as ``req.params``.
+
+    Example:
+        router = Router()
+
+        @router.get('/users/{user_id}')
+        def get_user(req):
+            return Response(find_user(req.params['user_id']))
+
+        @router.route(['PUT', 'PATCH'], '/users/{user_id}')
+        def update_user(req):
+            ...
+
+        handler = lambda_handler(router)
+
+    Raises:
+        NotFound: if no route matches the path
+        MethodNotAllowed: if routes match the path but none for the method
+    """
+    def __init__(self):
+        self._root = _Node()
+
+    def add_route(self, methods, path, handler):
+        """
+        Registers handler for methods and path
+
+        Args:
+            methods (str or list): HTTP method(s), ``ANY`` matches every method
+            path (str): path template, e.g. ``/users/{user_id}/orders``
+            handler (function): handler function taking a Request, and typed
+                arguments injected from it (see serverless.injection). An
+                ``async def`` handler is run on the container event loop (see
+                serverless.aio).
+
+        Raises:
+            ValueError: if a route is already registered for a method and path, or
+                if the template is ambiguous with an existing one
+        """
+        if isinstance(methods, str):
+            methods = [methods]
+        from serverless.injection import inject
+        if iscoroutinefunction(handler):
+            handler = _run_on_loop(inject(handler))
+        else:
+            handler = inject(handler)
+
+        node = self._root
+        segments = _split(path)
+        for i, segment in enumerate(segments):
+            if segment.startswith('{') and segment.endswith('+}'):
+                if i != len(segments) - 1:
+                    raise ValueError('Greedy parameter must be last: %s' % path)
+                name = segment[1:-2]
+                if node.greedy_name not in (None, name):
+                    raise ValueError('Conflicting parameter name in %s' % path)
+                node.greedy_name = name
+                handlers = node.handlers.setdefault('+', {})
+                break
+            if segment.startswith('{') and segment.endswith('}'):
+                name = segment[1:-1]
+                if node.param is None:
+                    node.param, node.param_name = _Node(), name
+                elif node.param_name != name:
+                    raise ValueError('Conflicting parameter name in %s' % path)
+                node = node.param
+            else:
+                node = node.static.setdefault(segment, _Node())
+        else:
+            handlers = node.handlers.setdefault('', {})
+
+        for method in methods:
+            method = method.upper()
+            if method in handlers:
+                raise ValueError('Route already registered: %s %s' % (method, path))
+            handlers[method] = handler
+
+    def route(self, methods, path):
+        """Returns a decorator registering the decorated function, see add_route"""
+        def decorator(func):
+            self.add_route(methods, path, func)
+            return func
+        return decorator
+
+    def get(self, path):
+        """Returns a decorator registering a GET route"""
+        return self.route('GET', path)
+
+    def post(self, path):
+        """Returns a decorator registering a POST route"""
+        return self.route('POST', path)
+
+    def put(self, path):
+        """Returns a decorator registering a PUT route"""
+        return self.route('PUT', path)
+
+    def patch(self, path):
+        """Returns a decorator registering a PATCH route"""
+        return self.route('PATCH', path)
+
+    def delete(self, path):
+        """Returns a decorator registering a DELETE route"""
+        return self.route('DELETE', path)
+
+    def match(self, method, path):
+        """
+        Finds the handler for method and path
+
+        Args:
+            method (str): HTTP method
+            path (str): request path
+
+        Returns:
+            handler (function): the matching handler function
+            params (dict): path parameters extracted from path
+
+        Raises:
+            NotFound: if no route matches the path
+            MethodNotAllowed: if routes match the path but none for the method
+        """
+        params = {}
+        handlers = self._match(self._root, _split(path), 0, params)
+        if handlers is None:
+            raise NotFound('No route for %s' % path)
+
+        method = (method or '').upper()
+        handler = handlers.get(method) or handlers.get(ANY)
+        if handler is None and method == 'HEAD':
+            handler = handlers.get('GET')
+        if handler is None:
+            allowed = sorted(handlers)
+            raise MethodNotAllowed(
+                'Method %s not allowed for %s' % (method, path), allowed
+            )
+        return handler, params
+
+    def _match(self, node, segments, index, params):
+        """Returns handlers of the best route for segments[index:], filling params"""
+        if index == len(segments):
+            return node.handlers.get('')
+
+        segment = segments[index]
+        child = node.static.get(segment)
+        if child is not None:
+            handlers = self._match(child, segments, index + 1, params)
+            if handlers is not None:
+                return handlers
+
+        if node.param is not None:
+            handlers = self._match(node.param, segments, index + 1, params)
+            if handlers is not None:
+                params[node.param_name] = segment
+                return handlers
+
+        if node.greedy_name is not None:
+            params[node.greedy_name] = '/'.join(segments[index:])
+            return node.handlers['+']
+        return None
+
+    def __call__(self, req):
+        """Dispatches req to the matching handler and returns its response"""
+        handler, params = self.match(req.method, req.path)
+        req.params = params
+        return handler(req)
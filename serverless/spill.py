@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Spilling of response bodies that are too large for an AWS Lambda payload.
+
+Once the encoded body crosses the threshold, what was encoded so far and the rest
+of the body are written chunk by chunk to a blob store, and the client receives a
+small response pointing at the stored body instead.
+
+Example:
+    from serverless import lambda_handler, Response
+    from serverless.spill import S3BlobStore, Spill
+
+    @lambda_handler(spill=Spill(S3BlobStore('reports-bucket', prefix='spill/')))
+    def handler(req):
+        return Response({'rows': (row_to_dict(row) for row in cursor)})
+"""
+import os
+
+from serverless.streaming import MAX_OUTPUT_BODY_SIZE
+
+
+class BlobWriter:
+    """
+    Writes one blob incrementally. Nothing is visible in the store until
+    commit is called.
+    """
+    def write(self, data):
+        """Appends data (bytes) to the blob"""
+        raise NotImplementedError
+
+    def commit(self):
+        """
+        Completes the blob
+
+        Returns:
+            location (str): URL the blob can be downloaded from
+        """
+        raise NotImplementedError
+
+    def abort(self):
+        """Discards what was written"""
+        raise NotImplementedError
+
+
+class BlobStore:
+    """Interface of the stores response bodies are spilled to"""
+    def open(self, key, content_type):
+        """
+        Starts writing a blob
+
+        Args:
+            key (str): name of the blob, unique per response
+            content_type (str): media type of the blob
+
+        Returns:
+            writer (BlobWriter): writer of the blob
+        """
+        raise NotImplementedError
+
+
+class FileSystemBlobStore(BlobStore):
+    """
+    Stores blobs as files of a directory, e.g. a mounted EFS volume or a temporary
+    directory in tests
+
+    Args:
+        directory (str): directory the files are written to, created if missing
+        base_url (str): URL the directory is served from, locations are
+            ``file://`` URLs when omitted
+    """
+    def __init__(self, directory, base_url=None):
+        self.directory = directory
+        self.base_url = base_url
+
+    def open(self, key, content_type):
+        path = os.path.join(self.directory, key)
+        parent = os.path.dirname(path)
+        if not os.path.isdir(parent):
+            os.makedirs(parent)
+        if self.base_url:
+            location = self.base_url.rstrip('/') + '/' + key
+        else:
+            location = 'file://' + os.path.abspath(path)
+        return _FileWriter(path, location)
+
+
+class _FileWriter(BlobWriter):
+    def __init__(self, path, location):
+        self.path = path
+        self.location = location
+        self._partial = path + '.part'
+        self._file = open(self._partial, 'wb')
+
+    def write(self, data):
+        self._file.write(data)
+
+    def commit(self):
+        self._file.close()
+        os.rename(self._partial, self.path)
+        return self.location
+
+    def abort(self):
+        self._file.close()
+        if os.path.exists(self._partial):
+            os.remove(self._partial)
+
+
+# S3 rejects multipart uploads whose parts, other than the last, are smaller
+S3_MIN_PART_SIZE = 5 * 1024 * 1024
+
+
+class S3BlobStore(BlobStore):
+    """
+    Stores blobs as S3 objects, written with a multipart upload so that at most
+    one part is held in memory. Locations are presigned GET URLs.
+
+    Args:
+        bucket (str): bucket name
+        prefix (str): prepended to the keys of the objects
+        client: boto3 S3 client, created on first use when omitted
+        part_size (int): size in bytes of the uploaded parts, at least 5 MB
+        expires_in (int): validity in seconds of the presigned URLs
+
+    Raises:
+        ValueError: if part_size is smaller than S3 allows
+    """
+    def __init__(self, bucket, prefix='', client=None, part_size=S3_MIN_PART_SIZE,
+                 expires_in=3600):
+        if part_size < S3_MIN_PART_SIZE:
+            raise ValueError('part_size must be at least %d bytes' % S3_MIN_PART_SIZE)
+        self.bucket = bucket
+        self.prefix = prefix
+        self.part_size = part_size
+        self.expires_in = expires_in
+        self._client = client
+
+    @property
+    def client(self):
+        """Returns the S3 client, boto3 is imported on first use"""
+        if self._client is None:
+            import boto3 # pylint: disable=E0401
+            self._client = boto3.client('s3')
+        return self._client
+
+    def open(self, key, content_type):
+        return _S3Writer(self, self.prefix + key, content_type)
+
+
+class _S3Writer(BlobWriter):
+    def __init__(self, store, key, content_type):
+        self.store = store
+        self.key = key
+        self.content_type = content_type
+        self._buffer = bytearray()
+        self._upload_id = None
+        self._parts = []
+
+    def write(self, data):
+        self._buffer += data
+        if len(self._buffer) >= self.store.part_size:
+            self._upload_part()
+
+    def _upload_part(self):
+        client = self.store.client
+        if self._upload_id is None:
+            self._upload_id = client.create_multipart_upload(
+                Bucket=self.store.bucket, Key=self.key, ContentType=self.content_type
+            )['UploadId']
+        number = len(self._parts) + 1
+        result = client.upload_part(
+            Bucket=self.store.bucket, Key=self.key, UploadId=self._upload_id,
+            PartNumber=number, Body=bytes(self._buffer)
+        )
+        self._parts.append({'PartNumber': number, 'ETag': result['ETag']})
+        self._buffer = bytearray()
+
+    def commit(self):
+        client = self.store.client
+        if self._upload_id is None:
+            # small enough for one request
+            client.put_object(
+                Bucket=self.store.bucket, Key=self.key, ContentType=self.content_type,
+                Body=bytes(self._buffer)
+            )
+        else:
+            if self._buffer:
+                self._upload_part()
+            client.complete_multipart_upload(
+                Bucket=self.store.bucket, Key=self.key, UploadId=self._upload_id,
+                MultipartUpload={'Parts': self._parts}
+            )
+        return client.generate_presigned_url(
+            'get_object', Params={'Bucket': self.store.bucket, 'Key': self.key},
+            ExpiresIn=self.store.expires_in
+        )
+
+    def abort(self):
+        self._buffer = bytearray()
+        if self._upload_id is not None:
+            self.store.client.abort_multipart_upload(
+                Bucket=self.store.bucket, Key=self.key, UploadId=self._upload_id
+            )
+
+
+def _random_key():
+    import uuid
+    return uuid.uuid4().hex + '.json'
+
+
+class Spill:
+    """
+    Spill settings of a handler
+
+    Args:
+        store (BlobStore): store the bodies are written to
+        threshold (int): bodies larger than this many bytes once escaped in the
+            Lambda output are spilled (see serverless.streaming.output_size), by
+            default the largest body that fits in the output
+        redirect (bool): answer with ``303 See Other`` and a Location header,
+            otherwise with ``200 OK``; the body is ``{"location": url, "size": n}``
+            either way
+        key (function): returns the key of a new blob, a random one by default
+    """
+    content_type = 'application/json'
+
+    def __init__(self, store, threshold=MAX_OUTPUT_BODY_SIZE, redirect=True, key=None):
+        self.store = store
+        self.threshold = threshold
+        self.redirect = redirect
+        self.key = key or _random_key
+
+    def write(self, head, rest):
+        """
+        Writes a body to the store, used as the overflow of streaming.encode
+
+        Args:
+            head (list): chunks encoded so far, emptied once written
+            rest (iterator): the remaining chunks
+
+        Returns:
+            location (str): URL of the stored body
+            size (int): size of the stored body in bytes
+        """
+        writer = self.store.open(self.key(), self.content_type)
+        size = 0
+        try:
+            for chunks in (head, rest):
+                for chunk in chunks:
+                    data = chunk.encode('utf-8')
+                    size += len(data)
+                    writer.write(data)
+                del head[:]
+            location = writer.commit()
+        except BaseException:
+            writer.abort()
+            raise
+        return location, size
+
+    def pointer(self, location, size):
+        """Returns the status code, headers and data of the response to a spilled body"""
+        data = {'location': location, 'size': size}
+        if self.redirect:
+            return 303, {'Location': location}, data
+        return 200, {}, data
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Incremental JSON encoding of response data that holds iterators.
+
+Data without iterators is encoded in one codec call and its size checked
+afterwards, which is much faster than encoding it piece by piece. Otherwise the
+top level value and the values directly inside it are encoded piece by piece:
+lists, tuples and iterators (e.g. generators) item by item, dicts member
+by member. Anything nested deeper is encoded in one codec call. Iterators are
+consumed lazily, so rows produced by a generator are never all held in memory.
+"""
+try:
+    from collections.abc import Iterator
+except ImportError: # pragma: no cover
+    from collections import Iterator
+
+from json.encoder import encode_basestring_ascii
+
+from serverless.exceptions import PayloadTooLarge
+
+
+# AWS Lambda limit on synchronous invocation responses
+LAMBDA_PAYLOAD_LIMIT = 6 * 1024 * 1024
+# room left in the invocation output for the status code and headers
+OUTPUT_HEADROOM = 64 * 1024
+# largest body that fits in the invocation output, measured by output_size
+MAX_OUTPUT_BODY_SIZE = LAMBDA_PAYLOAD_LIMIT - OUTPUT_HEADROOM
+
+
+def is_stream(obj):
+    """Returns whether obj is an iterator that can only be encoded incrementally"""
+    return isinstance(obj, Iterator)
+
+
+def iter_json(obj, codec, depth=2):
+    """
+    Yields the JSON encoding of obj in chunks
+
+    Args:
+        obj: data to encode
+        codec (JsonCodec): codec encoding the leaves and defining separators
+        depth (int): number of container levels encoded incrementally
+    """
+    if depth and isinstance(obj, dict):
+        yield '{'
+        separator = ''
+        for key, value in obj.items():
+            if not isinstance(key, str):
+                key = codec.dumps(key).strip('"')
+            yield separator + codec.dumps(key) + codec.key_separator
+            for chunk in iter_json(value, codec, depth - 1):
+                yield chunk
+            separator = codec.item_separator
+        yield '}'
+    elif depth and isinstance(obj, (list, tuple, Iterator)):
+        yield '['
+        separator = ''
+        for item in obj:
+            yield separator
+            for chunk in iter_json(item, codec, depth - 1):
+                yield chunk
+            separator = codec.item_separator
+        yield ']'
+    else:
+        yield codec.dumps(obj)
+
+
+def encode(obj, codec, max_size=None, overflow=None):
+    """
+    Encodes obj incrementally, stopping as soon as max_size is crossed
+
+    Args:
+        obj: data to encode
+        codec (JsonCodec): codec to encode with
+        max_size (int): maximum size of the encoded data, see output_size
+        overflow (function): called instead of raising when max_size is crossed,
+            with the list of chunks encoded so far and an iterator of the rest.
+            Its return value is returned.
+
+    Returns:
+        body (str): JSON document
+
+    Raises:
+        PayloadTooLarge: if the encoded data is larger than max_size
+    """
+    chunks = []
+    size = 0
+    remaining = iter_json(obj, codec)
+    for chunk in remaining:
+        size += output_size(chunk)
+        chunks.append(chunk)
+        if max_size is not None and size > max_size:
+            if overflow is not None:
+                return overflow(chunks, remaining)
+            raise _too_large(max_size)
+    return ''.join(chunks)
+
+
+def check_size(body, max_size):
+    """
+    Returns body, an encoded JSON document, if it fits in max_size
+
+    Raises:
+        PayloadTooLarge: if the output_size of body is larger than max_size
+    """
+    # escaping never shortens text
+    if len(body) > max_size or output_size(body) > max_size:
+        raise _too_large(max_size)
+    return body
+
+
+def _too_large(max_size):
+    return PayloadTooLarge(
+        'Response body exceeds %d bytes' % max_size, ({'max_size': max_size},)
+    )
+
+
+def output_size(text):
+    """
+    Returns the size in bytes of text in the AWS Lambda invocation output, where
+    the body is a JSON string: quotes and backslashes are escaped again, and
+    non-ASCII characters are written as ``\\uXXXX`` escapes
+    """
+    return len(encode_basestring_ascii(text)) - 2
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Short-circuit of warm-up events that keep containers warm.
+
+A ping is recognized before a Request is built and answered right away, without
+running the handler. Optionally the container resources are built and priming
+functions are called, so the next real request finds everything ready.
+
+Example:
+    @lambda_handler(resources={'db': connect}, warmup=WarmUp(warm_resources=True))
+    def handler(req):
+        ...
+"""
+
+
+# EventBridge schedules and the serverless-plugin-warmup plugin
+DEFAULT_SOURCES = ('aws.events', 'serverless-plugin-warmup')
+
+
+class WarmUp:
+    """
+    Warm-up settings of a handler
+
+    Args:
+        sources (tuple): values of ``event['source']`` that mark pings, e.g.
+            ``aws.events`` for EventBridge schedules
+        marker (str): events with a truthy value under this key are pings
+        matches (function): called with events not matched otherwise, returns
+            whether the event is a ping
+        warm_resources (bool): builds the resources of the handler on pings
+        prime (function): called without arguments on every ping
+
+    Attributes:
+        pings (int): pings answered by this container
+    """
+    def __init__(self, sources=DEFAULT_SOURCES, marker='warmer', matches=None,
+                 warm_resources=False, prime=None):
+        self.sources = frozenset(sources)
+        self.marker = marker
+        self.custom_matches = matches
+        self.warm_resources = warm_resources
+        self.prime = prime
+        self.pings = 0
+
+    def matches(self, event):
+        """Returns whether event is a ping"""
+        if not isinstance(event, dict):
+            return False
+        if event.get(self.marker) or event.get('source') in self.sources:
+            return True
+        return self.custom_matches is not None and bool(self.custom_matches(event))
+
+    def handle(self, resources=None):
+        """
+        Answers a ping
+
+        Args:
+            resources (Resources): resources of the handler, built if warm_resources
+
+        Returns:
+            output (dict): ``{'warmup': True, 'pings': n}``
+        """
+        self.pings += 1
+        if self.warm_resources and resources is not None:
+            resources.warm()
+        if self.prime is not None:
+            self.prime()
+        return {'warmup': True, 'pings': self.pings}
@@ -15,45 +15,98 @@
 # limitations under the License.
 
 """Serverless wrapper classes"""
-from datetime import date, datetime
-import json
-import logging
-import uuid
+from serverless.codecs import get_codec
+from serverless.encoders import ServerlessJsonEncoder # pylint: disable=W0611
+from serverless.compat import JSONDecodeError, MappingProxyType, MutableMapping
+from serverless.exceptions import BadRequest, PayloadTooLarge
+from serverless.metrics import NULL_TIMINGS
+from serverless import events, streaming
 
-from serverless.compat import JSONDecodeError
-from serverless.exceptions import BadRequest
 
+_MISSING = object()
 
-class ServerlessJsonEncoder(json.JSONEncoder):
+
+def _has_stream(data):
+    """Returns whether data is, or directly holds, an iterator"""
+    if isinstance(data, dict):
+        return any(streaming.is_stream(value) for value in data.values())
+    return streaming.is_stream(data)
+
+
+def make_etag(body):
     """
-    The default Serverless JSON encoder. This one extends python's default json encoder to
-    support serialization of ``date``, ``datetime`` and ``UUID`` objects.
+    Returns a strong ETag computed from a hash of body
 
-    NOTE: ISO-8601 format willbe used for date serialization.
+    Args:
+        body (str or bytes): serialized response body
     """
-    def default(self, o): # pylint: disable=E0202
-        """Serializes object"""
-        if isinstance(o, (date, datetime)):
-            return o.isoformat()
-        if isinstance(o, uuid.UUID):
-            return str(o)
-        return json.JSONEncoder.default(self, o)
+    import hashlib
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    # sha1 is available on every supported python, blake2b is not on 2.7
+    return '"%s"' % hashlib.sha1(body).hexdigest()[:32]
+
+
+def quote_etag(etag):
+    """Returns etag wrapped in double quotes unless it already is"""
+    if etag.startswith('"') or etag.startswith('W/"'):
+        return etag
+    return '"%s"' % etag
+
+
+def _etag_with_fields(etag, spec):
+    """Returns the quoted etag of data pruned to the field spec, see Fields"""
+    weak = 'W/' if etag.startswith('W/') else ''
+    return '%s"%s;%s"' % (weak, _opaque_tag(etag)[1:-1], make_etag(spec)[1:9])
+
+
+def _opaque_tag(etag):
+    """Returns etag without its weakness indicator"""
+    return etag[2:] if etag.startswith('W/') else etag
+
 
+def _add_vary(headers, name):
+    """Adds name to the Vary header of headers (dict) unless it is listed"""
+    vary = headers.get('Vary')
+    if not vary:
+        headers['Vary'] = name
+    elif name.lower() not in vary.lower():
+        headers['Vary'] = vary + ', ' + name
 
-class Request:
+
+class Request(object):
     """
     Request wrapper class to help precessing AWS Lambda input
 
     Args:
         event (dict): AWS Lambda event
         context (LambdaContext): AWS Lambda context
+        codec (JsonCodec or str): JSON codec for the body, process default if omitted
+        resources (ResourceScope): container resources of the handler
+        timings (Timings): records the time spent decoding the body
+        logger (StructuredLogger): logging settings of the handler
+        event_format (EventFormat): format of event, detected when omitted (see
+            serverless.events)
+        deadline (Deadline): time limit of the request
+        max_body_size (int): maximum size of a body sent with a Content-Encoding,
+            once decompressed (see serverless.compression.DEFAULT_MAX_BODY_SIZE)
 
     Attributes:
         event (dict): AWS Lambda event
         context (LambdaContext): AWS Lambda context
+        resources (ResourceScope): container resources of the handler, accessed as
+            ``req.resources.name``, None when the handler declares none
         data (dict): request body
+        lazy_data (LazyObject): request body decoded on access (see
+            serverless.lazyjson)
+        raw (bytes): request body as bytes
         query (dict): query string parameters
         params (dict): path parameters
+        logger (RequestLogger): logger bound to the request id and route
+        format (EventFormat): format of event, the REST API format for events of
+            no known format
+        deadline (Deadline): time limit and cancellation signal of the request,
+            without limit unless lambda_handler enforces one
 
     Raises:
         BadRequest: if event['body'] is not None and not deserializable
@@ -61,11 +114,47 @@ class Request:
     .. _AWS Lambda python programming model:
        http://docs.aws.amazon.com/lambda/latest/dg/python-programming-model-handler-types.html
     """
-    def __init__(self, event, context):
+    __slots__ = (
+        'event', 'context', 'codec', 'resources', 'timings', '_data', '_params',
+        '_log_settings', '_logger', 'format', '_deadline', 'max_body_size', '_raw',
+        '_lazy'
+    )
+
+    def __init__(self, event, context, codec=None, resources=None, timings=None,
+                 logger=None, event_format=None, deadline=None, max_body_size=None):
         self.event = event
         self.context = context
-        self._data = None
-        self.logger = logging.getLogger(__name__)
+        self.codec = codec
+        self.resources = resources
+        self.timings = timings or NULL_TIMINGS
+        self._data = _MISSING
+        self._lazy = None
+        self._params = None
+        self._log_settings = logger
+        self._logger = None
+        self.format = event_format or events.detect(event) or events.REST_API
+        self._deadline = deadline
+        self.max_body_size = max_body_size
+        self._raw = None
+
+    @property
+    def logger(self):
+        """Returns the RequestLogger of the request, logging is imported on first use"""
+        if self._logger is None:
+            if self._log_settings is not None:
+                self._logger = self._log_settings.bind(self.event, self.context)
+            else:
+                from serverless.logs import default_logger
+                self._logger = default_logger(self.event, self.context)
+        return self._logger
+
+    @property
+    def deadline(self):
+        """Returns the Deadline of the request, threading is imported on first use"""
+        if self._deadline is None:
+            from serverless.deadline import NO_DEADLINE
+            self._deadline = NO_DEADLINE
+        return self._deadline
 
     @property
     def data(self):
@@ -82,16 +171,74 @@ class Request:
         .. _JSONDecodeError:
            https://docs.python.org/3/library/json.html#json.JSONDecodeError
         """
-        if not self._data:
-            body = self.event.get('body', None)
+        if self._data is _MISSING:
+            content_type = self.get_header('Content-Type')
+            if content_type and not content_type.startswith('application/json'):
+                binary = self._binary_data(content_type)
+                if binary is not _MISSING:
+                    return binary
+            body = self.body
+            self.timings.start('parse')
             try:
-                self._data = json.loads(body) if body else dict()
+                self._data = get_codec(self.codec).loads(body) if body else dict()
             except JSONDecodeError as e:
                 self.logger.info('Failed to decode request body=%r', body)
                 errors = (str(e))
                 raise BadRequest('Malformed request body', errors)
+            finally:
+                self.timings.stop('parse')
         return self._data
 
+    def _binary_data(self, content_type):
+        """Decodes and returns a MessagePack or CBOR body, _MISSING for other types"""
+        from serverless.binary import codec_for_content_type
+        codec = codec_for_content_type(content_type)
+        if codec is None:
+            return _MISSING
+        raw = self.raw
+        self.timings.start('parse')
+        try:
+            self._data = codec.loads(raw) if raw else dict()
+        except ValueError as e:
+            self.logger.info('Failed to decode %s request body', codec.name)
+            raise BadRequest('Malformed request body', (str(e),))
+        finally:
+            self.timings.stop('parse')
+        return self._data
+
+    @property
+    def lazy_data(self):
+        """
+        Returns the JSON object body as a read-only mapping that decodes values
+        on first access, so reading a few keys of a large document does not
+        decode all of it (see serverless.lazyjson)
+
+        Raises:
+            BadRequest: if the body is not a JSON object, or on access to a
+                malformed value
+        """
+        if self._lazy is None:
+            from serverless.lazyjson import LazyObject
+            self._lazy = LazyObject(self.body or '{}', self.codec)
+        return self._lazy
+
+    def iter_data(self, key=None):
+        """
+        Yields the items of a JSON array body, or of the array under key of a
+        JSON object body, decoding one item at a time
+
+        Args:
+            key (str): top-level key of the array, None if the body is the array
+
+        Raises:
+            KeyError: if the body has no key
+            BadRequest: if there is no array to iterate or an item is malformed
+        """
+        if key is not None:
+            return self.lazy_data.iter(key)
+        from serverless.lazyjson import iter_array
+        return iter_array(self.body or '[]', self.codec)
+
     @property
     def query(self):
         """
@@ -100,20 +247,353 @@ class Request:
         Raises:
             AttributeError: if event is not dict like object
         """
-        return self.event.get('queryStringParameters', dict())
+        return self.format.query(self.event)
+
+    @property
+    def multi_query(self):
+        """
+        Returns HTTP query string as dict of lists, holding every value of
+        repeated parameters
+
+        Raises:
+            AttributeError: if event is not dict like object
+        """
+        return self.format.multi_query(self.event)
 
     @property
     def params(self):
         """
-        Returns HTTP path params as dict
+        Returns HTTP path params as dict, set by Router when routing the request
+
+        Raises:
+            AttributeError: if event is not dict like object
+        """
+        if self._params is not None:
+            return self._params
+        return self.format.params(self.event)
+
+    @params.setter
+    def params(self, params):
+        self._params = params
+
+    @property
+    def path(self):
+        """
+        Returns HTTP request path
+
+        Raises:
+            AttributeError: if event is not dict like object
+        """
+        return self.format.path(self.event)
+
+    @property
+    def method(self):
+        """
+        Returns HTTP method
+
+        Raises:
+            AttributeError: if event is not dict like object
+        """
+        return self.format.method(self.event)
+
+    @property
+    def headers(self):
+        """
+        Returns HTTP headers as dict
+
+        Raises:
+            AttributeError: if event is not dict like object
+        """
+        return self.format.headers(self.event)
+
+    @property
+    def multi_headers(self):
+        """
+        Returns HTTP headers as dict of lists, holding every value of repeated
+        headers
 
         Raises:
             AttributeError: if event is not dict like object
         """
-        return self.event.get('pathParameters', dict())
+        return self.format.multi_headers(self.event)
 
+    @property
+    def cookies(self):
+        """
+        Returns request cookies as dict
 
-class Response:
+        Raises:
+            AttributeError: if event is not dict like object
+        """
+        return self.format.cookies(self.event)
+
+    @property
+    def body(self):
+        """
+        Returns HTTP request body as text, base64 encoded and compressed bodies
+        are decoded
+
+        Raises:
+            AttributeError: if event is not dict like object
+        """
+        if self._raw is None and not self.event.get('isBase64Encoded') \
+                and not self.get_header('Content-Encoding'):
+            return self.format.body(self.event)
+        return self.raw.decode('utf-8')
+
+    @property
+    def raw(self):
+        """
+        Returns HTTP request body as bytes. Base64 encoded bodies are decoded, and
+        bodies sent with a Content-Encoding decompressed, once per request.
+
+        Raises:
+            AttributeError: if event is not dict like object
+            PayloadTooLarge: if the decompressed body exceeds max_body_size bytes
+            UnsupportedMediaType: if the Content-Encoding is not gzip or deflate
+        """
+        if self._raw is None:
+            raw = self.format.raw_body(self.event)
+            coding = (self.get_header('Content-Encoding') or '').strip().lower()
+            if raw and coding and coding != 'identity':
+                from serverless.compression import decompress
+                raw = decompress(raw, coding, self.max_body_size)
+            self._raw = raw
+        return self._raw
+
+    def parts(self):
+        """
+        Yields the parts of a multipart body, e.g. multipart/form-data uploads.
+        The content of each part is a memoryview of ``req.raw``, parts are not
+        copied (see serverless.multipart).
+
+        Raises:
+            BadRequest: if the body is not a multipart body
+        """
+        from serverless.multipart import iter_parts, parse_header_params
+        media_type, params = parse_header_params(self.get_header('Content-Type'))
+        if not media_type.startswith('multipart/') or not params.get('boundary'):
+            raise BadRequest('Expected a multipart body', ({'content_type': media_type},))
+        return iter_parts(self.raw, params['boundary'])
+
+    def get_header(self, name, default=None):
+        """
+        Returns the value of the header name, matched case-insensitively
+
+        Args:
+            name (str): header name
+            default: value returned when the header is missing
+        """
+        name = name.lower()
+        for key, value in self.headers.items():
+            if key.lower() == name:
+                return value
+        return default
+
+    def fan_out(self, calls, timeout=None, return_exceptions=False):
+        """
+        Runs calls concurrently on the thread pool of the container, waiting no
+        longer than the time left of the invocation or the request deadline (see
+        serverless.fanout)
+
+        Args:
+            calls (list): functions called without arguments, e.g. functools.partial
+            timeout (float): maximum seconds to wait for all calls
+            return_exceptions (bool): put exceptions raised by calls in the results
+                instead of raising the first of them
+
+        Returns:
+            results (list): return values of calls, in order
+
+        Raises:
+            GatewayTimeout: if calls are still running when the time is up
+        """
+        from serverless.fanout import fan_out
+        remaining = self.deadline.remaining()
+        if remaining is not None:
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        return fan_out(
+            calls, self.context, timeout=timeout, return_exceptions=return_exceptions
+        )
+
+    def etag_matches(self, etag):
+        """
+        Returns whether etag matches the If-None-Match header, using the weak
+        comparison required for conditional GET
+
+        Args:
+            etag (str): quoted entity tag of the current representation
+        """
+        header = self.get_header('If-None-Match')
+        if not header:
+            return False
+        if header.strip() == '*':
+            return True
+        opaque = _opaque_tag(etag)
+        return any(_opaque_tag(tag.strip()) == opaque for tag in header.split(','))
+
+
+def _deserialize_dynamodb(value):
+    """Converts a DynamoDB typed attribute value to a python value"""
+    import base64
+    from decimal import Decimal
+
+    (kind, raw), = value.items()
+    if kind in ('S', 'BOOL'):
+        return raw
+    if kind == 'N':
+        return Decimal(raw)
+    if kind == 'B':
+        return base64.b64decode(raw)
+    if kind == 'NULL':
+        return None
+    if kind == 'M':
+        return {k: _deserialize_dynamodb(v) for k, v in raw.items()}
+    if kind == 'L':
+        return [_deserialize_dynamodb(v) for v in raw]
+    if kind == 'SS':
+        return set(raw)
+    if kind == 'NS':
+        return set(Decimal(v) for v in raw)
+    if kind == 'BS':
+        return set(base64.b64decode(v) for v in raw)
+    raise ValueError('Unknown DynamoDB attribute type: %s' % kind)
+
+
+class Record(object):
+    """
+    Wrapper of a single SQS, Kinesis or DynamoDB Streams record of a batch event.
+    Nothing is decoded until it is accessed.
+
+    Args:
+        record (dict): a record of event['Records']
+        context (LambdaContext): AWS Lambda context
+        codec (JsonCodec or str): JSON codec for the body, process default if omitted
+
+    Attributes:
+        record (dict): the raw record
+        context (LambdaContext): AWS Lambda context
+        id (str): identifier reported back in batchItemFailures
+        source (str): event source, e.g. ``aws:sqs``
+        body (str): message body (SQS) or decoded data (Kinesis)
+        data: JSON decoded body, or the new image of a DynamoDB Streams record
+
+    Raises:
+        BadRequest: if body is not deserializable
+    """
+    __slots__ = ('record', 'context', 'codec', '_data')
+
+    def __init__(self, record, context, codec=None):
+        self.record = record
+        self.context = context
+        self.codec = codec
+        self._data = _MISSING
+
+    @property
+    def source(self):
+        """Returns event source of the record"""
+        return self.record.get('eventSource') or self.record.get('EventSource')
+
+    @property
+    def id(self): # pylint: disable=C0103
+        """Returns SQS message id or Kinesis/DynamoDB sequence number"""
+        if 'messageId' in self.record:
+            return self.record['messageId']
+        if 'kinesis' in self.record:
+            return self.record['kinesis']['sequenceNumber']
+        if 'dynamodb' in self.record:
+            return self.record['dynamodb']['SequenceNumber']
+        return None
+
+    @property
+    def body(self):
+        """Returns text body of SQS and Kinesis records"""
+        if 'kinesis' in self.record:
+            import base64
+            return base64.b64decode(self.record['kinesis']['data']).decode('utf-8')
+        return self.record.get('body')
+
+    @property
+    def data(self):
+        """
+        Returns JSON decoded body, or the new image of a DynamoDB Streams record
+
+        Raises:
+            BadRequest: if body is not a valid JSON document
+        """
+        if self._data is _MISSING:
+            if 'dynamodb' in self.record:
+                self._data = self.new_image
+            else:
+                body = self.body
+                try:
+                    self._data = get_codec(self.codec).loads(body) if body else None
+                except JSONDecodeError as e:
+                    raise BadRequest('Malformed record body', (str(e),))
+        return self._data
+
+    @property
+    def new_image(self):
+        """Returns the NewImage of a DynamoDB Streams record as dict"""
+        return self._image('NewImage')
+
+    @property
+    def old_image(self):
+        """Returns the OldImage of a DynamoDB Streams record as dict"""
+        return self._image('OldImage')
+
+    def _image(self, name):
+        image = self.record.get('dynamodb', {}).get(name)
+        if image is None:
+            return None
+        return {k: _deserialize_dynamodb(v) for k, v in image.items()}
+
+
+class _ResponseHeaders(MutableMapping):
+    """
+    The headers of a Response: its own headers layered over the shared default
+    headers. Setting a header stores it on the response; deleting a default
+    header first copies the defaults to the response.
+    """
+    # pylint: disable=W0212
+    __slots__ = ('_resp',)
+
+    def __init__(self, resp):
+        self._resp = resp
+
+    def __getitem__(self, name):
+        own = self._resp._headers
+        if name in own:
+            return own[name]
+        return self._resp._base_headers[name]
+
+    def __setitem__(self, name, value):
+        self._resp._headers[name] = value
+
+    def __delitem__(self, name):
+        resp = self._resp
+        if name in resp._base_headers:
+            resp._headers = resp._merged_headers()
+            resp._base_headers = {}
+        del resp._headers[name]
+
+    def __iter__(self):
+        own = self._resp._headers
+        for name in own:
+            yield name
+        for name in self._resp._base_headers:
+            if name not in own:
+                yield name
+
+    def __len__(self):
+        own = self._resp._headers
+        return len(own) + sum(1 for name in self._resp._base_headers if name not in own)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class Response(object):
     """
     Response wrapper class to help formmating output compatible with AWS Lambda
 
@@ -121,44 +601,236 @@ class Response:
         data (dict): data to populate response body
         status_code (int): response status code
         headers (dict): response headers
+        codec (JsonCodec or str): JSON codec for the body, process default if omitted
+        compression (Compression): compresses the body when the request accepts it
+        etag (str or bool): entity tag of data, or True to compute one from the body.
+            A GET or HEAD request whose If-None-Match header matches it is answered
+            with an empty ``304 Not Modified``; a given tag saves serializing data.
+            A given tag is combined with the field spec when fields prune data.
+        max_size (int): maximum body size in bytes once escaped in the Lambda output
+            (see serverless.streaming.output_size)
+        spill (Spill): writes bodies larger than its threshold to a blob store and
+            answers with a pointer to them instead, max_size is then not applied
+            (see serverless.spill)
+        cookies (list): Set-Cookie header values
+        binary_formats (BinaryFormats): binary encodings, MessagePack or CBOR, the
+            body is sent in when the request's Accept header asks for one (see
+            serverless.binary)
+        fields (Fields): prunes data of successful responses to the fields listed
+            in the request's ``fields`` query parameter (see serverless.fields)
+
+    Attributes:
+        headers (MutableMapping): the response headers, i.e. the given headers
+            layered over the shared security headers. Setting a header only stores
+            it on the response, deleting a security header copies them to it
+            first; assigning a dict replaces all headers.
     """
-    _security_headers = {
+    __slots__ = (
+        'data', 'status_code', 'codec', 'compression', 'etag', 'max_size', 'spill',
+        'cookies', 'binary_formats', 'fields', '_body', '_base_headers', '_headers'
+    )
+
+    _security_headers = MappingProxyType({
         'X-Content-Type-Options': 'nosniff',
         'X-Frame-Options': 'SAMEORIGIN',
         'Cache-Control': 'no-cache, must-revalidate',
         'Pragma': 'no-cache',
         'X-XSS-Protection': '1; mode=block'
-    }
+    })
 
-    def __init__(self, data=None, status_code=200, headers=None):
+    def __init__(self, data=None, status_code=200, headers=None, codec=None,
+                 compression=None, etag=None, max_size=None, spill=None, cookies=None,
+                 binary_formats=None, fields=None):
         self.data = data
         self.status_code = status_code
-        self.headers = self._security_headers.copy()
+        self.codec = codec
+        self.compression = compression
+        self.etag = etag
+        self.max_size = max_size
+        self.spill = spill
+        self.cookies = cookies
+        self.binary_formats = binary_formats
+        self.fields = fields
+        self._body = None
+        self._base_headers = self._security_headers
+        self._headers = dict(headers) if headers else None
 
-        if headers:
-            self.headers.update(headers)
+    @property
+    def headers(self):
+        """Returns the response headers, see Attributes"""
+        if self._headers is None:
+            self._headers = {}
+        return _ResponseHeaders(self)
+
+    @headers.setter
+    def headers(self, headers):
+        self._base_headers = {}
+        self._headers = dict(headers)
+
+    def _merged_headers(self, **extra):
+        """Returns a new dict of the response headers, updated with extra"""
+        headers = dict(self._base_headers)
+        if self._headers:
+            headers.update(self._headers)
+        if extra:
+            headers.update(extra)
+        return headers
 
     @property
     def body(self):
-        """Returns string representation of body"""
-        return json.dumps(self.data, cls=ServerlessJsonEncoder)
+        """
+        Returns string representation of body
 
-    def to_lambda_output(self):
+        Raises:
+            PayloadTooLarge: if the body is larger than max_size
+        """
+        if self._body is not None:
+            return self._body
+
+        codec = get_codec(self.codec)
+        if not _has_stream(self.data):
+            body = codec.dumps(self.data)
+            if self.max_size is None:
+                return body
+            return streaming.check_size(body, self.max_size)
+
+        # iterators can only be consumed once
+        self._body = streaming.encode(self.data, codec, self.max_size)
+        return self._body
+
+    def _encode_or_spill(self):
+        """Returns the body, or the location and size of the body if it was spilled"""
+        if self._body is not None:
+            return self._body
+
+        spill = self.spill
+        codec = get_codec(self.codec)
+        if not _has_stream(self.data):
+            body = codec.dumps(self.data)
+            if streaming.output_size(body) > spill.threshold:
+                return spill.write([body], ())
+            return body
+
+        result = streaming.encode(self.data, codec, spill.threshold, spill.write)
+        if not isinstance(result, tuple):
+            # iterators can only be consumed once
+            self._body = result
+        return result
+
+    def to_lambda_output(self, req=None):
         """
         Returns AWS Lambda compatible response populated with
         the given data, status_code, and headers.
-        By default, it uses ServerlessJsonEncoder for serialization.
+        By default, it uses the process default codec for serialization.
+
+        Args:
+            req (Request): the request being answered, used for content negotiation
+                and to shape the output for the format of its event
 
         Returns:
             resp (dict): AWS Lambda compatible response data
 
         Raises:
             TypeError: if self.data is not JSON serializable
+            PayloadTooLarge: if the body is larger than max_size
         """
+        output = self._to_output(req)
+        if req is not None:
+            return req.format.output(output, req.event, self.cookies)
+        return events.REST_API.output(output, None, self.cookies)
+
+    def _to_output(self, req):
+        """Returns the output of to_lambda_output in the REST API format"""
+        conditional = (
+            req is not None and self.status_code == 200 and req.method in ('GET', 'HEAD')
+        )
+        spec = None
+        if self.fields is not None and req is not None and 200 <= self.status_code < 300 \
+                and self._body is None and not _has_stream(self.data):
+            spec = req.query.get(self.fields.param)
+            self.data = self.fields.apply(self.data, req)
+        etag = self.etag
+        if etag and etag is not True:
+            etag = quote_etag(etag)
+            if spec:
+                # the given tag is that of the whole data
+                etag = _etag_with_fields(etag, spec)
+            if conditional and req.etag_matches(etag):
+                return self._not_modified(etag, req)
+
+        body, media_type = None, None
+        if self.binary_formats is not None and req is not None:
+            body, media_type = self._encode_binary(req)
+        if body is None:
+            body = self.body if self.spill is None else self._encode_or_spill()
+        if isinstance(body, tuple):
+            return self._spilled(body, req)
+        if etag is True:
+            etag = make_etag(body)
+            if conditional and req.etag_matches(etag):
+                return self._not_modified(etag, req)
+
         resp = {
             'statusCode': self.status_code,
-            'body': self.body,
-            'headers': self.headers
+            'body': body,
+            'headers': self._merged_headers(ETag=etag) if etag else self._merged_headers()
+        }
+        if self.binary_formats is not None:
+            _add_vary(resp['headers'], 'Accept')
+        if media_type is not None:
+            import base64
+            resp['body'] = base64.b64encode(body).decode('ascii')
+            resp['isBase64Encoded'] = True
+            resp['headers']['Content-Type'] = media_type
+
+        if self.compression is not None:
+            accept_encoding = req.get_header('Accept-Encoding') if req else None
+            self.compression.apply(resp, accept_encoding)
+        return resp
+
+    def _encode_binary(self, req):
+        """
+        Returns the body encoded in the binary format the request accepts and its
+        media type, (None, None) to send it as JSON. Streamed data is always
+        sent as JSON, as are bodies a spill would move to the blob store.
+
+        Raises:
+            PayloadTooLarge: if the encoded body is larger than max_size
+        """
+        if _has_stream(self.data):
+            return None, None
+        codec, media_type = self.binary_formats.negotiate(req.get_header('Accept'))
+        if codec is None:
+            return None, None
+        body = codec.dumps(self.data)
+        # size of the base64 encoded body in the output
+        size = (len(body) + 2) // 3 * 4
+        if self.spill is not None and size > self.spill.threshold:
+            return None, None
+        if self.spill is None and self.max_size is not None and size > self.max_size:
+            raise PayloadTooLarge(
+                'Response body exceeds %d bytes' % self.max_size,
+                ({'max_size': self.max_size},)
+            )
+        return body, media_type
+
+    def _spilled(self, result, req):
+        """Returns the AWS Lambda output pointing at a spilled body"""
+        status_code, headers, data = self.spill.pointer(*result)
+        resp = Response(
+            data, status_code, codec=self.codec, compression=self.compression
+        )
+        resp.headers = self._merged_headers(**headers)
+        return resp._to_output(req) # pylint: disable=W0212
+
+    def _not_modified(self, etag, req):
+        """Returns the AWS Lambda output of an empty 304 response carrying etag"""
+        resp = {
+            'statusCode': 304,
+            'body': '',
+            'headers': self._merged_headers(ETag=etag)
         }
 
+        if self.compression is not None:
+            self.compression.apply(resp, req.get_header('Accept-Encoding'))
         return resp
@@ -19,6 +19,9 @@ import serverless
 
 
 requires = []
+extras = {
+    'orjson': ['orjson'],
+}
 
 
 def long_description():
@@ -33,5 +36,6 @@ setup(
     author=serverless.__author__,
     license=serverless.__licence__,    
     packages=find_packages(exclude=['tests']),
-    install_requires=requires
+    install_requires=requires,
+    extras_require=extras
 )
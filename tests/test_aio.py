@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import asyncio
+
+import pytest
+
+from serverless import aio
+from serverless.decorators import lambda_handler
+from serverless.exceptions import NotFound
+from serverless.wrappers import Response
+
+from tests import utils
+
+
+def test_lambda_handler_async(context, dict_data):
+    event = utils.build_event(dict_data)
+
+    @lambda_handler
+    async def handler(req):
+        first, second = await asyncio.gather(
+            asyncio.sleep(0, result=req.data), asyncio.sleep(0, result='second')
+        )
+        return Response({'first': first, 'second': second})
+
+    result = utils.parse_lambda_output(handler(event, context))
+
+    assert result.status_code == 200
+    assert result.data == {'first': dict_data, 'second': 'second'}
+
+def test_lambda_handler_async_error(context):
+    event = utils.build_event(None)
+
+    @lambda_handler(codec='json')
+    async def handler(req):
+        raise NotFound('missing')
+
+    result = utils.parse_lambda_output(handler(event, context))
+
+    assert result.status_code == 404
+    assert result.data['message'] == 'missing'
+
+def test_event_loop_is_reused(context):
+    event = utils.build_event(None)
+    loops = []
+
+    @lambda_handler
+    async def handler(req):
+        loops.append(asyncio.get_event_loop())
+        return Response()
+
+    handler(event, context)
+    handler(event, context)
+
+    assert loops[0] is loops[1] is aio.get_event_loop()
+    assert not loops[0].is_closed()
+
+def test_run_once():
+    calls = []
+
+    async def factory():
+        calls.append(1)
+        await asyncio.sleep(0)
+        return object()
+
+    async def use():
+        return await asyncio.gather(aio.run_once(factory), aio.run_once(factory))
+
+    first, second = aio.run(use())
+    third = aio.run(aio.run_once(factory))
+
+    assert first is second is third
+    assert calls == [1]
+
+def test_run_once_failure_is_not_cached():
+    calls = []
+
+    async def factory():
+        calls.append(1)
+        raise ValueError()
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            aio.run(aio.run_once(factory))
+    assert calls == [1, 1]
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import threading
+
+from serverless.decorators import batch_handler
+from serverless.exceptions import BadRequest
+
+from tests import utils
+
+
+def test_batch_handler(context):
+    event = utils.build_sqs_event([{'n': 1}, {'n': 2}])
+    seen = []
+
+    @batch_handler
+    def handler(record):
+        seen.append(record.data['n'])
+
+    assert handler(event, context) == {'batchItemFailures': []}
+    assert seen == [1, 2]
+
+def test_batch_handler_partial_failure(context):
+    event = utils.build_sqs_event([{'n': 1}, {'n': 2}, {'n': 3}])
+
+    @batch_handler
+    def handler(record):
+        if record.data['n'] == 2:
+            raise BadRequest('invalid record')
+        if record.data['n'] == 3:
+            raise Exception('unknown exception')
+
+    assert handler(event, context) == {
+        'batchItemFailures': [{'itemIdentifier': '1'}, {'itemIdentifier': '2'}]
+    }
+
+def test_batch_handler_malformed_body(context):
+    event = utils.build_sqs_event([{'n': 1}])
+    event['Records'][0]['body'] = 'This is not a json'
+
+    @batch_handler
+    def handler(record):
+        return record.data
+
+    assert handler(event, context) == {'batchItemFailures': [{'itemIdentifier': '0'}]}
+
+def test_batch_handler_fifo_stops_at_first_failure(context):
+    event = utils.build_sqs_event([{'n': 1}, {'n': 2}, {'n': 3}], fifo=True)
+    seen = []
+
+    @batch_handler(max_workers=4)
+    def handler(record):
+        seen.append(record.data['n'])
+        if record.data['n'] == 2:
+            raise BadRequest()
+
+    assert handler(event, context) == {
+        'batchItemFailures': [{'itemIdentifier': '1'}, {'itemIdentifier': '2'}]
+    }
+    assert seen == [1, 2]
+
+def test_batch_handler_concurrent(context):
+    event = utils.build_sqs_event([{'n': i} for i in range(8)])
+    barrier = threading.Barrier(4, timeout=5)
+
+    @batch_handler(max_workers=4)
+    def handler(record):
+        barrier.wait()
+        if record.data['n'] % 2:
+            raise BadRequest()
+
+    assert handler(event, context) == {
+        'batchItemFailures': [{'itemIdentifier': str(i)} for i in (1, 3, 5, 7)]
+    }
+
+def test_batch_handler_without_records(context):
+    @batch_handler
+    def handler(record):
+        pass
+
+    assert handler({}, context) == {'batchItemFailures': []}
@@ -0,0 +1,144 @@
+import base64
+import datetime
+import json
+import uuid
+
+import pytest
+
+from serverless.binary import BinaryFormats, CborCodec, MsgPackCodec
+from serverless.decorators import lambda_handler
+from serverless.exceptions import PayloadTooLarge
+from serverless.wrappers import Request, Response
+
+from tests import utils
+
+
+MSGPACK = MsgPackCodec(pure=True)
+CBOR = CborCodec()
+
+DOCUMENT = {
+    'int': [0, 1, 127, 128, -32, -33, 255, 65536, 2 ** 63, -2 ** 63],
+    'float': 1.5,
+    'str': ['', 'a' * 40, 'é' * 300],
+    'bytes': b'\x00\xff',
+    'nested': {'list': [None, True, False], 'empty': {}},
+    'long': list(range(20)),
+}
+
+
+@pytest.mark.parametrize('value, encoded', [
+    (1, '01'), (-1, 'ff'), (200, 'ccc8'), (-33, 'd0df'), (None, 'c0'),
+    ('a', 'a161'), ([1, 2], '920102'), ({'a': 1}, '81a16101'),
+    (1.5, 'cb3ff8000000000000'), (b'\x00', 'c40100'),
+])
+def test_msgpack_encoding(value, encoded):
+    assert MSGPACK.dumps(value).hex() == encoded
+    assert MSGPACK.loads(bytes.fromhex(encoded)) == value
+
+@pytest.mark.parametrize('value, encoded', [
+    (0, '00'), (24, '1818'), (1000, '1903e8'), (1000000000000, '1b000000e8d4a51000'),
+    (18446744073709551616, 'c249010000000000000000'), (-1000, '3903e7'),
+    (1.1, 'fb3ff199999999999a'), ('a', '6161'), ([1, [2, 3]], '8201820203'),
+    ({'a': 1}, 'a1616101'), (True, 'f5'), (None, 'f6'),
+])
+def test_cbor_encoding(value, encoded):
+    assert CBOR.dumps(value).hex() == encoded
+    assert CBOR.loads(bytes.fromhex(encoded)) == value
+
+@pytest.mark.parametrize('encoded, value', [
+    ('f93c00', 1.0), ('9fff', []), ('5f42010243030405ff', b'\x01\x02\x03\x04\x05'),
+    ('bf61610161629f0203ffff', {'a': 1, 'b': [2, 3]}),
+    ('c06a323031332d30332d3231', '2013-03-21'),
+])
+def test_cbor_decoding(encoded, value):
+    assert CBOR.loads(bytes.fromhex(encoded)) == value
+
+@pytest.mark.parametrize('codec', [MSGPACK, CBOR])
+def test_round_trip(codec):
+    assert codec.loads(codec.dumps(DOCUMENT)) == DOCUMENT
+
+@pytest.mark.parametrize('codec', [MSGPACK, CBOR])
+def test_values_are_encoded_as_in_json(codec):
+    data = {
+        'date': datetime.date(2017, 1, 2),
+        'datetime': datetime.datetime(2017, 1, 2, 3, 4, 5),
+        'uuid': uuid.UUID(int=1),
+        'tags': ('a',),
+    }
+
+    assert codec.loads(codec.dumps(data)) == json.loads(Response(data).body)
+
+@pytest.mark.parametrize('codec, data', [
+    (MSGPACK, 'c1'), (MSGPACK, '92'), (MSGPACK, '0101'),
+    (CBOR, 'ff'), (CBOR, '81ff'), (CBOR, 'a1800100'), (CBOR, '7f'),
+])
+def test_malformed(codec, data):
+    with pytest.raises(ValueError):
+        codec.loads(bytes.fromhex(data))
+
+def test_msgpack_integer_out_of_range():
+    with pytest.raises(ValueError):
+        MSGPACK.dumps(2 ** 64)
+
+@pytest.mark.parametrize('accept, media_type', [
+    (None, None),
+    ('*/*', None),
+    ('application/json', None),
+    ('application/msgpack', 'application/msgpack'),
+    ('application/x-msgpack, application/json', 'application/x-msgpack'),
+    ('application/json, application/cbor;q=0.5', None),
+    ('application/cbor, application/msgpack;q=0.9', 'application/cbor'),
+])
+def test_negotiate(accept, media_type):
+    assert BinaryFormats().negotiate(accept)[1] == media_type
+
+def test_unsupported_format():
+    with pytest.raises(ValueError):
+        BinaryFormats(('bson',))
+
+def build_binary_event(accept, body=None, content_type=None):
+    event = utils.build_event(None)
+    event['httpMethod'] = 'POST'
+    event['headers'] = {'Accept': accept}
+    if body is not None:
+        event['headers']['Content-Type'] = content_type
+        event['body'] = base64.b64encode(body).decode('ascii')
+        event['isBase64Encoded'] = True
+    return event
+
+def test_lambda_handler_binary_formats(dict_data, context):
+    @lambda_handler(binary_formats=True)
+    def handler(req):
+        return Response(req.data)
+
+    body = CBOR.dumps(dict_data)
+    event = build_binary_event('application/msgpack', body, 'application/cbor')
+    output = handler(event, context)
+
+    assert output['isBase64Encoded'] is True
+    assert output['headers']['Content-Type'] == 'application/msgpack'
+    assert output['headers']['Vary'] == 'Accept'
+    assert MSGPACK.loads(base64.b64decode(output['body'])) == dict_data
+
+    event = build_binary_event('application/json', body, 'application/cbor')
+    output = handler(event, context)
+
+    assert json.loads(output['body']) == dict_data
+    assert output['headers']['Vary'] == 'Accept'
+
+def test_lambda_handler_malformed_binary_body(context):
+    @lambda_handler
+    def handler(req):
+        return Response(req.data)
+
+    event = build_binary_event('application/json', b'\xc1', 'application/msgpack')
+    result = utils.parse_lambda_output(handler(event, context))
+
+    assert result.status_code == 400
+
+def test_binary_max_size():
+    resp = Response({'a': 'x' * 10}, max_size=16, binary_formats=BinaryFormats())
+    req = Request(build_binary_event('application/cbor'), None)
+
+    with pytest.raises(PayloadTooLarge):
+        resp.to_lambda_output(req)
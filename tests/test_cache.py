@@ -0,0 +1,247 @@
+import json
+import threading
+import time
+
+import pytest
+
+from serverless.cache import MemoryCache, SQLiteCache, cached_response, request_key
+from serverless.decorators import lambda_handler
+from serverless.exceptions import BadRequest
+from serverless.wrappers import Request, Response
+
+from tests import utils
+
+
+def build_event(body_data=None, **query):
+    event = utils.build_event(body_data, query_params=query)
+    event['httpMethod'] = 'POST'
+    event['path'] = '/orders'
+    return event
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def backend(request, tmpdir):
+    if request.param == 'memory':
+        return MemoryCache()
+    return SQLiteCache(str(tmpdir.join('cache.db')))
+
+
+def test_backend(backend):
+    assert backend.get('k') is None
+    assert backend.add('k', {'pending': True}, 60)
+    assert not backend.add('k', {'pending': True}, 60)
+
+    backend.set('k', {'output': 1}, 60)
+    assert backend.get('k') == {'output': 1}
+
+    backend.delete('k')
+    assert backend.get('k') is None
+
+def test_backend_expiry(backend):
+    backend.set('k', {'output': 1}, -1)
+
+    assert backend.get('k') is None
+    assert backend.add('k', {'output': 2}, 60)
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCache(max_entries=2)
+    cache.set('a', 1, 60)
+    cache.set('b', 2, 60)
+    cache.get('a')
+    cache.set('c', 3, 60)
+
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+
+def test_request_key():
+    def key(event, **kwargs):
+        return request_key(Request(event, None), **kwargs)
+
+    base = key(build_event({'id': 1, 'note': 'a'}, page='1'))
+
+    assert base == key(build_event({'id': 2}, page='1'))
+    assert base != key(build_event(page='2'))
+    assert key(build_event({'id': 1, 'note': 'a'}), body_fields=('id',)) == key(
+        build_event({'id': 1, 'note': 'b'}), body_fields=('id',)
+    )
+    assert key(build_event({'id': 1}), body_fields=('id',)) != key(
+        build_event({'id': 2}), body_fields=('id',)
+    )
+
+def test_cached_response(context):
+    calls = []
+
+    @cached_response(ttl=60, body_fields=('id',))
+    @lambda_handler
+    def handler(req):
+        calls.append(req.data['id'])
+        return Response({'id': req.data['id']}, 201)
+
+    first = handler(build_event({'id': 1}), context)
+    second = handler(build_event({'id': 1}), context)
+    handler(build_event({'id': 2}), context)
+
+    assert calls == [1, 2]
+    assert second == first
+    assert second is not first
+    assert json.loads(second['body']) == {'id': 1}
+
+def test_errors_are_not_cached(context):
+    calls = []
+
+    @cached_response
+    @lambda_handler
+    def handler(req):
+        calls.append(1)
+        raise BadRequest('invalid')
+
+    handler(build_event(), context)
+    result = utils.parse_lambda_output(handler(build_event(), context))
+
+    assert len(calls) == 2
+    assert result.status_code == 400
+
+def test_outputs_are_cached_per_accept_encoding(context):
+    calls = []
+
+    @cached_response
+    @lambda_handler(compression=True)
+    def handler(req):
+        calls.append(1)
+        return Response({'items': ['x' * 100] * 100})
+
+    gzip_event = build_event()
+    gzip_event['headers'] = {'Accept-Encoding': 'gzip'}
+    identity_event = build_event()
+    identity_event['headers'] = {'Accept-Encoding': 'identity'}
+
+    compressed = handler(gzip_event, context)
+    plain = handler(identity_event, context)
+    handler(gzip_event, context)
+
+    assert len(calls) == 2
+    assert compressed['headers']['Content-Encoding'] == 'gzip'
+    assert 'Content-Encoding' not in plain['headers']
+    assert json.loads(plain['body']) == {'items': ['x' * 100] * 100}
+
+def test_outputs_varying_on_other_headers_are_not_cached(context):
+    calls = []
+
+    @cached_response
+    @lambda_handler
+    def handler(req):
+        calls.append(1)
+        return Response({'ok': True}, headers={'Vary': 'Authorization'})
+
+    handler(build_event(), context)
+    handler(build_event(), context)
+
+    assert len(calls) == 2
+
+def test_requests_of_users_are_not_shared(context):
+    @cached_response
+    @lambda_handler
+    def handler(req):
+        return Response({'user': req.get_header('Authorization')})
+
+    outputs = []
+    for user in ('alice', 'bob'):
+        event = build_event()
+        event['headers'] = {'Authorization': user}
+        outputs.append(json.loads(handler(event, context)['body']))
+
+    assert outputs == [{'user': 'alice'}, {'user': 'bob'}]
+
+def test_requests_are_cached_per_named_identity_header(context):
+    calls = []
+
+    @cached_response(headers=('Authorization',))
+    @lambda_handler
+    def handler(req):
+        calls.append(1)
+        return Response({'user': req.get_header('Authorization')})
+
+    for user in ('alice', 'bob', 'alice'):
+        event = build_event()
+        event['headers'] = {'Authorization': user}
+        handler(event, context)
+
+    assert len(calls) == 2
+
+def test_conditional_requests_run_the_handler(context):
+    @cached_response
+    @lambda_handler
+    def handler(req):
+        return Response({'ok': True}, etag='v1')
+
+    event = build_event()
+    event['httpMethod'] = 'GET'
+    first = handler(event, context)
+    event['headers'] = {'If-None-Match': first['headers']['ETag']}
+
+    assert handler(event, context)['statusCode'] == 304
+
+def test_shared_backend_is_used_across_containers(backend, context):
+    calls = []
+
+    def make_handler():
+        @cached_response(backend=backend)
+        @lambda_handler
+        def handler(req):
+            calls.append(1)
+            return Response({'ok': True})
+        return handler
+
+    first = make_handler()(build_event(), context)
+    second = make_handler()(build_event(), context)
+
+    assert len(calls) == 1
+    assert second == first
+
+def test_concurrent_duplicates_are_collapsed(context):
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    @cached_response
+    @lambda_handler
+    def handler(req):
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return Response({'ok': True})
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(handler(build_event(), context)))
+        for _ in range(3)
+    ]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert len(results) == 3
+    assert all(result == results[0] for result in results)
+
+def test_duplicate_in_progress_elsewhere_gets_conflict(backend, context):
+    calls = []
+
+    @cached_response(backend=backend, wait=0.05)
+    @lambda_handler
+    def handler(req):
+        calls.append(1)
+        return Response({'ok': True})
+
+    key = request_key(Request(build_event(), context))
+    backend.add(key, {'pending': True}, 60)
+
+    result = utils.parse_lambda_output(handler(build_event(), context))
+
+    assert result.status_code == 409
+    assert calls == []
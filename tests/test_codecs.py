@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from datetime import date, datetime, timedelta, timezone
+import json
+import uuid
+
+import pytest
+
+from serverless import codecs
+from serverless.codecs import (
+    JsonCodec, StdlibJsonCodec, get_codec, register_codec, set_default_codec
+)
+from serverless.decorators import lambda_handler
+from serverless.encoders import ServerlessJsonEncoder
+from serverless.wrappers import Request, Response
+
+from tests import utils
+
+
+SPECIAL_VALUES = [
+    date(2018, 1, 1),
+    datetime(2018, 1, 1),
+    datetime(2018, 1, 1, 1, 2, 3, 45678),
+    datetime(2018, 1, 1, 1, 2, 3, 5, tzinfo=timezone(timedelta(hours=5, minutes=30))),
+    datetime(2018, 1, 1, tzinfo=timezone.utc),
+    uuid.UUID('0021a304-c5a2-409e-86d4-36d96008b08b'),
+]
+
+
+class UpperCodec(StdlibJsonCodec):
+    name = 'upper'
+
+    def dumps(self, obj):
+        return super(UpperCodec, self).dumps(obj).upper()
+
+
+@pytest.fixture
+def default_codec():
+    yield
+    set_default_codec(None)
+
+
+def test_get_codec_by_name():
+    assert isinstance(get_codec('json'), StdlibJsonCodec)
+
+def test_get_codec_instance():
+    codec = UpperCodec()
+    assert get_codec(codec) is codec
+
+def test_get_codec_unknown():
+    with pytest.raises(ValueError):
+        get_codec('unknown')
+
+def test_get_codec_from_env(monkeypatch):
+    monkeypatch.setenv('SERVERLESS_JSON_CODEC', 'json')
+    assert get_codec().name == 'json'
+
+def test_set_default_codec(default_codec):
+    set_default_codec('json')
+    assert get_codec().name == 'json'
+
+def test_register_codec(default_codec):
+    register_codec(UpperCodec())
+    set_default_codec('upper')
+
+    assert Response({'k': 'v'}).body == '{"K": "V"}'
+
+def test_stdlib_codec_matches_encoder():
+    codec = get_codec('json')
+    for value in SPECIAL_VALUES:
+        assert codec.dumps(value) == json.dumps(value, cls=ServerlessJsonEncoder)
+
+def test_orjson_codec_matches_stdlib():
+    pytest.importorskip('orjson')
+    fast, slow = get_codec('orjson'), get_codec('json')
+
+    for value in SPECIAL_VALUES:
+        assert fast.dumps(value) == slow.dumps(value)
+    assert json.loads(fast.dumps(SPECIAL_VALUES)) == json.loads(slow.dumps(SPECIAL_VALUES))
+
+def test_orjson_codec_falls_back_to_stdlib():
+    pytest.importorskip('orjson')
+    codec = get_codec('orjson')
+
+    assert codec.dumps({1: 2 ** 70, 'é': [1]}) == '{"1":%d,"é":[1]}' % 2 ** 70
+    assert codec.dumps([float('nan'), float('inf')]) == '[null,null]'
+
+def test_default_codec_is_orjson_when_installed(monkeypatch):
+    monkeypatch.delenv('SERVERLESS_JSON_CODEC', raising=False)
+    expected = 'orjson' if 'orjson' in codecs.available_codecs() else 'json'
+
+    assert get_codec().name == expected
+
+def test_request_with_codec(dict_data, context):
+    event = utils.build_event(dict_data)
+
+    for name in codecs.available_codecs():
+        assert Request(event, context, codec=name).data == dict_data
+
+def test_lambda_handler_with_codec(context):
+    event = utils.build_event(None)
+
+    @lambda_handler(codec=UpperCodec())
+    def handler(req):
+        return Response({'k': 'v'})
+
+    assert handler(event, context)['body'] == '{"K": "V"}'
+
+def test_lambda_handler_keeps_response_codec(context):
+    event = utils.build_event(None)
+
+    @lambda_handler(codec=UpperCodec())
+    def handler(req):
+        return Response({'k': 'v'}, codec='json')
+
+    assert handler(event, context)['body'] == '{"k": "v"}'
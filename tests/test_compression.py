@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import base64
+import gzip
+import json
+import zlib
+
+import pytest
+
+from serverless.compression import Compression, parse_accept_encoding
+from serverless.decorators import lambda_handler
+from serverless.exceptions import NotFound
+from serverless.wrappers import Request, Response
+
+from tests import utils
+
+
+@pytest.fixture
+def large_data():
+    return {'items': ['value %d' % i for i in range(500)]}
+
+
+def build_request(accept_encoding):
+    event = utils.build_event(None)
+    event['headers'] = {'accept-encoding': accept_encoding}
+    return Request(event, None)
+
+
+def test_parse_accept_encoding():
+    assert parse_accept_encoding('gzip, deflate;q=0.5, br;q=0') == {
+        'gzip': 1.0, 'deflate': 0.5, 'br': 0.0
+    }
+    assert parse_accept_encoding(None) == {}
+
+def test_negotiate():
+    compression = Compression(encodings=('gzip', 'deflate'))
+
+    assert compression.negotiate('gzip, deflate') == 'gzip'
+    assert compression.negotiate('gzip;q=0.5, deflate') == 'deflate'
+    assert compression.negotiate('*') == 'gzip'
+    assert compression.negotiate('gzip;q=0, *;q=0.1') == 'deflate'
+    assert compression.negotiate('identity') is None
+    assert compression.negotiate(None) is None
+
+def test_unsupported_encoding():
+    with pytest.raises(ValueError):
+        Compression(encodings=('zstd',))
+
+@pytest.mark.parametrize('coding, decompress', [
+    ('gzip', gzip.decompress),
+    ('deflate', zlib.decompress),
+])
+def test_response_compressed(large_data, coding, decompress):
+    resp = Response(large_data, compression=Compression(encodings=(coding,)))
+    output = resp.to_lambda_output(build_request(coding))
+
+    assert output['isBase64Encoded'] is True
+    assert output['headers']['Content-Encoding'] == coding
+    assert output['headers']['Vary'] == 'Accept-Encoding'
+    assert json.loads(decompress(base64.b64decode(output['body']))) == large_data
+    assert 'Content-Encoding' not in resp.headers
+
+def test_response_compressed_weakens_etag(large_data):
+    resp = Response(large_data, compression=Compression(), etag='v1')
+    output = resp.to_lambda_output(build_request('gzip'))
+
+    assert output['headers']['ETag'] == 'W/"v1"'
+
+def test_response_below_min_size():
+    resp = Response({'k': 'v'}, compression=Compression())
+    output = resp.to_lambda_output(build_request('gzip'))
+
+    assert output['body'] == resp.body
+    assert 'isBase64Encoded' not in output
+    assert 'Content-Encoding' not in output['headers']
+    assert output['headers']['Vary'] == 'Accept-Encoding'
+
+def test_response_not_accepted(large_data):
+    resp = Response(large_data, headers={'Vary': 'Origin'}, compression=Compression())
+    output = resp.to_lambda_output(build_request('identity'))
+
+    assert output['body'] == resp.body
+    assert output['headers']['Vary'] == 'Origin, Accept-Encoding'
+
+def test_brotli(large_data):
+    brotli = pytest.importorskip('brotli')
+    resp = Response(large_data, compression=Compression())
+    output = resp.to_lambda_output(build_request('gzip, br'))
+
+    assert output['headers']['Content-Encoding'] == 'br'
+    assert json.loads(brotli.decompress(base64.b64decode(output['body']))) == large_data
+
+def test_lambda_handler_with_compression(large_data):
+    event = build_request('gzip').event
+
+    @lambda_handler(compression=Compression(min_size=0, encodings=('gzip',)))
+    def handler(req):
+        if req.query.get('missing'):
+            raise NotFound()
+        return Response(large_data)
+
+    output = handler(event, None)
+    assert json.loads(gzip.decompress(base64.b64decode(output['body']))) == large_data
+
+    event['queryStringParameters'] = {'missing': '1'}
+    output = handler(event, None)
+    assert output['statusCode'] == 404
+    assert output['headers']['Content-Encoding'] == 'gzip'
+
+def test_lambda_handler_without_compression(large_data):
+    event = build_request('gzip').event
+
+    @lambda_handler
+    def handler(req):
+        return Response(large_data)
+
+    result = utils.parse_lambda_output(handler(event, None))
+    assert result.data == large_data
+    assert 'Vary' not in result.headers
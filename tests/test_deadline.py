@@ -0,0 +1,102 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from serverless.deadline import Deadline, NO_DEADLINE
+from serverless.decorators import lambda_handler
+from serverless.exceptions import GatewayTimeout
+from serverless.wrappers import Response
+
+from tests import utils
+
+
+class Context:
+    def __init__(self, remaining_ms):
+        self.expires = time.monotonic() + remaining_ms / 1000.0
+
+    def get_remaining_time_in_millis(self):
+        return int(max(self.expires - time.monotonic(), 0) * 1000)
+
+
+def test_deadline():
+    deadline = Deadline(0.05)
+
+    assert 0 < deadline.remaining() <= 0.05
+    assert not deadline.cancelled
+    time.sleep(0.06)
+    assert deadline.cancelled
+    with pytest.raises(GatewayTimeout):
+        deadline.check()
+
+def test_deadline_cancel():
+    deadline = Deadline.from_context(Context(10000), margin=1.0)
+
+    assert 8.9 < deadline.remaining() <= 9.0
+    deadline.cancel()
+    assert deadline.cancelled
+    assert deadline.sleep(10)
+
+def test_no_deadline():
+    assert NO_DEADLINE.remaining() is None
+    assert not NO_DEADLINE.cancelled
+    NO_DEADLINE.check()
+
+def test_lambda_handler_answers_before_timeout():
+    stopped = threading.Event()
+
+    @lambda_handler(timeout_margin=0.5)
+    def handler(req):
+        while not req.deadline.sleep(0.01):
+            pass
+        stopped.set()
+        return Response({})
+
+    start = time.monotonic()
+    result = utils.parse_lambda_output(handler(utils.build_event(None), Context(600)))
+
+    assert result.status_code == 504
+    assert result.data['message'] == 'Request did not complete in time'
+    assert time.monotonic() - start < 0.3
+    assert stopped.wait(1)
+
+def test_lambda_handler_sheds_load_while_timed_out_handler_runs():
+    release = threading.Event()
+
+    @lambda_handler(timeout_margin=0.5)
+    def handler(req):
+        release.wait(1)
+        return Response({})
+
+    assert handler(utils.build_event(None), Context(550))['statusCode'] == 504
+    assert handler(utils.build_event(None), Context(5000))['statusCode'] == 503
+    release.set()
+    time.sleep(0.05)
+    assert handler(utils.build_event(None), Context(5000))['statusCode'] == 200
+
+def test_lambda_handler_without_time_left():
+    @lambda_handler(timeout_margin=True)
+    def handler(req):
+        return Response({})
+
+    assert handler(utils.build_event(None), Context(900))['statusCode'] == 503
+    assert handler(utils.build_event(None), Context(5000))['statusCode'] == 200
+    assert handler(utils.build_event(None), None)['statusCode'] == 200
+
+def test_lambda_handler_cancels_async_handler():
+    cancelled = []
+
+    @lambda_handler(timeout_margin=0.5)
+    async def handler(req):
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return Response({})
+
+    output = handler(utils.build_event(None), Context(550))
+
+    assert output['statusCode'] == 504
+    assert cancelled == [True]
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+import json
+import uuid
+
+import pytest
+
+from serverless.encoders import EncoderRegistry, ServerlessJsonEncoder, registry
+from serverless.wrappers import Response
+
+
+class Color(Enum):
+    RED = 'red'
+
+
+@dataclass
+class Point:
+    x: int
+    y: int
+
+
+class MyDatetime(datetime):
+    pass
+
+
+def dumps(data):
+    return json.loads(json.dumps(data, cls=ServerlessJsonEncoder))
+
+
+@pytest.fixture
+def decimal_encoder():
+    registry.register(Decimal, str)
+    yield
+    registry.unregister(Decimal)
+
+
+def test_default_encoders():
+    assert dumps({1, 2}) == [1, 2]
+    assert dumps(Color.RED) == 'red'
+    assert dumps(Point(1, 2)) == {'x': 1, 'y': 2}
+    assert dumps(MyDatetime(2018, 1, 1)) == '2018-01-01T00:00:00'
+
+def test_unknown_type():
+    with pytest.raises(TypeError):
+        json.dumps(object(), cls=ServerlessJsonEncoder)
+
+def test_register_encoder(decimal_encoder):
+    assert dumps({'price': Decimal('1.10')}) == {'price': '1.10'}
+
+def test_register_encoder_for_codecs(decimal_encoder):
+    for codec in ('json', 'orjson'):
+        assert Response(Decimal('1.10'), codec=codec).body == '"1.10"'
+
+def test_lookup_is_cached():
+    reg = EncoderRegistry()
+    reg.register(date, date.isoformat)
+
+    assert reg.lookup(datetime) is date.isoformat
+    assert datetime in reg.dispatch
+
+    reg.register(datetime, datetime.isoformat)
+    assert reg.lookup(datetime) is datetime.isoformat
+
+def test_encode_many():
+    values = [datetime(2018, 1, 1), datetime(2018, 1, 2)]
+
+    assert registry.encode_many(values) == ['2018-01-01T00:00:00', '2018-01-02T00:00:00']
+    assert registry.encode_many(values + [date(2018, 1, 3)]) is None
+    assert registry.encode_many([{1}]) is None
+    assert registry.encode_many([]) is None
+
+def test_prepare_bulk_lists():
+    _id = uuid.uuid4()
+    data = {'ids': [_id], 'days': (date(2018, 1, 1),), 'other': [1]}
+
+    prepared = registry.prepare(data)
+    assert prepared == {'ids': [str(_id)], 'days': ['2018-01-01'], 'other': [1]}
+    assert data['ids'] == [_id]
+    assert dumps(data) == prepared
@@ -0,0 +1,196 @@
+import base64
+import json
+
+import pytest
+
+from serverless import events
+from serverless.decorators import lambda_handler
+from serverless.metrics import Metrics
+from serverless.wrappers import Request, Response
+
+
+def build_v1_event():
+    return {
+        'resource': '/items/{id}',
+        'path': '/items/1',
+        'httpMethod': 'POST',
+        'headers': {'Cookie': 'a=1; b=2', 'Accept': 'text/html'},
+        'multiValueHeaders': {
+            'Cookie': ['a=1; b=2'], 'Accept': ['text/html', 'application/json']
+        },
+        'queryStringParameters': {'tag': 'y'},
+        'multiValueQueryStringParameters': {'tag': ['x', 'y']},
+        'pathParameters': {'id': '1'},
+        'requestContext': {'requestId': 'r1'},
+        'body': '{"k": "v"}',
+        'isBase64Encoded': False,
+    }
+
+
+def build_v2_event():
+    return {
+        'version': '2.0',
+        'routeKey': 'POST /items/{id}',
+        'rawPath': '/items/1',
+        'rawQueryString': 'tag=x&tag=y',
+        'cookies': ['a=1', 'b=2'],
+        'headers': {'accept': 'text/html,application/json'},
+        'queryStringParameters': {'tag': 'x,y'},
+        'pathParameters': {'id': '1'},
+        'requestContext': {
+            'http': {'method': 'POST', 'path': '/items/1'}, 'requestId': 'r1'
+        },
+        'body': base64.b64encode(b'{"k": "v"}').decode('ascii'),
+        'isBase64Encoded': True,
+    }
+
+
+def build_alb_event(multi=False):
+    event = {
+        'requestContext': {'elb': {'targetGroupArn': 'arn:aws:elasticloadbalancing:tg'}},
+        'httpMethod': 'POST',
+        'path': '/items/1',
+        'body': '{"k": "v"}',
+        'isBase64Encoded': False,
+    }
+    if multi:
+        event['multiValueHeaders'] = {
+            'cookie': ['a=1; b=2'], 'accept': ['text/html', 'application/json']
+        }
+        event['multiValueQueryStringParameters'] = {'tag': ['x', 'a%20b']}
+    else:
+        event['headers'] = {'cookie': 'a=1; b=2', 'accept': 'text/html'}
+        event['queryStringParameters'] = {'tag': 'a%20b'}
+    return event
+
+
+@pytest.mark.parametrize('event, name', [
+    (build_v1_event(), 'v1'),
+    (build_v2_event(), 'v2'),
+    (build_alb_event(), 'alb'),
+    (build_alb_event(multi=True), 'alb'),
+    ({'body': None}, None),
+    ([], None),
+])
+def test_detect(event, name):
+    event_format = events.detect(event)
+
+    assert (event_format.name if event_format else None) == name
+
+@pytest.mark.parametrize('event', [build_v1_event(), build_v2_event()])
+def test_api_gateway_requests(event):
+    req = Request(event, None)
+
+    assert req.method == 'POST'
+    assert req.path == '/items/1'
+    assert req.params == {'id': '1'}
+    assert req.multi_query == {'tag': ['x', 'y']}
+    assert req.cookies == {'a': '1', 'b': '2'}
+    assert req.get_header('accept').startswith('text/html')
+    assert req.data == {'k': 'v'}
+
+def test_v2_multi_headers():
+    req = Request(build_v2_event(), None)
+
+    assert req.multi_headers == {'accept': ['text/html', 'application/json']}
+
+@pytest.mark.parametrize('multi', [False, True])
+def test_alb_requests(multi):
+    req = Request(build_alb_event(multi), None)
+
+    assert req.format is events.ALB
+    assert req.method == 'POST'
+    assert req.params == {}
+    assert req.query == {'tag': 'a b'}
+    assert req.get_header('Accept') == ('application/json' if multi else 'text/html')
+    assert req.cookies == {'a': '1', 'b': '2'}
+    assert req.data == {'k': 'v'}
+
+def test_v1_output_with_cookies():
+    req = Request(build_v1_event(), None)
+    output = Response({}, cookies=['a=1', 'b=2']).to_lambda_output(req)
+
+    assert output['multiValueHeaders'] == {'Set-Cookie': ['a=1', 'b=2']}
+    assert 'statusDescription' not in output
+
+def test_v2_output_with_cookies():
+    req = Request(build_v2_event(), None)
+    output = Response({}, cookies=['a=1', 'b=2']).to_lambda_output(req)
+
+    assert output['cookies'] == ['a=1', 'b=2']
+    assert output['headers']['X-Frame-Options'] == 'SAMEORIGIN'
+
+def test_alb_output():
+    req = Request(build_alb_event(), None)
+    output = Response({}, 404, cookies=['a=1']).to_lambda_output(req)
+
+    assert output['statusDescription'] == '404 Not Found'
+    assert output['isBase64Encoded'] is False
+    assert output['headers']['Set-Cookie'] == 'a=1'
+
+def test_alb_output_with_multi_value_headers():
+    req = Request(build_alb_event(multi=True), None)
+    output = Response({}, cookies=['a=1', 'b=2']).to_lambda_output(req)
+
+    assert 'headers' not in output
+    assert output['multiValueHeaders']['Pragma'] == ['no-cache']
+    assert output['multiValueHeaders']['Set-Cookie'] == ['a=1', 'b=2']
+
+def test_get_format():
+    assert events.get_format('v2') is events.HTTP_API
+    assert events.get_format(events.ALB) is events.ALB
+    with pytest.raises(ValueError):
+        events.get_format('v3')
+
+def test_lambda_handler_caches_detected_format(monkeypatch):
+    calls = []
+    detect = events.detect
+
+    def counting_detect(event):
+        calls.append(event)
+        return detect(event)
+
+    import serverless.decorators
+    monkeypatch.setattr(serverless.decorators, 'detect', counting_detect)
+
+    @lambda_handler(metrics=Metrics(emf=False, server_timing=True))
+    def handler(req):
+        return Response({'path': req.path})
+
+    handler({'body': None}, None)
+    output = handler(build_alb_event(multi=True), None)
+    handler(build_alb_event(multi=True), None)
+
+    assert len(calls) == 2
+    assert json.loads(output['body']) == {'path': '/items/1'}
+    assert 'Server-Timing' in output['multiValueHeaders']
+
+def test_lambda_handler_with_event_format():
+    @lambda_handler(event_format='v2')
+    def handler(req):
+        return Response({'method': req.method})
+
+    output = handler(build_v2_event(), None)
+
+    assert json.loads(output['body']) == {'method': 'POST'}
+
+def test_lambda_handler_with_event_format_and_other_event():
+    @lambda_handler(event_format='v2')
+    def handler(req):
+        return Response({'method': req.method})
+
+    output = handler({}, None)
+
+    assert output['statusCode'] == 200
+    assert json.loads(output['body']) == {'method': None}
+
+def test_lambda_handler_detects_events_not_matching_cached_format():
+    @lambda_handler
+    def handler(req):
+        return Response({'method': req.method, 'path': req.path})
+
+    handler(build_v2_event(), None)
+    output = handler({'httpMethod': 'GET', 'path': '/test'}, None)
+
+    assert json.loads(output['body']) == {'method': 'GET', 'path': '/test'}
+    assert 'cookies' not in output
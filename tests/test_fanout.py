@@ -0,0 +1,82 @@
+from functools import partial
+import time
+
+import pytest
+
+from serverless.decorators import lambda_handler
+from serverless.exceptions import GatewayTimeout, NotFound
+from serverless.fanout import fan_out, get_executor, remaining_seconds
+from serverless.wrappers import Request, Response
+
+from tests import utils
+
+
+class Context:
+    def __init__(self, remaining_ms):
+        self.remaining_ms = remaining_ms
+
+    def get_remaining_time_in_millis(self):
+        return self.remaining_ms
+
+
+def slow(value, delay=0.1):
+    time.sleep(delay)
+    return value
+
+
+def fail(exc):
+    raise exc
+
+
+def test_remaining_seconds():
+    assert remaining_seconds(None) is None
+    assert remaining_seconds(Context(3000), margin=0.5) == 2.5
+    assert remaining_seconds(Context(100), margin=0.5) == 0.0
+
+def test_fan_out_runs_concurrently_in_order():
+    start = time.monotonic()
+    results = fan_out([partial(slow, i, 0.2 - i * 0.05) for i in range(4)])
+
+    assert results == [0, 1, 2, 3]
+    assert time.monotonic() - start < 0.35
+
+def test_fan_out_raises_first_error_in_order():
+    with pytest.raises(NotFound):
+        fan_out([partial(slow, 1), partial(fail, NotFound('a')), partial(fail, KeyError())])
+
+def test_fan_out_return_exceptions():
+    error = ValueError('b')
+    results = fan_out([partial(slow, 1, 0), partial(fail, error)], return_exceptions=True)
+
+    assert results == [1, error]
+
+def test_fan_out_is_bound_by_remaining_time():
+    start = time.monotonic()
+    with pytest.raises(GatewayTimeout) as e:
+        fan_out([partial(slow, 1, 0), partial(slow, 2, 1.0)], Context(650), margin=0.5)
+
+    assert time.monotonic() - start < 0.5
+    assert e.value.errors == ({'completed': 1, 'total': 2},)
+
+def test_fan_out_timeout():
+    with pytest.raises(GatewayTimeout):
+        fan_out([partial(slow, 1, 1.0)], timeout=0.05)
+
+def test_executor_is_kept():
+    assert get_executor() is get_executor()
+
+def test_request_fan_out_error_response():
+    @lambda_handler
+    def handler(req):
+        user, orders = req.fan_out([partial(slow, 'u', 0), partial(fail, NotFound('no'))])
+        return Response({'user': user, 'orders': orders})
+
+    result = utils.parse_lambda_output(handler(utils.build_event(None), Context(3000)))
+
+    assert result.status_code == 404
+    assert result.data['message'] == 'no'
+
+def test_request_fan_out():
+    req = Request(utils.build_event(None), Context(3000))
+
+    assert req.fan_out([partial(slow, 1, 0), partial(slow, 2, 0)]) == [1, 2]
@@ -0,0 +1,136 @@
+import pytest
+
+from serverless.decorators import lambda_handler
+from serverless.exceptions import BadRequest
+from serverless.fields import Fields, compile_fields
+from serverless.wrappers import Response
+
+from tests import utils
+
+
+ORDER = {
+    'id': 1,
+    'total': 9.5,
+    'customer': {'id': 7, 'name': 'Ann', 'email': 'ann@example.com'},
+    'items': [
+        {'id': 1, 'price': 2.5, 'sku': 'a'},
+        {'id': 2, 'price': 7.0, 'sku': 'b'},
+    ],
+}
+
+
+@pytest.mark.parametrize('spec, expected', [
+    ('id', {'id': 1}),
+    ('id,missing', {'id': 1}),
+    ('customer.name', {'customer': {'name': 'Ann'}}),
+    ('customer(id, name)', {'customer': {'id': 7, 'name': 'Ann'}}),
+    ('customer.id,customer', {'customer': ORDER['customer']}),
+    ('customer,customer.id', {'customer': ORDER['customer']}),
+    ('customer(id),customer(name)', {'customer': {'id': 7, 'name': 'Ann'}}),
+    ('items(id),total', {'items': [{'id': 1}, {'id': 2}], 'total': 9.5}),
+    ('items.sku', {'items': [{'sku': 'a'}, {'sku': 'b'}]}),
+    ('id.nested', {'id': 1}),
+])
+def test_plan(spec, expected):
+    assert compile_fields(spec).apply(ORDER) == expected
+
+def test_plan_list_of_dicts():
+    orders = [ORDER, ORDER, 'not a dict']
+
+    assert compile_fields('id').apply(orders) == [{'id': 1}, {'id': 1}, 'not a dict']
+    assert compile_fields('customer.id').apply(orders) == [
+        {'customer': {'id': 7}}, {'customer': {'id': 7}}, 'not a dict'
+    ]
+    assert ORDER['customer']['email'] == 'ann@example.com'
+
+@pytest.mark.parametrize('spec', ['', 'a,', 'a..b', 'a(b', 'a)', 'a(b))', 'a(b)c', '()'])
+def test_invalid_spec(spec):
+    with pytest.raises(BadRequest):
+        compile_fields(spec)
+
+def test_plans_are_cached():
+    fields = Fields(max_plans=1)
+
+    assert fields.plan('id') is fields.plan('id')
+    assert fields.plan('total') is not fields.plan('total')
+
+def test_lambda_handler_fields(context):
+    @lambda_handler(fields=True)
+    def handler(req):
+        return Response([ORDER, ORDER])
+
+    event = utils.build_event(None, query_params={'fields': 'id,customer(name)'})
+    result = utils.parse_lambda_output(handler(event, context))
+
+    assert result.data == [{'id': 1, 'customer': {'name': 'Ann'}}] * 2
+    result = utils.parse_lambda_output(handler(utils.build_event(None), context))
+    assert result.data == [ORDER, ORDER]
+
+def test_lambda_handler_invalid_fields(context):
+    @lambda_handler(fields=True)
+    def handler(req):
+        return Response(ORDER)
+
+    event = utils.build_event(None, query_params={'fields': 'id,'})
+    result = utils.parse_lambda_output(handler(event, context))
+
+    assert result.status_code == 400
+    assert result.data['message'] == 'Invalid fields parameter'
+
+def test_errors_are_not_pruned(context):
+    @lambda_handler(fields=True)
+    def handler(req):
+        raise BadRequest('invalid')
+
+    event = utils.build_event(None, query_params={'fields': 'id'})
+    result = utils.parse_lambda_output(handler(event, context))
+
+    assert result.data == {'message': 'invalid', 'errors': []}
+
+def get_event(fields=None, if_none_match=None):
+    event = utils.build_event(None, query_params={'fields': fields} if fields else {})
+    event.update(httpMethod='GET', path='/orders/1')
+    if if_none_match:
+        event['headers'] = {'If-None-Match': if_none_match}
+    return event
+
+def test_given_etag_is_derived_for_pruned_data(context):
+    @lambda_handler(fields=True)
+    def handler(req):
+        return Response(ORDER, etag='v1')
+
+    full = handler(get_event(), context)
+    pruned = handler(get_event('id'), context)
+    other = handler(get_event('total'), context)
+
+    assert full['headers']['ETag'] == '"v1"'
+    assert pruned['headers']['ETag'].startswith('"v1;')
+    assert len({full['headers']['ETag'], pruned['headers']['ETag'],
+                other['headers']['ETag']}) == 3
+    assert handler(get_event('id', '"v1"'), context)['statusCode'] == 200
+    assert handler(
+        get_event('id', pruned['headers']['ETag']), context
+    )['statusCode'] == 304
+    assert handler(get_event(None, '"v1"'), context)['statusCode'] == 304
+
+def test_weak_etag_stays_weak_when_pruned(context):
+    @lambda_handler(fields=True)
+    def handler(req):
+        return Response(ORDER, etag='W/"v1"')
+
+    assert handler(get_event('id'), context)['headers']['ETag'].startswith('W/"v1;')
+
+def test_cached_pruned_responses(context):
+    from serverless.cache import cached_response
+
+    @cached_response
+    @lambda_handler(fields=True)
+    def handler(req):
+        return Response(ORDER, etag='v1')
+
+    full = handler(get_event(), context)
+    pruned = handler(get_event('id'), context)
+
+    assert utils.parse_lambda_output(handler(get_event('id'), context)).data == {'id': 1}
+    assert utils.parse_lambda_output(handler(get_event(), context)).data == ORDER
+    assert pruned['headers']['ETag'] != full['headers']['ETag']
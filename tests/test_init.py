@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import subprocess
+import sys
+
+import pytest
+
+import serverless
+
+
+def imported_modules(statement):
+    """Returns modules imported by statement in a fresh interpreter"""
+    code = '%s; import sys; print(" ".join(sys.modules))' % statement
+    output = subprocess.check_output([sys.executable, '-c', code], universal_newlines=True)
+    return set(output.split())
+
+def test_public_api():
+    for name in serverless.__all__:
+        assert getattr(serverless, name) is not None
+    assert set(serverless.__all__) <= set(dir(serverless))
+
+def test_unknown_attribute():
+    with pytest.raises(AttributeError):
+        serverless.unknown
+
+def test_import_is_lazy():
+    modules = imported_modules('import serverless')
+
+    assert 'serverless.decorators' not in modules
+    assert 'serverless.wrappers' not in modules
+
+def test_non_essential_modules_are_deferred():
+    modules = imported_modules('from serverless import lambda_handler, Response')
+
+    for name in ('uuid', 'datetime', 'decimal', 'hashlib', 'logging', 'orjson', 'zlib',
+                 'threading'):
+        assert name not in modules
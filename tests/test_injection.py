@@ -0,0 +1,181 @@
+import datetime
+from decimal import Decimal
+import enum
+from typing import List, Optional
+import uuid
+
+import pytest
+
+from serverless.decorators import lambda_handler
+from serverless.injection import Param, compile_arguments, inject
+from serverless.routing import Router
+from serverless.wrappers import Response
+
+from tests import utils
+
+
+class Color(enum.Enum):
+    RED = 'red'
+    BLUE = 'blue'
+
+
+def test_handler_taking_only_the_request_is_not_wrapped():
+    def handler(req):
+        pass
+
+    assert inject(handler) is handler
+
+def test_lambda_handler_injects_typed_arguments(context):
+    @lambda_handler
+    def handler(req, user_id: uuid.UUID, since: datetime.date, limit: int = 20,
+                active: bool = False, price: Decimal = None, color: Color = None,
+                tags: List[str] = None, note: Optional[str] = None, extra: dict = None):
+        return Response({
+            'user_id': user_id, 'since': since, 'limit': limit, 'active': active,
+            'price': str(price), 'color': color.value, 'tags': tags, 'note': note,
+            'extra': extra,
+        })
+
+    user_id = uuid.uuid4()
+    event = utils.build_event(
+        {'price': 2.5, 'extra': {'a': 1}},
+        query_params={
+            'since': '2017-01-02', 'active': 'yes', 'color': 'red', 'tags': 'a'
+        },
+        path_params={'user_id': str(user_id)}
+    )
+    result = utils.parse_lambda_output(handler(event, context))
+
+    assert result.status_code == 200
+    assert result.data == {
+        'user_id': str(user_id), 'since': '2017-01-02', 'limit': 20, 'active': True,
+        'price': '2.5', 'color': 'red', 'tags': ['a'], 'note': None, 'extra': {'a': 1},
+    }
+
+def test_missing_and_invalid_arguments_are_aggregated(context):
+    @lambda_handler
+    def handler(req, user_id: int, limit: int = 20, since: datetime.date = None):
+        return Response({})
+
+    event = utils.build_event(None, query_params={'limit': 'ten', 'since': 'soon'})
+    result = utils.parse_lambda_output(handler(event, context))
+
+    assert result.status_code == 400
+    assert result.data['errors'] == [
+        {'field': 'user_id', 'message': 'required'},
+        {'field': 'limit', 'message': 'expected int'},
+        {'field': 'since', 'message': 'expected date'},
+    ]
+
+def test_invalid_arguments(context):
+    @lambda_handler
+    def handler(req, limit: int, flags: List[bool] = None):
+        return Response({})
+
+    event = utils.build_event({'limit': True, 'flags': [True, 'maybe']})
+    result = utils.parse_lambda_output(handler(event, context))
+
+    assert result.status_code == 422
+    assert result.data['errors'] == [
+        {'field': 'limit', 'message': 'expected int'},
+        {'field': 'flags', 'message': 'expected list of bool'},
+    ]
+
+@pytest.mark.parametrize('value, expected', [
+    ('2018-01-02', datetime.datetime(2018, 1, 2)),
+    ('2018-01-02T03:04', datetime.datetime(2018, 1, 2, 3, 4)),
+    ('2018-01-02 03:04:05.123', datetime.datetime(2018, 1, 2, 3, 4, 5, 123000)),
+    ('2018-01-02T03:04:05Z', datetime.datetime(
+        2018, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc
+    )),
+    ('2018-01-02T03:04:05-05:30', datetime.datetime(
+        2018, 1, 2, 3, 4, 5,
+        tzinfo=datetime.timezone(-datetime.timedelta(hours=5, minutes=30))
+    )),
+])
+def test_datetime_arguments(value, expected):
+    def handler(req, at: datetime.datetime):
+        pass
+
+    convert = compile_arguments(handler)[0].convert
+
+    assert convert(value) == expected
+    assert convert(value).tzinfo == expected.tzinfo
+
+@pytest.mark.parametrize('value', ['2018-1-2', '2018-01-02T03', '2018-13-01', 20180102])
+def test_invalid_date_arguments(value):
+    def handler(req, day: datetime.date):
+        pass
+
+    convert = compile_arguments(handler)[0].convert
+
+    assert convert('2018-01-02') == datetime.date(2018, 1, 2)
+    with pytest.raises(ValueError):
+        convert(value)
+
+def test_param_source_and_name(context):
+    @lambda_handler
+    def handler(req, user_id: int = Param(name='userId', source='query'),
+                page: int = Param(source='body', default=1)):
+        return Response({'user_id': user_id, 'page': page})
+
+    event = utils.build_event(None, query_params={'userId': '7', 'page': '3'})
+    result = utils.parse_lambda_output(handler(event, context))
+
+    assert result.data == {'user_id': 7, 'page': 1}
+
+def test_router_injects_path_parameters(context):
+    router = Router()
+
+    @router.get('/users/{user_id}')
+    def get_user(req, user_id: int):
+        return Response({'user_id': user_id})
+
+    event = utils.build_event(None)
+    event.update(httpMethod='GET', path='/users/42')
+    result = utils.parse_lambda_output(lambda_handler(router)(event, context))
+
+    assert result.data == {'user_id': 42}
+
+def test_variadic_parameters_are_not_injected():
+    def handler(req, *args, **kwargs):
+        pass
+
+    assert inject(handler) is handler
+
+def test_plain_parameters_are_not_injected(context):
+    @lambda_handler
+    def handler(req, is_admin=False):
+        return Response({'is_admin': is_admin})
+
+    event = utils.build_event(None, query_params={'is_admin': 'yes'})
+    result = utils.parse_lambda_output(handler(event, context))
+
+    assert inject(handler.__wrapped__) is handler.__wrapped__
+    assert result.data == {'is_admin': False}
+
+def test_plain_parameters_are_left_out(context):
+    def handler(req, limit: int = 20, cache=None, user=Param(name='userId')):
+        pass
+
+    assert [argument.name for argument in compile_arguments(handler)] == [
+        'limit', 'user'
+    ]
+
+def test_positional_only_parameter():
+    def handler(req, value: int, /):
+        pass
+
+    with pytest.raises(TypeError):
+        inject(handler)
+
+def test_unknown_source():
+    with pytest.raises(ValueError):
+        Param(source='cookie')
+
+def test_unsupported_annotation():
+    def handler(req, value: set):
+        pass
+
+    with pytest.raises(TypeError):
+        compile_arguments(handler)
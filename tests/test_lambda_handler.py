@@ -14,11 +14,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 from datetime import date, datetime
+import json
 import uuid
 
+from serverless import codecs, decorators
 from serverless.decorators import lambda_handler
 from serverless.wrappers import Response
-from serverless.exceptions import BadRequest
+from serverless.exceptions import BadRequest, Unauthorized
 
 from tests import utils
 
@@ -158,3 +160,88 @@ def test_lambda_handler_bad_request(context):
     assert result.status_code == BadRequest.status_code
     assert 'message' in result.data
     assert 'errors' in result.data
+
+def test_lambda_handler_error_bodies_are_cached(context, monkeypatch):
+    monkeypatch.setattr(decorators, '_error_bodies', {})
+    event = utils.build_event(None)
+
+    @lambda_handler
+    def handler(req):
+        raise Unauthorized('invalid token')
+
+    first = handler(event, context)
+    second = handler(event, context)
+
+    assert decorators._error_bodies == {
+        (codecs.get_codec(), 'invalid token'): first['body']
+    }
+    assert second['body'] is first['body']
+    assert utils.parse_lambda_output(second).data == {
+        'message': 'invalid token', 'errors': []
+    }
+    assert second['statusCode'] == 401
+    assert second['headers'] is not first['headers']
+
+def test_lambda_handler_error_bodies_use_handler_codec(context, monkeypatch):
+    monkeypatch.setattr(decorators, '_error_bodies', {})
+    event = utils.build_event(None)
+
+    class Upper(codecs.StdlibJsonCodec):
+        def dumps(self, obj):
+            return super().dumps(obj).upper()
+
+    def raising(req):
+        raise Unauthorized('nope')
+
+    upper = lambda_handler(codec=Upper())(raising)
+    plain = lambda_handler(raising)
+
+    assert upper(event, context)['body'] == '{"MESSAGE": "NOPE", "ERRORS": []}'
+    assert upper(event, context)['body'] == '{"MESSAGE": "NOPE", "ERRORS": []}'
+    assert utils.parse_lambda_output(plain(event, context)).data == {
+        'message': 'nope', 'errors': []
+    }
+
+def test_error_bodies_are_cached_for_empty_tuples_only(monkeypatch):
+    monkeypatch.setattr(decorators, '_error_bodies', {})
+
+    assert json.loads(decorators.to_error_response('Nope', None).body) == {
+        'message': 'Nope', 'errors': None
+    }
+    assert json.loads(decorators.to_error_response('Nope', ()).body) == {
+        'message': 'Nope', 'errors': []
+    }
+    assert json.loads(decorators.to_error_response('Nope', None).body) == {
+        'message': 'Nope', 'errors': None
+    }
+
+def test_lambda_handler_error_details_are_not_cached(context, monkeypatch):
+    monkeypatch.setattr(decorators, '_error_bodies', {})
+    event = utils.build_event(None)
+
+    @lambda_handler
+    def handler(req):
+        raise BadRequest('invalid request', [{'field': 'name'}])
+
+    result = utils.parse_lambda_output(handler(event, context))
+
+    assert result.data['errors'] == [{'field': 'name'}]
+    assert decorators._error_bodies == {}
+
+def test_lambda_handler_with_etag(context, dict_data):
+    event = utils.build_event(None)
+    event['httpMethod'] = 'GET'
+
+    @lambda_handler(etag=True)
+    def handler(req):
+        return Response(dict_data)
+
+    lambda_output = handler(event, context)
+    etag = lambda_output['headers']['ETag']
+    assert lambda_output['statusCode'] == 200
+
+    event['headers'] = {'If-None-Match': etag}
+    lambda_output = handler(event, context)
+    assert lambda_output['statusCode'] == 304
+    assert lambda_output['body'] == ''
+    assert lambda_output['headers']['ETag'] == etag
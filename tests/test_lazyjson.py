@@ -0,0 +1,128 @@
+import json
+
+import pytest
+
+from serverless.codecs import StdlibJsonCodec
+from serverless.exceptions import BadRequest
+from serverless.lazyjson import LazyObject, iter_array, skip_value
+from serverless.wrappers import Request
+
+from tests import utils
+
+
+DOCUMENT = json.dumps({
+    'source': 'import',
+    'tricky': 'a "} ] [ {" \\ b',
+    'nested': {'items': [1, {'a': [2, 3]}], 'flag': True},
+    'items': [{'id': 1}, {'id': 2}, {'id': 3}],
+    'count': -1.5e3,
+    'empty': [],
+})
+
+
+class CountingCodec(StdlibJsonCodec):
+    name = 'counting'
+
+    def __init__(self):
+        super(CountingCodec, self).__init__()
+        self.decoded = []
+
+    def loads(self, s):
+        self.decoded.append(s)
+        return super(CountingCodec, self).loads(s)
+
+
+@pytest.mark.parametrize('value', [
+    '"a \\" b"', '[1, [2, "]"]]', '{"a": {"b": "}"}}', 'true', '-1.5e3', 'null'
+])
+def test_skip_value(value):
+    assert skip_value(value + ', 1', 0) == len(value)
+
+def test_lazy_object_decodes_only_what_is_read():
+    codec = CountingCodec()
+    obj = LazyObject(DOCUMENT, codec)
+
+    assert obj['source'] == 'import'
+    assert obj['source'] == 'import'
+    assert obj['tricky'] == 'a "} ] [ {" \\ b'
+    assert codec.decoded == ['"import"', json.dumps('a "} ] [ {" \\ b')]
+    assert obj.raw('count') == '-1500.0'
+    assert dict(obj) == json.loads(DOCUMENT)
+
+@pytest.mark.parametrize('text', [
+    '{"a": 1, "a": 2}',
+    '{"a": 1, "b": 0, "a": 2}',
+    '{"a": 1, "b": "\\n", "\\u0061": 2}',
+])
+def test_lazy_object_duplicate_keys_match_json_loads(text):
+    expected = json.loads(text)
+    obj = LazyObject(text)
+
+    if 'b' in expected:
+        # locates the first "a" before reading it
+        assert obj['b'] == expected['b']
+    assert obj['a'] == expected['a'] == 2
+    assert dict(obj) == expected
+    assert Request({'body': text}, None).lazy_data['a'] == Request(
+        {'body': text}, None
+    ).data['a']
+
+def test_lazy_object_stops_at_unique_key():
+    obj = LazyObject('{"a": 1, "b": 2, "c": 3}')
+
+    assert obj['a'] == 1
+    assert not obj._scanned
+
+def test_lazy_object_missing_key():
+    obj = LazyObject(DOCUMENT)
+
+    assert 'nested' in obj
+    assert 'missing' not in obj
+    with pytest.raises(KeyError):
+        obj['missing']
+    assert len(obj) == 6
+
+def test_lazy_object_iter_array():
+    codec = CountingCodec()
+    obj = LazyObject(DOCUMENT, codec)
+
+    assert list(obj.iter('items')) == [{'id': 1}, {'id': 2}, {'id': 3}]
+    assert list(obj.iter('empty')) == []
+    assert codec.decoded == ['{"id": 1}', '{"id": 2}', '{"id": 3}']
+    with pytest.raises(BadRequest):
+        list(obj.iter('source'))
+
+@pytest.mark.parametrize('text', ['[', '[1,', '[1 2]', '{}'])
+def test_iter_array_malformed(text):
+    with pytest.raises(BadRequest):
+        list(iter_array(text))
+
+@pytest.mark.parametrize('text', ['[]', '{"a" 1}', '{"a": 1 "b": 2}', '{"a": tru}'])
+def test_lazy_object_malformed(text):
+    with pytest.raises(BadRequest):
+        dict(LazyObject(text))
+
+def test_request_lazy_data(dict_data):
+    req = Request(utils.build_event(dict_data), None)
+
+    assert req.lazy_data is req.lazy_data
+    assert dict(req.lazy_data) == dict_data
+    assert dict(Request(utils.build_event(None), None).lazy_data) == {}
+
+def test_request_iter_data():
+    event = utils.build_event(None)
+    event['body'] = '[{"id": 1}, {"id": 2}]'
+
+    assert list(Request(event, None).iter_data()) == [{'id': 1}, {'id': 2}]
+    assert list(Request(utils.build_event({'a': [1]}), None).iter_data('a')) == [1]
+    assert list(Request(utils.build_event(None), None).iter_data()) == []
+
+def test_request_data_parses_empty_object_once():
+    codec = CountingCodec()
+    event = utils.build_event(None)
+    event['body'] = '{}'
+    req = Request(event, None, codec=codec)
+
+    assert req.data == {}
+    assert req.data == {}
+    assert codec.decoded == ['{}']
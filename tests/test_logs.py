@@ -0,0 +1,162 @@
+import json
+import logging
+
+import pytest
+
+from serverless.decorators import lambda_handler
+from serverless.logs import (
+    JsonFormatter, RequestLogger, StructuredLogger, TracebackLimiter, request_fields
+)
+from serverless.wrappers import Request
+
+from tests import utils
+
+
+class Context:
+    aws_request_id = 'req-1'
+    function_name = 'fn'
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super(ListHandler, self).__init__()
+        self.setFormatter(JsonFormatter())
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(json.loads(self.format(record)))
+
+
+@pytest.fixture
+def handler():
+    return ListHandler()
+
+
+def make_settings(handler, name, **kwargs):
+    return StructuredLogger(name='tests.' + name, handler=handler, **kwargs)
+
+
+def raise_error():
+    raise ValueError('boom')
+
+
+def test_request_fields():
+    event = {'httpMethod': 'GET', 'resource': '/users/{id}', 'path': '/users/1'}
+
+    assert request_fields(event, Context()) == {
+        'request_id': 'req-1', 'route': 'GET /users/{id}'
+    }
+    event = {'requestContext': {'requestId': 'r', 'routeKey': 'GET /'}}
+    assert request_fields(event, None) == {'request_id': 'r', 'route': 'GET /'}
+    assert request_fields(None, None) == {}
+
+def test_records_are_json_with_request_fields(handler):
+    settings = make_settings(handler, 'fields')
+    logger = settings.bind({'httpMethod': 'POST', 'path': '/items'}, Context())
+
+    logger.bind(tenant='t1').info('Created %s', 'item')
+
+    line, = handler.lines
+    assert line['message'] == 'Created item'
+    assert line['level'] == 'INFO'
+    assert line['request_id'] == 'req-1'
+    assert line['route'] == 'POST /items'
+    assert line['tenant'] == 't1'
+
+def test_disabled_level_is_not_formatted(handler):
+    class Unformattable:
+        def __repr__(self):
+            raise AssertionError('formatted')
+
+    logger = make_settings(handler, 'lazy', level='INFO').bind({}, None)
+
+    logger.debug('%r', Unformattable())
+
+    assert handler.lines == []
+
+def test_debug_sampling(handler):
+    settings = make_settings(handler, 'sampled', level='INFO', debug_sample_rate=1.0)
+
+    settings.bind({}, None).debug('sampled')
+
+    assert [line['message'] for line in handler.lines] == ['sampled']
+    assert not make_settings(handler, 'unsampled').bind({}, None).sampled
+
+def test_repeated_tracebacks_are_limited(handler):
+    settings = make_settings(handler, 'limited')
+
+    for _ in range(3):
+        try:
+            raise_error()
+        except ValueError:
+            settings.bind({}, None).exception('failed')
+
+    first, second, third = handler.lines
+    assert 'ValueError: boom' in first['exception']
+    assert 'exception' not in second and 'exception' not in third
+    assert third['error'] == 'ValueError'
+
+def test_traceback_limiter_interval():
+    limiter = TracebackLimiter(interval=0.0)
+    try:
+        raise_error()
+    except ValueError as e:
+        exc = e
+
+    assert limiter.allow(exc) == (True, 0)
+    assert limiter.allow(exc) == (True, 0)
+
+def test_traceback_limiter_counts_suppressed():
+    limiter = TracebackLimiter(interval=60.0)
+    try:
+        raise_error()
+    except ValueError as e:
+        exc = e
+
+    assert limiter.allow(exc) == (True, 0)
+    assert limiter.allow(exc) == (False, 1)
+    assert limiter.allow(exc) == (False, 2)
+
+def test_request_logger_is_cached():
+    req = Request({}, None)
+
+    assert isinstance(req.logger, RequestLogger)
+    assert req.logger is req.logger
+
+def test_lambda_handler_with_logger(handler):
+    settings = make_settings(handler, 'handler')
+
+    @lambda_handler(logger=settings)
+    def func(req):
+        req.logger.info('handling')
+        raise_error()
+
+    result = utils.parse_lambda_output(func(utils.build_event(None), Context()))
+
+    assert result.status_code == 500
+    assert [line['message'] for line in handler.lines] == ['handling', 'boom']
+    assert all(line['request_id'] == 'req-1' for line in handler.lines)
+
+def test_settings_sharing_a_name_share_a_handler(capsys):
+    first = StructuredLogger(name='tests.shared')
+    second = StructuredLogger(name='tests.shared')
+
+    first.bind({}, Context()).info('one')
+    second.bind({}, Context()).info('two')
+
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [line['message'] for line in lines] == ['one', 'two']
+    assert len(logging.getLogger('tests.shared').handlers) == 1
+    assert logging.getLogger('serverless').propagate
+
+def test_lambda_handler_without_logger_logs_every_traceback(caplog):
+    @lambda_handler
+    def func(req):
+        raise_error()
+
+    for _ in range(2):
+        func(utils.build_event(None), Context())
+
+    records = [r for r in caplog.records if r.name == 'serverless.decorators']
+    assert len(records) == 2
+    assert all(record.exc_info for record in records)
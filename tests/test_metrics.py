@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import json
+
+from serverless.decorators import lambda_handler
+from serverless.exceptions import BadRequest
+from serverless.metrics import Metrics, Timings, format_server_timing
+from serverless.wrappers import Response
+
+from tests import utils
+
+
+class Context:
+    function_name = 'my-function'
+
+
+def test_timings():
+    timings = Timings()
+    timings.durations.update(handler=0.003, parse=0.001)
+    timings.stop('serialize')
+
+    assert timings.milliseconds() == {
+        'handler': 2.0, 'parse': 1.0, 'total': 3.0
+    }
+
+def test_format_server_timing():
+    assert format_server_timing({'parse': 1.0, 'total': 1.5}) == (
+        'parse;dur=1.000, total;dur=1.500'
+    )
+
+def test_lambda_handler_with_metrics(dict_data):
+    event = utils.build_event(dict_data)
+    lines = []
+
+    @lambda_handler(metrics=Metrics(namespace='Test', server_timing=True, emit=lines.append))
+    def handler(req):
+        return Response(req.data)
+
+    lambda_output = handler(event, Context())
+    server_timing = lambda_output['headers']['Server-Timing']
+    for phase in ('parse', 'handler', 'serialize', 'total'):
+        assert '%s;dur=' % phase in server_timing
+
+    record = json.loads(lines[0])
+    directive = record['_aws']['CloudWatchMetrics'][0]
+    assert directive['Namespace'] == 'Test'
+    assert directive['Dimensions'] == [['FunctionName']]
+    assert record['FunctionName'] == 'my-function'
+    assert {m['Name'] for m in directive['Metrics']} == {
+        'parse', 'handler', 'serialize', 'total'
+    }
+    assert 'Server-Timing' not in Response().headers
+
+def test_lambda_handler_with_metrics_on_error():
+    event = utils.build_event(None)
+    lines = []
+
+    @lambda_handler(metrics=Metrics(emit=lines.append))
+    def handler(req):
+        raise BadRequest()
+
+    lambda_output = handler(event, Context())
+    record = json.loads(lines[0])
+
+    assert lambda_output['statusCode'] == 400
+    assert 'error' in record
+    assert 'Server-Timing' not in lambda_output['headers']
+
+def test_lambda_handler_without_metrics(capsys):
+    event = utils.build_event(None)
+
+    @lambda_handler
+    def handler(req):
+        return Response()
+
+    handler(event, Context())
+    assert capsys.readouterr().out == ''
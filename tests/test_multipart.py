@@ -0,0 +1,119 @@
+import base64
+import gzip
+import json
+
+import pytest
+
+from serverless.decorators import lambda_handler
+from serverless.exceptions import BadRequest, PayloadTooLarge, UnsupportedMediaType
+from serverless.multipart import iter_parts, parse_header_params
+from serverless.wrappers import Request, Response
+
+from tests import utils
+
+
+BOUNDARY = 'xYzZY'
+
+UPLOAD = (
+    b'--xYzZY\r\n'
+    b'Content-Disposition: form-data; name="title"\r\n'
+    b'\r\n'
+    b'caf\xc3\xa9\r\n'
+    b'--xYzZY\r\n'
+    b'Content-Disposition: form-data; name="file"; filename="a.bin"\r\n'
+    b'Content-Type: application/octet-stream\r\n'
+    b'\r\n'
+    b'\x00\xff\r\n--xY\r\n'
+    b'--xYzZY--\r\n'
+)
+
+
+def build_upload_event(body=UPLOAD, headers=None):
+    event = utils.build_event(None)
+    event['body'] = base64.b64encode(body).decode('ascii')
+    event['isBase64Encoded'] = True
+    event['headers'] = headers or {
+        'Content-Type': 'multipart/form-data; boundary="%s"' % BOUNDARY
+    }
+    return event
+
+
+def test_parse_header_params():
+    assert parse_header_params('Multipart/Form-Data; boundary="a;b"; x=1') == (
+        'multipart/form-data', {'boundary': 'a;b', 'x': '1'}
+    )
+    assert parse_header_params(None) == ('', {})
+
+def test_iter_parts_yields_views_of_the_body():
+    title, upload = iter_parts(UPLOAD, BOUNDARY)
+
+    assert title.name == 'title'
+    assert title.filename is None
+    assert title.content_type == 'text/plain'
+    assert title.text == 'café'
+    assert upload.name == 'file'
+    assert upload.filename == 'a.bin'
+    assert upload.content_type == 'application/octet-stream'
+    assert isinstance(upload.data, memoryview)
+    assert upload.data.obj is UPLOAD
+    assert upload.data.tobytes() == b'\x00\xff\r\n--xY'
+
+@pytest.mark.parametrize('body', [
+    b'no boundary',
+    b'--xYzZY\r\nContent-Disposition: form-data; name="a"',
+    b'--xYzZY\r\nContent-Disposition: form-data; name="a"\r\n\r\nvalue',
+])
+def test_iter_parts_malformed(body):
+    with pytest.raises(BadRequest):
+        list(iter_parts(body, BOUNDARY))
+
+def test_request_parts_share_the_decoded_body():
+    req = Request(build_upload_event(), None)
+
+    parts = list(req.parts())
+
+    assert req.raw == UPLOAD
+    assert all(part.data.obj is req.raw for part in parts)
+
+def test_request_parts_requires_multipart():
+    req = Request(build_upload_event(headers={'Content-Type': 'text/plain'}), None)
+
+    with pytest.raises(BadRequest):
+        req.parts()
+
+def test_request_decompresses_gzip_body(dict_data):
+    event = build_upload_event(
+        gzip.compress(json.dumps(dict_data).encode('utf-8')),
+        {'Content-Encoding': 'gzip', 'Content-Type': 'application/json'}
+    )
+
+    assert Request(event, None).data == dict_data
+
+def test_request_decompression_cap():
+    event = build_upload_event(
+        gzip.compress(b' ' * 1024), {'Content-Encoding': 'gzip'}
+    )
+
+    assert len(Request(event, None, max_body_size=1024).raw) == 1024
+    with pytest.raises(PayloadTooLarge):
+        Request(event, None, max_body_size=1023).raw
+
+@pytest.mark.parametrize('coding, error', [
+    ('br', UnsupportedMediaType),
+    ('gzip', BadRequest),
+])
+def test_request_rejects_undecodable_body(coding, error):
+    event = build_upload_event(b'plain', {'Content-Encoding': coding})
+
+    with pytest.raises(error):
+        Request(event, None).raw
+
+def test_lambda_handler_max_body_size(context):
+    @lambda_handler(max_body_size=10)
+    def handler(req):
+        return Response({'size': len(req.raw)})
+
+    event = build_upload_event(gzip.compress(b'x' * 11), {'Content-Encoding': 'gzip'})
+    result = utils.parse_lambda_output(handler(event, context))
+
+    assert result.status_code == 413
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pytest
+
+from serverless.decorators import lambda_handler
+from serverless.resources import Resource, Resources
+from serverless.wrappers import Response
+
+from tests import utils
+
+
+class Connection:
+    def __init__(self):
+        self.healthy = True
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_resource_is_built_once():
+    calls = []
+    resource = Resource(lambda: calls.append(1) or object())
+
+    assert not resource.built
+    assert resource.get() is resource.get()
+    assert resource.built
+    assert calls == [1]
+
+def test_resource_rebuilt_when_unhealthy():
+    resource = Resource(Connection, health_check=lambda c: c.healthy, close=Connection.close)
+    first = resource.get(check=True)
+
+    assert resource.get(check=True) is first
+
+    first.healthy = False
+    second = resource.get(check=True)
+    assert second is not first
+    assert first.closed
+
+def test_resource_rebuilt_when_health_check_raises():
+    def health_check(conn):
+        raise IOError('connection reset')
+
+    resource = Resource(Connection, health_check=health_check)
+    first = resource.get()
+
+    assert resource.get(check=True) is not first
+
+def test_resource_factory_failure_is_retried():
+    calls = []
+
+    def factory():
+        calls.append(1)
+        if len(calls) == 1:
+            raise IOError('unavailable')
+        return Connection()
+
+    resource = Resource(factory)
+    with pytest.raises(IOError):
+        resource.get()
+    assert isinstance(resource.get(), Connection)
+
+def test_resources_warm_and_close():
+    resources = Resources({'conn': Resource(Connection, close=Connection.close)})
+    resources.warm()
+    conn = resources['conn'].get()
+
+    resources.close()
+    assert conn.closed
+    assert not resources['conn'].built
+
+def test_scope_checks_once_per_invocation():
+    checks = []
+    resources = Resources({'conn': Resource(Connection, health_check=checks.append)})
+    scope = resources.scope()
+
+    assert scope.conn is scope['conn']
+    assert 'conn' in scope
+    with pytest.raises(AttributeError):
+        scope.unknown
+    assert len(checks) == 0
+
+    resources.scope().conn
+    assert len(checks) == 1
+
+def test_lambda_handler_with_resources(context):
+    event = utils.build_event(None)
+    built = []
+
+    def connect():
+        built.append(Connection())
+        return built[-1]
+
+    @lambda_handler(resources={'db': Resource(connect, health_check=lambda c: c.healthy)})
+    def handler(req):
+        return Response({'db': id(req.resources.db)})
+
+    first = utils.parse_lambda_output(handler(event, context)).data
+    second = utils.parse_lambda_output(handler(event, context)).data
+    assert first == second
+    assert len(built) == 1
+
+    built[0].healthy = False
+    third = utils.parse_lambda_output(handler(event, context)).data
+    assert third != first
+    assert len(built) == 2
+    assert handler.resources['db'].get() is built[1]
+
+def test_lambda_handler_without_resources(context):
+    event = utils.build_event(None)
+
+    @lambda_handler
+    def handler(req):
+        return Response({'resources': req.resources})
+
+    assert utils.parse_lambda_output(handler(event, context)).data == {'resources': None}
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import pytest
+
+from serverless.decorators import lambda_handler
+from serverless.exceptions import MethodNotAllowed, NotFound
+from serverless.routing import Router
+from serverless.wrappers import Response
+
+from tests import utils
+
+
+@pytest.fixture
+def router():
+    router = Router()
+
+    def named(name):
+        def handler(req):
+            return Response({'route': name, 'params': req.params})
+        return handler
+
+    router.add_route('GET', '/', named('root'))
+    router.add_route('GET', '/users', named('list'))
+    router.add_route(['GET', 'DELETE'], '/users/{user_id}', named('user'))
+    router.add_route('GET', '/users/me', named('me'))
+    router.add_route('GET', '/users/{user_id}/orders/{order_id}', named('order'))
+    router.add_route('GET', '/users/me/orders/latest', named('latest'))
+    router.add_route('ANY', '/files/{path+}', named('files'))
+    return router
+
+
+def dispatch(router, method, path):
+    event = utils.build_event(None)
+    event.update(httpMethod=method, path=path)
+    return utils.parse_lambda_output(lambda_handler(router)(event, None))
+
+
+@pytest.mark.parametrize('method, path, route, params', [
+    ('GET', '/', 'root', {}),
+    ('GET', '/users/', 'list', {}),
+    ('GET', '/users/42', 'user', {'user_id': '42'}),
+    ('DELETE', '/users/42', 'user', {'user_id': '42'}),
+    ('HEAD', '/users/42', 'user', {'user_id': '42'}),
+    ('GET', '/users/me', 'me', {}),
+    ('GET', '/users/me/orders/7', 'order', {'user_id': 'me', 'order_id': '7'}),
+    ('GET', '/users/me/orders/latest', 'latest', {}),
+    ('POST', '/files/a/b.txt', 'files', {'path': 'a/b.txt'}),
+])
+def test_dispatch(router, method, path, route, params):
+    result = dispatch(router, method, path)
+
+    assert result.status_code == 200
+    assert result.data == {'route': route, 'params': params}
+
+def test_not_found(router):
+    with pytest.raises(NotFound):
+        router.match('GET', '/orders')
+    with pytest.raises(NotFound):
+        router.match('GET', '/files')
+
+    assert dispatch(router, 'GET', '/users/1/orders').status_code == 404
+
+def test_method_not_allowed(router):
+    with pytest.raises(MethodNotAllowed) as e:
+        router.match('POST', '/users/1')
+
+    assert e.value.errors == ['DELETE', 'GET']
+    assert dispatch(router, 'POST', '/users/1').status_code == 405
+
+def test_duplicate_route(router):
+    with pytest.raises(ValueError):
+        router.add_route('GET', '/users/{user_id}', None)
+
+def test_conflicting_parameter_name(router):
+    with pytest.raises(ValueError):
+        router.add_route('PUT', '/users/{id}', None)
+
+def test_greedy_parameter_must_be_last():
+    with pytest.raises(ValueError):
+        Router().add_route('GET', '/{proxy+}/x', None)
+
+def test_route_decorators():
+    router = Router()
+
+    @router.post('/items')
+    def create(req):
+        return Response(status_code=201)
+
+    assert router.match('post', '/items') == (create, {})
+
+def test_async_route(context):
+    router = Router()
+
+    @router.get('/users/{user_id}')
+    async def get_user(req):
+        return Response({'user_id': req.params['user_id']})
+
+    event = utils.build_event(None, path_params={'user_id': '1'})
+    event['httpMethod'] = 'GET'
+    event['path'] = '/users/1'
+    result = utils.parse_lambda_output(lambda_handler(router)(event, context))
+
+    assert result.status_code == 200
+    assert result.data == {'user_id': '1'}
+
+def test_async_route_with_typed_arguments(context):
+    router = Router()
+
+    @router.get('/users/{user_id}')
+    async def get_user(req, user_id: int):
+        return Response({'user_id': user_id})
+
+    event = utils.build_event(None, path_params={'user_id': '1'})
+    event['httpMethod'] = 'GET'
+    event['path'] = '/users/1'
+    result = utils.parse_lambda_output(lambda_handler(router)(event, context))
+
+    assert result.status_code == 200
+    assert result.data == {'user_id': 1}
@@ -0,0 +1,164 @@
+import json
+import os
+
+import pytest
+
+from serverless.decorators import lambda_handler
+from serverless.spill import FileSystemBlobStore, S3BlobStore, Spill, S3_MIN_PART_SIZE
+from serverless.streaming import MAX_OUTPUT_BODY_SIZE
+from serverless.wrappers import Response
+
+from tests import utils
+
+
+class FakeS3Client:
+    def __init__(self):
+        self.calls = []
+        self.objects = {}
+        self.parts = {}
+
+    def create_multipart_upload(self, Bucket, Key, ContentType):
+        self.calls.append('create_multipart_upload')
+        self.parts[Key] = []
+        return {'UploadId': 'upload-1'}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self.calls.append('upload_part')
+        self.parts[Key].append(Body)
+        return {'ETag': 'etag-%d' % PartNumber}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self.calls.append('complete_multipart_upload')
+        assert [p['PartNumber'] for p in MultipartUpload['Parts']] == [
+            i + 1 for i in range(len(self.parts[Key]))
+        ]
+        self.objects[Key] = b''.join(self.parts.pop(Key))
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.calls.append('abort_multipart_upload')
+        self.parts.pop(Key)
+
+    def put_object(self, Bucket, Key, ContentType, Body):
+        self.calls.append('put_object')
+        self.objects[Key] = Body
+
+    def generate_presigned_url(self, method, Params, ExpiresIn):
+        return 'https://%s.s3.amazonaws.com/%s' % (Params['Bucket'], Params['Key'])
+
+
+def test_small_body_is_not_spilled(tmpdir):
+    resp = Response({'k': 'v'}, spill=Spill(FileSystemBlobStore(str(tmpdir))))
+
+    output = resp.to_lambda_output()
+
+    assert output['statusCode'] == 200
+    assert json.loads(output['body']) == {'k': 'v'}
+    assert tmpdir.listdir() == []
+
+def test_large_body_is_spilled_to_file(tmpdir):
+    store = FileSystemBlobStore(str(tmpdir), base_url='https://files.example.com/')
+    spill = Spill(store, threshold=100, key=lambda: 'reports/1.json')
+    data = {'rows': ({'n': i} for i in range(100))}
+
+    result = utils.parse_lambda_output(Response(data, spill=spill).to_lambda_output())
+
+    assert result.status_code == 303
+    assert result.headers['Location'] == 'https://files.example.com/reports/1.json'
+    assert result.headers['X-Content-Type-Options'] == 'nosniff'
+    with open(os.path.join(str(tmpdir), 'reports', '1.json'), 'rb') as f:
+        body = f.read()
+    assert json.loads(body.decode('utf-8')) == {'rows': [{'n': i} for i in range(100)]}
+    assert result.data == {'location': result.headers['Location'], 'size': len(body)}
+
+def test_large_list_is_spilled_as_one_document(tmpdir):
+    spill = Spill(FileSystemBlobStore(str(tmpdir)), threshold=100, key=lambda: 'a.json')
+    data = [{'n': i} for i in range(100)]
+
+    result = utils.parse_lambda_output(Response(data, spill=spill).to_lambda_output())
+
+    assert result.status_code == 303
+    with open(os.path.join(str(tmpdir), 'a.json'), 'rb') as f:
+        body = f.read()
+    assert json.loads(body.decode('utf-8')) == data
+    assert result.data['size'] == len(body)
+
+def test_threshold_applies_to_escaped_body(tmpdir):
+    spill = Spill(FileSystemBlobStore(str(tmpdir)), threshold=30)
+    data = [''] * 6
+
+    assert len(Response(data, codec='json').body) < 30
+    assert Response(data, codec='json', spill=spill).to_lambda_output()['statusCode'] == 303
+    assert Spill(FileSystemBlobStore(str(tmpdir))).threshold == MAX_OUTPUT_BODY_SIZE
+
+def test_spill_without_redirect(tmpdir):
+    spill = Spill(FileSystemBlobStore(str(tmpdir)), threshold=10, redirect=False)
+
+    result = utils.parse_lambda_output(Response(['x' * 10], spill=spill).to_lambda_output())
+
+    assert result.status_code == 200
+    assert 'Location' not in result.headers
+    assert result.data['location'].startswith('file://')
+
+def test_failed_spill_leaves_no_file(tmpdir):
+    def rows():
+        yield 'x' * 10
+        raise ValueError('cursor closed')
+
+    spill = Spill(FileSystemBlobStore(str(tmpdir)), threshold=5, key=lambda: 'a.json')
+
+    with pytest.raises(ValueError):
+        Response(rows(), spill=spill).to_lambda_output()
+    assert tmpdir.listdir() == []
+
+def test_s3_store_uploads_parts():
+    client = FakeS3Client()
+    store = S3BlobStore('bucket', prefix='spill/', client=client)
+    writer = store.open('a.json', 'application/json')
+
+    for _ in range(3):
+        writer.write(b'x' * (S3_MIN_PART_SIZE // 2 + 1))
+    location = writer.commit()
+
+    assert location == 'https://bucket.s3.amazonaws.com/spill/a.json'
+    assert client.calls == [
+        'create_multipart_upload', 'upload_part', 'upload_part', 'complete_multipart_upload'
+    ]
+    assert len(client.objects['spill/a.json']) == 3 * (S3_MIN_PART_SIZE // 2 + 1)
+
+def test_s3_store_puts_small_object():
+    client = FakeS3Client()
+    writer = S3BlobStore('bucket', client=client).open('a.json', 'application/json')
+
+    writer.write(b'{}')
+    writer.commit()
+
+    assert client.calls == ['put_object']
+    assert client.objects['a.json'] == b'{}'
+
+def test_s3_store_aborts_upload():
+    client = FakeS3Client()
+    writer = S3BlobStore('bucket', client=client).open('a.json', 'application/json')
+
+    writer.write(b'x' * S3_MIN_PART_SIZE)
+    writer.abort()
+
+    assert client.calls[-1] == 'abort_multipart_upload'
+    assert client.objects == {}
+
+def test_s3_store_rejects_small_parts():
+    with pytest.raises(ValueError):
+        S3BlobStore('bucket', client=FakeS3Client(), part_size=1024)
+
+def test_lambda_handler_with_spill(context):
+    client = FakeS3Client()
+    spill = Spill(S3BlobStore('bucket', client=client), threshold=100, key=lambda: 'k')
+
+    @lambda_handler(spill=spill)
+    def handler(req):
+        return Response(['x' * 10] * 20)
+
+    result = utils.parse_lambda_output(handler(utils.build_event(None), context))
+
+    assert result.status_code == 303
+    assert result.headers['Location'] == 'https://bucket.s3.amazonaws.com/k'
+    assert json.loads(client.objects['k'].decode('utf-8')) == ['x' * 10] * 20
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2017 Evolent Health, Inc.
+
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+
+#    http://www.apache.org/licenses/LICENSE-2.0
+
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from datetime import date
+import json
+import itertools
+
+import pytest
+
+from serverless import codecs, streaming
+from serverless.decorators import lambda_handler
+from serverless.exceptions import PayloadTooLarge
+from serverless.wrappers import Response
+
+from tests import utils
+
+
+DATA = {
+    'rows': [{'id': 1, 'day': date(2018, 1, 1), 'tags': ['a', 'é']}],
+    'count': 1,
+    2: None,
+}
+
+
+@pytest.mark.parametrize('name', codecs.available_codecs())
+def test_encode_matches_codec(name):
+    codec = codecs.get_codec(name)
+
+    assert streaming.encode(DATA, codec) == codec.dumps(DATA)
+    assert streaming.encode([], codec) == codec.dumps([])
+    assert streaming.encode('text', codec) == codec.dumps('text')
+
+def test_encode_iterator():
+    codec = codecs.get_codec('json')
+    data = {'rows': (i for i in range(3)), 'nested': iter([iter([])])}
+
+    assert streaming.encode(data, codec) == '{"rows": [0, 1, 2], "nested": [[]]}'
+
+def test_encode_stops_at_max_size():
+    codec = codecs.get_codec('json')
+    counter = itertools.count()
+
+    with pytest.raises(PayloadTooLarge):
+        streaming.encode(iter(counter.__next__, None), codec, max_size=100)
+    assert next(counter) < 100
+
+def test_encode_counts_escaped_bytes():
+    codec = codecs.get_codec('json')
+    codec = type('Utf8Codec', (type(codec),), {'dumps': lambda self, o: '"éé"'})()
+
+    assert streaming.encode('x', codec, max_size=16) == '"éé"'
+    with pytest.raises(PayloadTooLarge):
+        streaming.encode('x', codec, max_size=15)
+
+def test_response_with_generator():
+    resp = Response({'rows': ({'n': i} for i in range(2))}, codec='json')
+
+    assert resp.body == '{"rows": [{"n": 0}, {"n": 1}]}'
+    assert resp.to_lambda_output()['body'] == resp.body
+
+def test_response_with_max_size():
+    resp = Response(['x' * 10] * 10, max_size=50)
+
+    with pytest.raises(PayloadTooLarge):
+        resp.body
+
+def test_response_with_max_size_encodes_lists_at_once():
+    calls = []
+
+    class Counting(codecs.StdlibJsonCodec):
+        def dumps(self, obj):
+            calls.append(obj)
+            return super().dumps(obj)
+
+    resp = Response([{'n': i} for i in range(100)], codec=Counting(), max_size=10000)
+
+    assert resp.body == Counting().dumps([{'n': i} for i in range(100)])
+    assert len(calls) == 2
+
+def test_check_size():
+    assert streaming.check_size('"éé"', 16) == '"éé"'
+    with pytest.raises(PayloadTooLarge):
+        streaming.check_size('"éé"', 15)
+
+def test_output_size_matches_lambda_output():
+    body = json.dumps({'text': 'a "quoted" \\ é 😀'})
+
+    assert streaming.output_size(body) == len(json.dumps({'body': body})) - 12
+
+def test_max_response_size_leaves_room_for_escaping(context):
+    # 4 body bytes per row, 6 once the quotes are escaped again
+    rows = [''] * (streaming.MAX_OUTPUT_BODY_SIZE // 5)
+
+    @lambda_handler(max_response_size=True, codec='json')
+    def handler(req):
+        return Response(rows)
+
+    output = handler(utils.build_event(None), context)
+
+    assert len(Response(rows, codec='json').body) < streaming.MAX_OUTPUT_BODY_SIZE
+    assert output['statusCode'] == 413
+
+def test_lambda_handler_with_max_response_size(context):
+    event = utils.build_event(None)
+
+    @lambda_handler(max_response_size=100)
+    def handler(req):
+        return Response(('x' * 10 for _ in itertools.count()))
+
+    result = utils.parse_lambda_output(handler(event, context))
+
+    assert result.status_code == 413
+    assert result.data['message'] == 'Response body exceeds 100 bytes'
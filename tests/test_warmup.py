@@ -0,0 +1,63 @@
+import timeit
+
+from serverless.decorators import lambda_handler
+from serverless.resources import Resource
+from serverless.warmup import WarmUp
+from serverless.wrappers import Response
+
+from tests import utils
+
+
+def test_matches():
+    warmup = WarmUp(matches=lambda event: event.get('ping') == 1)
+
+    assert warmup.matches({'source': 'aws.events', 'detail-type': 'Scheduled Event'})
+    assert warmup.matches({'source': 'serverless-plugin-warmup'})
+    assert warmup.matches({'warmer': True})
+    assert warmup.matches({'ping': 1})
+    assert not warmup.matches({'warmer': False})
+    assert not warmup.matches(utils.build_event({'k': 'v'}))
+    assert not warmup.matches(None)
+
+def test_lambda_handler_short_circuits_pings(context):
+    calls = []
+
+    @lambda_handler(warmup=True)
+    def handler(req):
+        calls.append(req)
+        return Response({})
+
+    assert handler({'warmer': True}, context) == {'warmup': True, 'pings': 1}
+    assert handler({'source': 'aws.events'}, context) == {'warmup': True, 'pings': 2}
+    assert handler(utils.build_event(None), context)['statusCode'] == 200
+    assert len(calls) == 1
+    assert handler.warmup.pings == 2
+
+def test_pings_warm_resources_and_prime(context):
+    built, primed = [], []
+    resource = Resource(lambda: built.append(1) or 'conn')
+
+    @lambda_handler(
+        resources={'db': resource},
+        warmup=WarmUp(warm_resources=True, prime=lambda: primed.append(1))
+    )
+    def handler(req):
+        return Response({})
+
+    handler({'warmer': True}, context)
+    handler({'warmer': True}, context)
+
+    assert resource.built
+    assert built == [1]
+    assert primed == [1, 1]
+
+def test_ping_is_cheap(context):
+    @lambda_handler(warmup=True)
+    def handler(req):
+        return Response({})
+
+    event = {'source': 'aws.events'}
+    elapsed = timeit.repeat(lambda: handler(event, context), number=1000, repeat=3)
+    per_ping = min(elapsed) / 1000
+
+    assert per_ping < 50e-6
@@ -13,12 +13,14 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import base64
 from datetime import date, datetime
+from decimal import Decimal
 import uuid
 
 import pytest
 
-from serverless.wrappers import Request, Response
+from serverless.wrappers import Record, Request, Response, make_etag
 from serverless.exceptions import BadRequest
 
 from tests import utils
@@ -89,6 +91,81 @@ class TestResponse:
         assert result.status_code == 200
         assert all([result.headers[k] == v for k, v in dict_data.items()])
 
+    def test_response_headers_are_layered(self):
+        resp = Response(headers={'X-Id': '1'})
+        resp.headers['Pragma'] = 'cache'
+        output = resp.to_lambda_output()
+
+        assert output['headers']['X-Id'] == '1'
+        assert output['headers']['Pragma'] == 'cache'
+        assert output['headers']['X-Frame-Options'] == 'SAMEORIGIN'
+        assert Response().headers['Pragma'] == 'no-cache'
+        assert output['headers'] is not resp.to_lambda_output()['headers']
+
+    def test_response_default_headers_can_be_deleted(self):
+        resp = Response(headers={'X-Id': '1'})
+        del resp.headers['Cache-Control']
+
+        assert resp.headers.pop('Pragma') == 'no-cache'
+        assert 'Pragma' not in resp.headers
+        assert len(resp.headers) == 4
+        assert resp.to_lambda_output()['headers'] == {
+            'X-Id': '1',
+            'X-Content-Type-Options': 'nosniff',
+            'X-Frame-Options': 'SAMEORIGIN',
+            'X-XSS-Protection': '1; mode=block'
+        }
+        assert Response().headers['Cache-Control'] == 'no-cache, must-revalidate'
+        with pytest.raises(KeyError):
+            del resp.headers['Pragma']
+
+    def test_response_headers_can_be_replaced(self):
+        resp = Response()
+        resp.headers = {'X-Id': '1'}
+
+        assert resp.to_lambda_output()['headers'] == {'X-Id': '1'}
+
+    def test_response_has_no_instance_dict(self):
+        with pytest.raises(AttributeError):
+            Response().unknown = 1
+        with pytest.raises(AttributeError):
+            Request({}, None).unknown = 1
+
+    def test_response_with_computed_etag(self, dict_data):
+        resp = Response(dict_data, etag=True)
+        lambda_output = resp.to_lambda_output()
+
+        assert lambda_output['headers']['ETag'] == make_etag(resp.body)
+        assert 'ETag' not in resp.headers
+
+    def test_response_with_etag(self, dict_data, context):
+        event = utils.build_event(None)
+        event['httpMethod'] = 'GET'
+        event['headers'] = {'If-None-Match': 'W/"other", "v1"'}
+        req = Request(event, context)
+
+        resp = Response(dict_data, etag='v1')
+        lambda_output = resp.to_lambda_output(req)
+        assert lambda_output['statusCode'] == 304
+        assert lambda_output['body'] == ''
+        assert lambda_output['headers']['ETag'] == '"v1"'
+
+    def test_response_with_etag_skips_serialization(self, context):
+        event = utils.build_event(None)
+        event['httpMethod'] = 'GET'
+        event['headers'] = {'If-None-Match': '*'}
+
+        resp = Response(object(), etag='v1')
+        assert resp.to_lambda_output(Request(event, context))['statusCode'] == 304
+
+    def test_response_with_etag_not_modified_only_for_get(self, dict_data, context):
+        event = utils.build_event(None)
+        event['httpMethod'] = 'PUT'
+        event['headers'] = {'If-None-Match': '"v1"'}
+
+        resp = Response(dict_data, etag='v1')
+        assert resp.to_lambda_output(Request(event, context))['statusCode'] == 200
+
 
 class TestRequest:
     def test_request(self, context):
@@ -136,3 +213,73 @@ class TestRequest:
         assert req.context == context
         assert req.data == dict()
         assert req.params == dict_data
+
+    def test_request_with_headers(self, context):
+        event = utils.build_event(None)
+        event['headers'] = {'Content-Type': 'application/json'}
+        req = Request(event, context)
+
+        assert req.headers == event['headers']
+        assert req.get_header('content-type') == 'application/json'
+        assert req.get_header('Accept', 'default') == 'default'
+
+    def test_request_etag_matches(self, context):
+        event = utils.build_event(None)
+        event['headers'] = {'If-None-Match': '"a", W/"b"'}
+        req = Request(event, context)
+
+        assert req.etag_matches('"a"')
+        assert req.etag_matches('"b"')
+        assert req.etag_matches('W/"a"')
+        assert not req.etag_matches('"c"')
+        assert not Request(utils.build_event(None), context).etag_matches('"a"')
+
+
+class TestRecord:
+    def test_sqs_record(self, dict_data, context):
+        event = utils.build_sqs_event([dict_data])
+        record = Record(event['Records'][0], context)
+
+        assert record.id == '0'
+        assert record.source == 'aws:sqs'
+        assert record.data == dict_data
+
+    def test_kinesis_record(self, dict_data, context):
+        data = base64.b64encode(b'{"k": "v"}').decode('ascii')
+        record = Record({
+            'eventSource': 'aws:kinesis',
+            'kinesis': {'sequenceNumber': '42', 'data': data}
+        }, context)
+
+        assert record.id == '42'
+        assert record.body == '{"k": "v"}'
+        assert record.data == {'k': 'v'}
+
+    def test_dynamodb_record(self, context):
+        record = Record({
+            'eventSource': 'aws:dynamodb',
+            'dynamodb': {
+                'SequenceNumber': '7',
+                'NewImage': {
+                    'id': {'S': 'a'},
+                    'count': {'N': '1.5'},
+                    'tags': {'SS': ['x']},
+                    'nested': {'M': {'ok': {'BOOL': True}, 'items': {'L': [{'NULL': True}]}}}
+                }
+            }
+        }, context)
+
+        assert record.id == '7'
+        assert record.data == {
+            'id': 'a',
+            'count': Decimal('1.5'),
+            'tags': {'x'},
+            'nested': {'ok': True, 'items': [None]}
+        }
+        assert record.old_image is None
+
+    def test_record_with_invalid_json_data(self, context):
+        record = Record({'messageId': '1', 'body': 'This is not a json'}, context)
+
+        with pytest.raises(BadRequest):
+            record.data
@@ -58,3 +58,27 @@ def build_event(body_data, query_params=dict(), path_params=dict()):
     }
 
     return event
+
+def build_sqs_event(bodies, fifo=False):
+    """
+    Builds AWS Lambda SQS event with a record per body
+
+    Args:
+        bodies (list): data serialized to the body of each record
+        fifo (bool): whether the records come from a FIFO queue
+
+    Returns:
+        event (dict): AWS Lambda event
+    """
+    arn = 'arn:aws:sqs:us-east-1:123456789012:queue' + ('.fifo' if fifo else '')
+    records = [
+        {
+            'messageId': str(i),
+            'body': json.dumps(body),
+            'eventSource': 'aws:sqs',
+            'eventSourceARN': arn
+        }
+        for i, body in enumerate(bodies)
+    ]
+
+    return {'Records': records}